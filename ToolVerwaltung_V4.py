@@ -1,18 +1,37 @@
+import time
+_START_TIME = time.perf_counter()  # Startzeit-Messung: vor allen anderen Imports
+
 import os
 import sys
-import json
 import subprocess
 from datetime import datetime
-import getpass
-import gzip
-import struct
-import pandas as pd
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import difflib
 import itertools
-import urllib.request
-import re
+import queue
+
+from sync_files import (
+    CURRENT_INITIALS, CURRENT_USER, load_last_paths, save_last_paths, flush_last_paths,
+    copy_tools_A_to_new_B, copy_tools_B_to_A, find_tools_files, generate_new_tools_filename,
+    copy_post_A_to_new_B, copy_post_B_to_A, find_post_files, generate_new_post_filename,
+    list_tools_snapshots, list_post_snapshots,
+    SNAPSHOT_INDEX, TOOLS_PREFIX, POST_PREFIX, snapshot_row, snapshot_tag
+)
+from snapshot_manifest import SNAPSHOT_MANIFEST, scan_with_manifest, describe
+from snapshot_dedup import check_export, scan_duplicates, remove_duplicates
+from parse_cache import ParseCache
+from virtual_tree import VirtualTable
+from jobs import JobRunner, report_progress, report_bytes
+from folder_watch import FolderWatcher
+from pp_diff import read_pp_lines, diff_opcodes, fold_opcodes, iter_pp_rows
+from startup_timing import StartupTimer
+from diagnostics import DIAG, ENV_PROFILE, count, format_counters
+from tool_history import ToolHistory, update_history
+from tool_matrix import build_matrix, row_differs, differing_counts, cell_text, drilldown_pair, column_label
+
+# Schwere Module (pandas, Parser, Diff, urllib) werden erst bei Bedarf importiert
+STARTUP = StartupTimer(_START_TIME)
+STARTUP.add("Imports", time.perf_counter() - _START_TIME)
 
 #Author Nico-RDF
 
@@ -24,131 +43,23 @@ __version__ = "4.1"
 # HIER DEINE GITHUB RAW URL EINTRAGEN:
 # (Gehe auf GitHub auf deine .pyw Datei -> Klicke auf "Raw" -> Kopiere den Link)
 GITHUB_RAW_URL = "https://raw.githubusercontent.com/DEIN_NAME/DEIN_REPO/main/ToolVerwaltung_Final.pyw"
-
-CONFIG_FILE = "last_paths.json"
-
-# ---------------------------------------------------------
-# Benutzername & Initialen
-# ---------------------------------------------------------
-
-def get_user_initials():
-    username = getpass.getuser() or ""
-    clean = username.replace(".", " ").replace("_", " ").replace("-", " ")
-    parts = [p for p in clean.split() if p]
-    if not parts:
-        return "NA"
-    initials = "".join(p[0].upper() for p in parts)
-    return initials
-
-def get_user_display_name():
-    username = getpass.getuser() or ""
-    if not username:
-        return "Unbekannt"
-    clean = username.replace(".", " ").replace("_", " ").replace("-", " ")
-    parts = [p for p in clean.split() if p]
-    if not parts:
-        return username
-    return parts[0].capitalize()
-
-def extract_initials_from_filename(filename):
-    name, ext = os.path.splitext(filename)
-    parts = name.split("_")
-    if len(parts) < 2:
-        return ""
-    return parts[-1]
-
-CURRENT_INITIALS = get_user_initials()
-CURRENT_USER = get_user_display_name()
-
-# ---------------------------------------------------------
-# Pfad-Speicherung
-# ---------------------------------------------------------
-
-def load_last_paths():
-    default = {
-        "path_estlcam_tools": "",
-        "path_onedrive_dir": "",
-        "path_estlcam_exe": "",
-        "path_estlcam_post": "",
-        "path_post_dir": "",
-        "last_sync_tools": {"direction": "", "timestamp": ""},
-        "last_sync_post": {"direction": "", "timestamp": ""},
-        "last_onedrive_files": [],
-        "last_post_files": []
-    }
-    if not os.path.exists(CONFIG_FILE):
-        return default
-    try:
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception:
-        return default
-    for key, value in default.items():
-        if key not in data:
-            data[key] = value
-    return data
-
-def save_last_paths(**kwargs):
-    data = load_last_paths()
-    for key, value in kwargs.items():
-        if value is not None:
-            data[key] = value
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
-
-# ---------------------------------------------------------
-# Dateioperationen Toollisten & Postprozessoren
-# ---------------------------------------------------------
-
-def generate_new_tools_filename(base_dir):
-    now = datetime.now().strftime("%Y-%m-%d_%H-%M")
-    filename = f"ToolList_Powermill_V12_{now}_{CURRENT_INITIALS}.tl"
-    return os.path.join(base_dir, filename)
-
-def copy_tools_A_to_new_B(path_A, dir_B):
-    new_B = generate_new_tools_filename(dir_B)
-    os.makedirs(dir_B, exist_ok=True)
-    with open(path_A, "rb") as src, open(new_B, "wb") as dst:
-        dst.write(src.read())
-    return new_B
-
-def copy_tools_B_to_A(path_B, path_A):
-    with open(path_B, "rb") as src, open(path_A, "wb") as dst:
-        dst.write(src.read())
-    return path_A
-
-def find_tools_files(path_B_dir):
-    if not os.path.isdir(path_B_dir): return []
-    files = [
-        f for f in os.listdir(path_B_dir)
-        if f.startswith("ToolList_Powermill_V12") and os.path.isfile(os.path.join(path_B_dir, f))
-    ]
-    return sorted(files, reverse=True)
-
-def generate_new_post_filename(base_dir):
-    today = datetime.now().strftime("%Y_%m_%d")
-    filename = f"PostprozessorV12_{today}_{CURRENT_INITIALS}"
-    return os.path.join(base_dir, filename)
-
-def copy_post_A_to_new_B(path_A, dir_B):
-    new_B = generate_new_post_filename(dir_B)
-    os.makedirs(dir_B, exist_ok=True)
-    with open(path_A, "rb") as src, open(new_B, "wb") as dst:
-        dst.write(src.read())
-    return new_B
-
-def copy_post_B_to_A(path_B, path_A):
-    with open(path_B, "rb") as src, open(path_A, "wb") as dst:
-        dst.write(src.read())
-    return path_A
-
-def find_post_files(path_post_dir):
-    if not os.path.isdir(path_post_dir): return []
-    files = [
-        f for f in os.listdir(path_post_dir)
-        if f.startswith("PostprozessorV12_") and os.path.isfile(os.path.join(path_post_dir, f))
-    ]
-    return sorted(files, reverse=True)
+# Daneben liegt das Update-Manifest (Version + SHA-256 aller Dateien, siehe updater.py).
+# Fehlt es noch, wird wie bisher nur __version__ aus dem Skript gelesen.
+UPDATE_MANIFEST_URL = GITHUB_RAW_URL.rsplit("/", 1)[0] + "/update_manifest.json"
+# Beim Start höchstens so oft beim Server nachfragen (Sekunden); "Update prüfen" fragt immer
+UPDATE_CHECK_INTERVAL = 6 * 3600
+
+# PP-Vergleich: Zeilen pro Einfüge-Häppchen (erstes Häppchen = erste Bildschirmseite)
+PP_FIRST_BATCH = 100
+PP_BATCH_SIZE = 1500
+# Wie oft der Tk-Thread nach Ordner-Änderungen schaut (ms)
+FOLDER_EVENT_POLL_MS = 500
+# Mehrfach-Vergleich: so viele neueste Snapshots lädt "Neueste aus OneDrive"
+MATRIX_DEFAULT_LATEST = 12
+# Werkzeug-Vergleich: Tools.dat/Snapshots oder exportierte Werkzeugtabellen (tool_table.py)
+COMPARE_FILETYPES = [("Estlcam DAT", "*.dat"), ("Werkzeugtabelle", "*.parquet *.feather *.arrow *.csv"), ("Alle Dateien", "*.*")]
+# Diagnose-Tab: so oft wird nachgesehen, ob neue Messungen da sind (nur solange der Tab offen ist)
+DIAG_REFRESH_MS = 1000
 
 # ---------------------------------------------------------
 # GUI-Logik (Hauptklasse)
@@ -163,8 +74,18 @@ class FileSyncGUI:
         except:
             pass
         self.root.title(f"Estlcam Sync v{__version__} – {CURRENT_USER} ({CURRENT_INITIALS})")
-        
-        self.paths = load_last_paths()
+        self.startup = STARTUP
+
+        with self.startup.step("Konfiguration laden"):
+            # Einmal lesen; danach hält der Konfigurationsspeicher den Stand (auch nach save_last_paths)
+            self.paths = load_last_paths()
+        self.parse_cache = ParseCache()
+
+        # Statuszeile für Hintergrund-Jobs (ganz unten, für alle Tabs)
+        self.job_status = tk.Label(self.root, text="", anchor="w")
+        self.job_status.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+        self.jobs = JobRunner(self.root, max_workers=4, on_status=lambda text: self.job_status.config(text=text))
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -172,19 +93,35 @@ class FileSyncGUI:
         # Tabs erstellen
         self.tab_sync = tk.Frame(self.notebook)
         self.tab_compare = tk.Frame(self.notebook)
+        self.tab_matrix = tk.Frame(self.notebook)
         self.tab_compare_pp = tk.Frame(self.notebook)
+        self.tab_history = tk.Frame(self.notebook)
+        self.tab_diag = tk.Frame(self.notebook)
         self.tab_readme = tk.Frame(self.notebook)
         self.tab_changelog = tk.Frame(self.notebook)
 
         self.notebook.add(self.tab_sync, text="Estlcam Sync")
         self.notebook.add(self.tab_compare, text="Werkzeug Vergleich")
+        self.notebook.add(self.tab_matrix, text="Mehrfach-Vergleich")
         self.notebook.add(self.tab_compare_pp, text="PP Vergleich")
+        self.notebook.add(self.tab_history, text="Werkzeug-Verlauf")
+        self.notebook.add(self.tab_diag, text="Diagnose")
         self.notebook.add(self.tab_readme, text="Readme")
         self.notebook.add(self.tab_changelog, text="Changelog")
 
-        # Inhalt bauen
-        self.build_left_tools_section()
-        self.build_right_post_section()
+        # Inhalt bauen (nur der Sync-Tab sofort, die anderen beim ersten Anklicken)
+        with self.startup.step("build_left_tools_section"): self.build_left_tools_section()
+        with self.startup.step("build_right_post_section"): self.build_right_post_section()
+        self.lazy_tabs = {
+            str(self.tab_compare): self.build_compare_section,
+            str(self.tab_matrix): self.build_matrix_section,
+            str(self.tab_compare_pp): self.build_compare_pp_section,
+            str(self.tab_history): self.build_history_section,
+            str(self.tab_diag): self.build_diag_section,
+            str(self.tab_readme): self.build_readme_section,
+            str(self.tab_changelog): self.build_changelog_section,
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         # --- TAB 1 LAYOUT OPTIMIERUNG (Responsive) ---
         self.tab_sync.columnconfigure(1, weight=1) 
@@ -199,35 +136,63 @@ class FileSyncGUI:
         self.sync_label_post.grid(row=8, column=3, columnspan=3, sticky="w", pady=(5, 10))
 
         # Daten laden
-        self.update_sync_labels()
-        self.update_tables_tools()
-        self.update_tables_post()
-        
-        self.build_compare_section()
-        self.build_compare_pp_section()
-        self.build_readme_section()
-        self.build_changelog_section()
+        with self.startup.step("update_sync_labels"): self.update_sync_labels()
+        with self.startup.step("Ordner-Scans starten"):
+            self.update_tables_tools()
+            self.update_tables_post()
 
         # Update-Button oben rechts
         self.btn_update = ttk.Button(self.root, text="🔄 Update prüfen", command=lambda: self.check_for_updates(manual=True))
         self.btn_update.place(relx=0.99, rely=0.01, anchor="ne")
 
         # Design anwenden
-        self.setup_styles()
-
-        # Verzögerte Checks für sauberen App-Start
-        self.root.after(500, self.check_for_new_tools_files)
-        self.root.after(500, self.check_for_new_post_files)
+        with self.startup.step("setup_styles"): self.setup_styles()
+        if self.startup.enabled: self.root.after_idle(self.on_startup_idle)
+
+        # Live-Überwachung der Snapshot-Ordner. Beim Start gilt der Stand aus
+        # last_paths.json als bekannt -> Neues seit dem letzten Start wird ebenfalls gemeldet.
+        self.own_exports = set()
+        self.watcher = FolderWatcher(SNAPSHOT_INDEX)
+        self.watcher.watch("tools", self.entry_onedrive.get(), TOOLS_PREFIX, self.paths.get("last_onedrive_files") or None)
+        self.watcher.watch("post", self.entry_post_dir.get(), POST_PREFIX, self.paths.get("last_post_files") or None)
+        self.watcher.start()
+        self.root.after(FOLDER_EVENT_POLL_MS, self.poll_folder_events)
         
         # Automatisch stumm nach Updates suchen (nach 3 Sekunden, damit die GUI flüssig lädt)
         self.root.after(3000, lambda: self.check_for_updates(manual=False))
 
+    # ---------------------------------------------------------
+    # Tabs bei Bedarf bauen & Startzeit-Bericht
+    # ---------------------------------------------------------
+    def on_tab_changed(self, event):
+        self.ensure_tab_built(self.notebook.select())
+        if str(self.notebook.select()) == str(self.tab_diag): self.refresh_diag()
+
+    def ensure_tab_built(self, tab):
+        build = self.lazy_tabs.pop(str(tab), None)
+        if build is None: return
+        with self.startup.step(build.__name__): build()
+        # Farben & Tags auch auf die neuen Widgets anwenden
+        self.setup_styles()
+
+    def on_startup_idle(self):
+        self.startup.mark("Fenster bereit")
+        self.report_startup()
+
+    def report_startup(self):
+        # Wartet, bis die Ordner-Scans vom Start fertig sind
+        if self.jobs.active:
+            self.root.after(50, self.report_startup)
+            return
+        self.startup.mark("Ordner-Scans fertig")
+        self.startup.report()
+
     # ---------------------------------------------------------
     # AUTO-UPDATER LOGIK
     # ---------------------------------------------------------
-    def parse_version(self, v_str):
-        # Wandelt "4.0.1" in (4, 0, 1) um, für sauberen Vergleich
-        return tuple(map(int, (v_str.split("."))))
+    def make_updater(self):
+        from updater import Updater
+        return Updater(UPDATE_MANIFEST_URL, __file__, interval=UPDATE_CHECK_INTERVAL, script_url=GITHUB_RAW_URL)
 
     def check_for_updates(self, manual=False):
         if "DEIN_NAME" in GITHUB_RAW_URL:
@@ -235,44 +200,36 @@ class FileSyncGUI:
                 messagebox.showinfo("Updater inaktiv", "Bitte trage erst deine eigene GITHUB_RAW_URL im Code ein, um Updates zu aktivieren.")
             return
 
-        try:
-            req = urllib.request.Request(GITHUB_RAW_URL, headers={'User-Agent': 'Mozilla/5.0'})
-            # Timeout kurz halten, damit die App nicht einfriert
-            with urllib.request.urlopen(req, timeout=3) as response:
-                new_code = response.read().decode('utf-8')
-
-            # Suche nach der Version im geladenen Text
-            match = re.search(r'^__version__\s*=\s*["\']([^"\']+)["\']', new_code, re.MULTILINE)
-            if match:
-                online_version = match.group(1)
-                
-                if self.parse_version(online_version) > self.parse_version(__version__):
-                    answer = messagebox.askyesno("Update verfügbar!", 
-                                                 f"Eine neue Version ({online_version}) ist verfügbar!\n"
-                                                 f"Deine aktuelle Version: {__version__}\n\n"
-                                                 f"Möchtest du das Update jetzt herunterladen und neustarten?")
-                    if answer:
-                        # Schreibe den neuen Code direkt in diese Datei
-                        current_file = os.path.abspath(__file__)
-                        with open(current_file, 'w', encoding='utf-8') as f:
-                            f.write(new_code)
-                        
-                        messagebox.showinfo("Erfolg", "Update wurde installiert. Die Anwendung startet jetzt neu!")
-                        
-                        # Starte die Datei neu und beende die alte Instanz
-                        subprocess.Popen([sys.executable, current_file])
-                        self.root.destroy()
-                        sys.exit()
-                else:
-                    if manual:
-                        messagebox.showinfo("Kein Update", f"Du hast bereits die aktuellste Version ({__version__}).")
-            else:
-                if manual:
-                    messagebox.showerror("Fehler", "Konnte Versionsnummer im Online-Code nicht finden.")
-        
-        except Exception as e:
+        # Netzwerk nur im Hintergrund; beim stillen Start-Check werden Fehler nicht gemeldet
+        updater = self.make_updater()
+        on_error = (lambda e: messagebox.showerror("Netzwerkfehler", f"Konnte nicht nach Updates suchen. Bitte Internetverbindung prüfen.\n\nDetails: {e}")) if manual else None
+        self.jobs.submit("update", updater.check, manual,
+                         on_done=lambda res: self.on_update_checked(updater, res[0], manual),
+                         on_error=on_error, label="Nach Updates suchen")
+
+    def on_update_checked(self, updater, manifest, manual):
+        if not updater.is_newer(manifest, __version__):
             if manual:
-                messagebox.showerror("Netzwerkfehler", f"Konnte nicht nach Updates suchen. Bitte Internetverbindung prüfen.\n\nDetails: {e}")
+                messagebox.showinfo("Kein Update", f"Du hast bereits die aktuellste Version ({__version__}).")
+            return
+
+        online_version = manifest["version"]
+        answer = messagebox.askyesno("Update verfügbar!", 
+                                     f"Eine neue Version ({online_version}) ist verfügbar!\n"
+                                     f"Deine aktuelle Version: {__version__}\n\n"
+                                     f"Möchtest du das Update jetzt herunterladen und neustarten?")
+        if not answer: return
+        self.jobs.submit("update", updater.install, manifest, report_bytes,
+                         on_done=lambda names: self.finish_update(updater, names),
+                         on_error=self.show_job_error, label=f"Update {online_version} herunterladen", keep=True)
+
+    def finish_update(self, updater, names):
+        messagebox.showinfo("Erfolg", f"Update wurde installiert ({len(names)} Dateien geprüft und ersetzt). Die Anwendung startet jetzt neu!")
+
+        # Starte die Datei neu und beende die alte Instanz
+        subprocess.Popen([sys.executable, updater.main_file])
+        self.on_close()
+        sys.exit()
 
     # ---------------------------------------------------------
     # Helles, modernes Design
@@ -298,6 +255,7 @@ class FileSyncGUI:
         self.c_user = "#ea580c"
         self.c_diff = "#ffcc80"
         self.c_miss = "#ef9a9a"
+        self.c_fold = "#f1f5f9"
         entry_bg = "#ffffff"
 
         self.root.configure(bg=bg_main)
@@ -350,11 +308,15 @@ class FileSyncGUI:
             self.table_post_versions.tag_configure("user_current", foreground=self.c_user)
         except: pass
         try:
-            for t in [self.tree1, self.tree2, self.tree_pp]:
+            # Vergleichs-Tabs existieren erst, wenn der Tab einmal geöffnet wurde
+            for name in ("tree1", "tree2", "tree_matrix", "tree_pp"):
+                t = getattr(self, name, None)
+                if t is None: continue
                 t.tag_configure("diff", background=self.c_diff, foreground="")
                 t.tag_configure("missing", background=self.c_miss, foreground="")
                 t.tag_configure("missing1", background=self.c_miss, foreground="")
                 t.tag_configure("missing2", background=self.c_miss, foreground="")
+                if name == "tree_pp": t.tag_configure("fold", background=self.c_fold, foreground="#6b7280")
         except: pass
 
     # ---------------------------------------------------------
@@ -409,13 +371,15 @@ class FileSyncGUI:
 
         tk.Label(self.tab_sync, text="OneDrive – Toollisten", font=("Segoe UI", 9, "bold")).grid(row=4, column=0, columnspan=3, pady=(10, 0), sticky="w", padx=(10, 5))
 
-        self.table_onedrive = ttk.Treeview(self.tab_sync, columns=("name", "user", "date"), show="headings", height=8)
+        self.table_onedrive = ttk.Treeview(self.tab_sync, columns=("name", "user", "date", "info"), show="headings", height=8)
         self.table_onedrive.heading("name", text="Datei")
         self.table_onedrive.heading("user", text="User")
         self.table_onedrive.heading("date", text="Letzte Änderung")
         self.table_onedrive.column("name", width=220)
         self.table_onedrive.column("user", width=60, anchor="center")
         self.table_onedrive.column("date", width=150)
+        self.table_onedrive.heading("info", text="Inhalt")
+        self.table_onedrive.column("info", width=160)
         self.table_onedrive.grid(row=5, column=0, columnspan=3, pady=5, sticky="nsew", padx=(10, 5))
 
         scrollbar_left = ttk.Scrollbar(self.tab_sync, orient="vertical", command=self.table_onedrive.yview)
@@ -453,13 +417,15 @@ class FileSyncGUI:
 
         tk.Label(self.tab_sync, text="Postprozessor-Versionen", font=("Segoe UI", 9, "bold")).grid(row=4, column=4, columnspan=3, pady=(10, 0), sticky="w", padx=(20, 5))
 
-        self.table_post_versions = ttk.Treeview(self.tab_sync, columns=("name", "user", "date"), show="headings", height=8)
+        self.table_post_versions = ttk.Treeview(self.tab_sync, columns=("name", "user", "date", "info"), show="headings", height=8)
         self.table_post_versions.heading("name", text="Datei")
         self.table_post_versions.heading("user", text="User")
         self.table_post_versions.heading("date", text="Letzte Änderung")
         self.table_post_versions.column("name", width=220)
         self.table_post_versions.column("user", width=60, anchor="center")
         self.table_post_versions.column("date", width=150)
+        self.table_post_versions.heading("info", text="Inhalt")
+        self.table_post_versions.column("info", width=160)
         self.table_post_versions.grid(row=5, column=4, columnspan=3, pady=5, sticky="nsew", padx=(20, 5))
         self.table_post_versions.bind("<Button-3>", lambda e: self.show_context_menu_pp(e, self.table_post_versions, is_dir=True))
 
@@ -488,10 +454,12 @@ class FileSyncGUI:
         ttk.Button(top_frame, text="📁 Datei 1 (Oben)", command=self.load_file1).pack(side=tk.LEFT, padx=5)
         self.lbl_file1 = tk.Label(top_frame, text="Keine Datei")
         self.lbl_file1.pack(side=tk.LEFT, padx=15)
+        ttk.Button(top_frame, text="💾 Als Tabelle…", command=lambda: self.export_compare_table(1)).pack(side=tk.LEFT)
 
-        ttk.Button(top_frame, text="📁 Datei 2 (Unten)", command=self.load_file2).pack(side=tk.LEFT, padx=20)
+        ttk.Button(top_frame, text="📁 Datei 2 (Unten)", command=self.load_file2).pack(side=tk.LEFT, padx=(40, 5))
         self.lbl_file2 = tk.Label(top_frame, text="Keine Datei")
         self.lbl_file2.pack(side=tk.LEFT, padx=15)
+        ttk.Button(top_frame, text="💾 Als Tabelle…", command=lambda: self.export_compare_table(2)).pack(side=tk.LEFT)
 
         filter_frame = tk.Frame(self.tab_compare, padx=10, pady=5)
         filter_frame.pack(fill=tk.X)
@@ -515,9 +483,9 @@ class FileSyncGUI:
         frame_t1 = tk.Frame(bot_frame)
         frame_t1.grid(row=1, column=0, sticky="nsew", pady=(0, 15))
         self.tree1 = ttk.Treeview(frame_t1, show="headings")
-        vsb1 = ttk.Scrollbar(frame_t1, orient="vertical", command=self.tree1.yview)
+        vsb1 = ttk.Scrollbar(frame_t1, orient="vertical")
         
-        self.tree1.configure(yscrollcommand=vsb1.set, xscrollcommand=self.on_scroll_t1_x)
+        self.tree1.configure(xscrollcommand=self.on_scroll_t1_x)
         self.tree1.grid(column=0, row=0, sticky='nsew')
         vsb1.grid(column=1, row=0, sticky='ns')
         frame_t1.grid_columnconfigure(0, weight=1)
@@ -529,9 +497,9 @@ class FileSyncGUI:
         frame_t2 = tk.Frame(bot_frame)
         frame_t2.grid(row=3, column=0, sticky="nsew")
         self.tree2 = ttk.Treeview(frame_t2, show="headings")
-        vsb2 = ttk.Scrollbar(frame_t2, orient="vertical", command=self.tree2.yview)
+        vsb2 = ttk.Scrollbar(frame_t2, orient="vertical")
         
-        self.tree2.configure(yscrollcommand=vsb2.set, xscrollcommand=self.on_scroll_t2_x)
+        self.tree2.configure(xscrollcommand=self.on_scroll_t2_x)
         self.tree2.grid(column=0, row=0, sticky='nsew')
         vsb2.grid(column=1, row=0, sticky='ns')
         frame_t2.grid_columnconfigure(0, weight=1)
@@ -541,12 +509,26 @@ class FileSyncGUI:
         self.shared_hsb = ttk.Scrollbar(bot_frame, orient="horizontal", command=self.sync_scroll_x)
         self.shared_hsb.grid(row=4, column=0, sticky='ew', pady=(5,0))
 
+        # Virtuelle Tabellen: nur sichtbare Zeilen existieren als Treeview-Items
+        self.virtual_tables = {
+            self.tree1: VirtualTable(self.tree1, vsb1),
+            self.tree2: VirtualTable(self.tree2, vsb2),
+        }
+
         # Schnelles Scrollen für Werkzeug-Tabellen aktivieren
         self.bind_fast_hscroll(self.tree1)
         self.bind_fast_hscroll(self.tree2)
 
-        self.df1_full = None
-        self.df2_full = None
+        # Offset-Index je Datei (estlcam_dat.ToolsDatIndex bzw. tool_table.ToolTableIndex) – dekodiert wird nur der angezeigte Parametersatz
+        self.compare_index = {1: None, 2: None}
+        self.compare_paths = {1: None, 2: None}
+        # Vom Mehrfach-Vergleich vorgegebener Parametersatz (statt "Standard")
+        self.compare_focus_paramset = None
+        self.compare_results = {}
+        # Zählt bei jedem Laden hoch: Ergebnisse der Hintergrund-Zählung für ein altes Dateipaar verwerfen
+        self.compare_generation = 0
+        self.counted_generation = 0
+        self.paramset_labels = {}
 
     # --- Synchronisations-Methoden für die Scrollbar ---
     def on_scroll_t1_x(self, *args):
@@ -563,24 +545,199 @@ class FileSyncGUI:
     # ---------------------------------------------------
 
     def load_file1(self):
-        filepath = filedialog.askopenfilename(title="Datei 1 (Oben)", filetypes=[("Estlcam DAT", "*.dat")])
+        filepath = filedialog.askopenfilename(title="Datei 1 (Oben)", filetypes=COMPARE_FILETYPES)
         if filepath:
-            self.lbl_file1.config(text=os.path.basename(filepath))
-            self.df1_full = self.read_estlcam_dat_for_compare(filepath)
-            self.update_paramset_dropdown()
-            self.run_comparison()
+            self.load_compare_file(1, filepath)
 
     def load_file2(self):
-        filepath = filedialog.askopenfilename(title="Datei 2 (Unten)", filetypes=[("Estlcam DAT", "*.dat")])
+        filepath = filedialog.askopenfilename(title="Datei 2 (Unten)", filetypes=COMPARE_FILETYPES)
         if filepath:
-            self.lbl_file2.config(text=os.path.basename(filepath))
-            self.df2_full = self.read_estlcam_dat_for_compare(filepath)
-            self.update_paramset_dropdown()
-            self.run_comparison()
+            self.load_compare_file(2, filepath)
 
     def on_paramset_change(self, event):
+        self.compare_focus_paramset = None
         self.run_comparison()
 
+    def load_compare_file(self, side, filepath):
+        label = self.lbl_file1 if side == 1 else self.lbl_file2
+        label.config(text=os.path.basename(filepath))
+
+        def done(index):
+            self.compare_index[side] = index
+            self.compare_paths[side] = filepath
+            c = self.parse_cache.stats()
+            self.status.config(text=f"{os.path.basename(filepath)} geladen ({len(index.paramsets())} Parametersätze, "
+                                    f"Parse-Cache: {c['hits']} Treffer / {c['misses']} neu eingelesen)")
+            self.prepare_comparison()
+
+        self.jobs.submit(f"compare_file{side}", DIAG.timed("compare_open", self.open_compare_index), filepath,
+                         on_done=done, on_error=self.show_job_error, label=f"Werkzeugliste {side} einlesen")
+
+    # --- Werkzeugliste als Tabelle (Parquet/Feather/CSV) speichern ---
+    def export_compare_table(self, side):
+        from tool_table import arrow_available
+        source = self.compare_paths[side]
+        if source is None:
+            messagebox.showinfo("Export", f"Bitte zuerst Datei {side} laden.")
+            return
+        # Ohne pyarrow nur CSV anbieten
+        filetypes = [("Parquet", "*.parquet"), ("Feather", "*.feather"), ("CSV", "*.csv")] if arrow_available() else [("CSV", "*.csv")]
+        target = filedialog.asksaveasfilename(title="Werkzeugliste als Tabelle speichern", filetypes=filetypes,
+                                              defaultextension=filetypes[0][1][1:],
+                                              initialfile=os.path.splitext(os.path.basename(source))[0] + filetypes[0][1][1:])
+        if not target: return
+        self.jobs.submit("export_table", DIAG.timed("table_export", self.write_compare_table), source, target,
+                         on_done=lambda n: self.status.config(text=f"{os.path.basename(target)} gespeichert ({n} Datensätze)"),
+                         on_error=self.show_job_error, label="Tabelle exportieren")
+
+    def write_compare_table(self, source, target):
+        # Hintergrund-Thread: ganze Datei (alle Parametersätze), Tools.dat über den Parse-Cache
+        from tool_table import export_tool_table, is_table_file, read_tool_table
+        if is_table_file(source): df = read_tool_table(source)
+        else:
+            from estlcam_dat import read_estlcam_dat
+            df = self.parse_cache.get_or_parse(source, read_estlcam_dat)
+        return export_tool_table(df, target)
+
+    def show_job_error(self, error):
+        messagebox.showerror("Fehler", f"Vorgang fehlgeschlagen:\n{error}")
+
+    def on_close(self):
+        self.watcher.stop()
+        self.jobs.shutdown()
+        errors = flush_last_paths()
+        if errors: messagebox.showwarning("Einstellungen nicht gespeichert", f"Die Einstellungen konnten nicht gespeichert werden:\n{errors[0]}\n\nDetails im Diagnose-Log.")
+        self.root.destroy()
+
+    # ---------------------------------------------------------
+    # TAB 2b: MEHRFACH-VERGLEICH (viele Toollisten auf einmal)
+    # ---------------------------------------------------------
+    def build_matrix_section(self):
+        top_frame = tk.Frame(self.tab_matrix, padx=10, pady=10)
+        top_frame.pack(fill=tk.X)
+
+        ttk.Button(top_frame, text="📁 Dateien wählen…", command=self.choose_matrix_files).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="☁️ Neueste aus OneDrive:", command=self.load_matrix_latest).pack(side=tk.LEFT, padx=(20, 5))
+        self.matrix_latest_count = tk.IntVar(value=MATRIX_DEFAULT_LATEST)
+        ttk.Spinbox(top_frame, from_=2, to=500, width=4, textvariable=self.matrix_latest_count).pack(side=tk.LEFT)
+        self.lbl_matrix = tk.Label(top_frame, text="Keine Dateien")
+        self.lbl_matrix.pack(side=tk.LEFT, padx=15)
+
+        filter_frame = tk.Frame(self.tab_matrix, padx=10, pady=5)
+        filter_frame.pack(fill=tk.X)
+
+        tk.Label(filter_frame, text="⚙️ Parametersatz:", font=("Segoe UI", 10, "bold")).pack(side=tk.LEFT, padx=5)
+        self.combo_matrix_paramset = ttk.Combobox(filter_frame, state="readonly", width=30)
+        self.combo_matrix_paramset.pack(side=tk.LEFT, padx=10)
+        self.combo_matrix_paramset.bind("<<ComboboxSelected>>", lambda e: self.render_matrix())
+        self.matrix_changes_only = tk.BooleanVar(value=True)
+        ttk.Checkbutton(filter_frame, text="Nur Werkzeuge mit Unterschieden", variable=self.matrix_changes_only, command=self.render_matrix).pack(side=tk.LEFT, padx=15)
+        tk.Label(filter_frame, text="Doppelklick auf eine Zelle öffnet den Unterschied im Werkzeug-Vergleich", fg="#6b7280").pack(side=tk.RIGHT, padx=5)
+
+        bot_frame = tk.Frame(self.tab_matrix, padx=10, pady=10)
+        bot_frame.pack(fill=tk.BOTH, expand=True)
+        bot_frame.columnconfigure(0, weight=1)
+        bot_frame.rowconfigure(0, weight=1)
+
+        self.tree_matrix = ttk.Treeview(bot_frame, show="headings")
+        vsb = ttk.Scrollbar(bot_frame, orient="vertical")
+        hsb = ttk.Scrollbar(bot_frame, orient="horizontal", command=self.tree_matrix.xview)
+        self.tree_matrix.configure(xscrollcommand=hsb.set)
+        self.tree_matrix.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+
+        self.matrix_table = VirtualTable(self.tree_matrix, vsb)
+        self.bind_fast_hscroll(self.tree_matrix)
+        self.tree_matrix.bind("<Double-1>", self.open_matrix_cell)
+
+        self.matrix_result = None
+        self.matrix_rows = []
+        self.matrix_ps_labels = {}
+
+    def choose_matrix_files(self):
+        paths = filedialog.askopenfilenames(title="Toollisten für den Mehrfach-Vergleich", initialdir=self.entry_onedrive.get() or None,
+                                            filetypes=[("Toollisten", "*.tl *.dat"), ("Alle Dateien", "*.*")])
+        if len(paths) >= 2: self.load_matrix(sorted(paths, key=os.path.basename))
+        elif paths: messagebox.showinfo("Mehrfach-Vergleich", "Bitte mindestens zwei Dateien auswählen.")
+
+    def load_matrix_latest(self):
+        try: count = max(2, int(self.matrix_latest_count.get()))
+        except (tk.TclError, ValueError): count = MATRIX_DEFAULT_LATEST
+        # list_tools_snapshots liefert neueste zuerst, die Matrix zeigt alt -> neu
+        entries = list_tools_snapshots(self.entry_onedrive.get())[:count]
+        if len(entries) < 2:
+            messagebox.showinfo("Mehrfach-Vergleich", "Im OneDrive-Ordner liegen weniger als zwei Toollisten.")
+            return
+        self.load_matrix([e.path for e in reversed(entries)])
+
+    def load_matrix(self, paths):
+        self.ensure_tab_built(self.tab_matrix)
+        self.lbl_matrix.config(text=f"{len(paths)} Dateien werden gelesen …")
+        self.jobs.submit("matrix", build_matrix, paths, report_progress,
+                         on_done=self.show_matrix, on_error=self.show_job_error, label=f"Mehrfach-Vergleich ({len(paths)} Dateien)")
+
+    def show_matrix(self, result):
+        self.matrix_result = result
+        counts = differing_counts(result)
+        total = sum(counts.values())
+        self.matrix_ps_labels = {f"Alle – {total} Unterschiede": None}
+        for ps in sorted(counts):
+            self.matrix_ps_labels[f"{ps} – {counts[ps]} Unterschiede" if counts[ps] else f"{ps} – identisch"] = ps
+        self.combo_matrix_paramset["values"] = list(self.matrix_ps_labels)
+        self.combo_matrix_paramset.current(0)
+
+        text = f"{len(result.paths)} Dateien, {total} Werkzeuge mit Unterschieden"
+        if result.errors: text += f", {len(result.errors)} unlesbar (?)"
+        self.lbl_matrix.config(text=text)
+
+        columns = ["ps", "wnr", "name"] + [f"s{i}" for i in range(len(result.paths))]
+        self.tree_matrix["columns"] = columns
+        for col, title, width, anchor in (("ps", "Parametersatz", 120, tk.W), ("wnr", "W-Nr.", 60, tk.CENTER), ("name", "Werkzeugname", 220, tk.W)):
+            self.tree_matrix.heading(col, text=title)
+            self.tree_matrix.column(col, width=width, minwidth=50, stretch=False, anchor=anchor)
+        for i, path in enumerate(result.paths):
+            self.tree_matrix.heading(f"s{i}", text=column_label(path))
+            self.tree_matrix.column(f"s{i}", width=130, minwidth=60, stretch=False, anchor=tk.CENTER)
+        self.render_matrix()
+
+    def render_matrix(self):
+        if self.matrix_result is None: return
+        ps = self.matrix_ps_labels.get(self.combo_matrix_paramset.get())
+        changes_only = self.matrix_changes_only.get()
+        self.matrix_rows = [r for r in self.matrix_result.rows
+                            if (ps is None or r.paramset == ps) and (not changes_only or row_differs(r))]
+
+        def get_row(i):
+            r = self.matrix_rows[i]
+            tags = ()
+            if -1 in r.variants: tags = ("missing",)
+            elif row_differs(r): tags = ("diff",)
+            return [r.paramset, r.tool, r.name] + [cell_text(v) for v in r.variants], tags
+
+        self.matrix_table.set_rows(len(self.matrix_rows), get_row)
+
+    def open_matrix_cell(self, event):
+        iid = self.tree_matrix.identify_row(event.y)
+        if iid not in self.matrix_table.items: return
+        index = self.matrix_table.offset + self.matrix_table.items.index(iid)
+        if index >= len(self.matrix_rows): return
+        row = self.matrix_rows[index]
+        # Spalte "#4" = erster Snapshot; Klick auf die Werkzeug-Spalten nimmt den ersten Snapshot
+        column = max(0, int(self.tree_matrix.identify_column(event.x).lstrip("#") or 1) - 4)
+        if row.variants[column] is None:
+            messagebox.showinfo("Mehrfach-Vergleich", f"{column_label(self.matrix_result.paths[column])} ist unlesbar:\n{self.matrix_result.errors.get(column)}")
+            return
+        pair = drilldown_pair(row, column)
+        if pair is None:
+            self.status.config(text=f"W-Nr. {row.tool} ({row.paramset}) ist in allen Dateien gleich.")
+            return
+        self.ensure_tab_built(self.tab_compare)
+        self.compare_focus_paramset = row.paramset
+        self.load_compare_file(1, self.matrix_result.paths[pair[0]])
+        self.load_compare_file(2, self.matrix_result.paths[pair[1]])
+        self.notebook.select(self.tab_compare)
+
     # ---------------------------------------------------------
     # TAB 3: POSTPROZESSOR VERGLEICH
     # ---------------------------------------------------------
@@ -598,6 +755,13 @@ class FileSyncGUI:
         
         ttk.Button(top_frame, text="🔍 Vergleichen", command=self.run_pp_comparison, style="Estlcam.TButton").pack(side=tk.RIGHT, padx=5)
 
+        # Nur Änderungen anzeigen (lange gleiche Abschnitte werden eingeklappt)
+        self.pp_changes_only = tk.BooleanVar(value=False)
+        self.pp_context = tk.IntVar(value=3)
+        ttk.Spinbox(top_frame, from_=0, to=50, width=4, textvariable=self.pp_context, command=self.render_pp_rows).pack(side=tk.RIGHT, padx=(0, 15))
+        tk.Label(top_frame, text="Kontextzeilen:").pack(side=tk.RIGHT)
+        ttk.Checkbutton(top_frame, text="Nur Änderungen", variable=self.pp_changes_only, command=self.render_pp_rows).pack(side=tk.RIGHT, padx=10)
+
         bot_frame = tk.Frame(self.tab_compare_pp, padx=10, pady=10)
         bot_frame.pack(fill=tk.BOTH, expand=True)
         bot_frame.columnconfigure(0, weight=1)
@@ -626,17 +790,29 @@ class FileSyncGUI:
         
         # Booster für die PP-Tabelle
         self.bind_fast_hscroll(self.tree_pp)
+        self.tree_pp.bind("<Double-1>", self.expand_pp_fold)
 
         self.pp_path1 = None
         self.pp_path2 = None
+        self.pp_result = None
+        self.pp_folds = {}
+        self.pp_queue = []
+        self.pp_after_id = None
 
     def show_context_menu_tools(self, event, tree, is_onedrive):
         item = tree.identify_row(event.y)
         if item:
-            tree.selection_set(item)
+            # Mehrfachauswahl behalten, wenn in die Auswahl hinein geklickt wird
+            if item not in tree.selection(): tree.selection_set(item)
             menu = tk.Menu(self.root, tearoff=0)
             menu.add_command(label="📥 In Vergleich laden: Als Liste 1 (Oben)", command=lambda: self.load_into_compare(tree, 1, is_onedrive))
             menu.add_command(label="📥 In Vergleich laden: Als Liste 2 (Unten)", command=lambda: self.load_into_compare(tree, 2, is_onedrive))
+            if is_onedrive:
+                selected = len(tree.selection())
+                menu.add_command(label=f"🧮 Markierte im Mehrfach-Vergleich öffnen ({selected})", command=lambda: self.load_matrix_selection(tree),
+                                 state=tk.NORMAL if selected >= 2 else tk.DISABLED)
+                menu.add_separator()
+                menu.add_command(label="🧹 Doppelte Toollisten im Ordner aufräumen…", command=lambda: self.dedupe_folder("tools"))
             menu.post(event.x_root, event.y_root)
 
     def load_into_compare(self, tree, side, is_onedrive):
@@ -650,17 +826,15 @@ class FileSyncGUI:
             messagebox.showerror("Fehler", f"Datei nicht gefunden:\n{filepath}")
             return
             
-        if side == 1:
-            self.lbl_file1.config(text=os.path.basename(filepath))
-            self.df1_full = self.read_estlcam_dat_for_compare(filepath)
-        else:
-            self.lbl_file2.config(text=os.path.basename(filepath))
-            self.df2_full = self.read_estlcam_dat_for_compare(filepath)
-            
-        self.update_paramset_dropdown()
-        self.run_comparison()
+        self.ensure_tab_built(self.tab_compare)
+        self.load_compare_file(side, filepath)
         self.notebook.select(self.tab_compare)
 
+    def load_matrix_selection(self, tree):
+        names = sorted(str(tree.item(iid, 'values')[0]) for iid in tree.selection())
+        self.load_matrix([os.path.join(self.entry_onedrive.get(), n) for n in names])
+        self.notebook.select(self.tab_matrix)
+
     def show_context_menu_pp(self, event, tree, is_dir):
         item = tree.identify_row(event.y)
         if item:
@@ -668,6 +842,9 @@ class FileSyncGUI:
             menu = tk.Menu(self.root, tearoff=0)
             menu.add_command(label="📥 In PP Vergleich laden: Als PP 1 (Links)", command=lambda: self.load_into_compare_pp(tree, 1, is_dir))
             menu.add_command(label="📥 In PP Vergleich laden: Als PP 2 (Rechts)", command=lambda: self.load_into_compare_pp(tree, 2, is_dir))
+            if is_dir:
+                menu.add_separator()
+                menu.add_command(label="🧹 Doppelte Postprozessoren im Ordner aufräumen…", command=lambda: self.dedupe_folder("post"))
             menu.post(event.x_root, event.y_root)
 
     def load_into_compare_pp(self, tree, side, is_dir):
@@ -681,6 +858,7 @@ class FileSyncGUI:
             messagebox.showerror("Fehler", f"Datei nicht gefunden:\n{filepath}")
             return
             
+        self.ensure_tab_built(self.tab_compare_pp)
         if side == 1:
             self.lbl_pp_file1.config(text=os.path.basename(filepath))
             self.pp_path1 = filepath
@@ -707,38 +885,252 @@ class FileSyncGUI:
 
     def run_pp_comparison(self):
         if not self.pp_path1 or not self.pp_path2: return
-        
-        try:
-            with open(self.pp_path1, 'r', encoding='utf-8', errors='ignore') as f1:
-                lines1 = [l.rstrip('\n') for l in f1.readlines()]
-            with open(self.pp_path2, 'r', encoding='utf-8', errors='ignore') as f2:
-                lines2 = [l.rstrip('\n') for l in f2.readlines()]
-        except Exception as e:
+        path1, path2 = self.pp_path1, self.pp_path2
+
+        def work():
+            lines1, lines2 = read_pp_lines(path1), read_pp_lines(path2)
+            opcodes = diff_opcodes(lines1, lines2)
+            count("lines", len(lines1) + len(lines2))
+            count("opcodes", len(opcodes))
+            return lines1, lines2, opcodes
+
+        def error(e):
             messagebox.showerror("Fehler", f"Dateien konnten nicht gelesen werden:\n{e}")
-            return
 
+        self.jobs.submit("pp_diff", DIAG.timed("pp_diff", work), on_done=self.show_pp_diff, on_error=error, label="Postprozessoren vergleichen")
+
+    def show_pp_diff(self, result):
+        self.pp_result = result
+        self.render_pp_rows()
+
+    # Zeilen werden häppchenweise per after() eingefügt: Die erste Bildschirmseite
+    # ist sofort da, der Rest folgt, ohne die Oberfläche zu blockieren.
+    def render_pp_rows(self):
+        if self.pp_result is None: return
+        lines1, lines2, opcodes = self.pp_result
+        if self.pp_changes_only.get():
+            try: context = max(0, int(self.pp_context.get()))
+            except (tk.TclError, ValueError): context = 3
+            opcodes = fold_opcodes(opcodes, context)
+
+        if self.pp_after_id is not None: self.root.after_cancel(self.pp_after_id)
+        self.pp_after_id = None
         self.tree_pp.delete(*self.tree_pp.get_children())
-        
-        matcher = difflib.SequenceMatcher(None, lines1, lines2)
-        
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag == 'equal':
-                for l1, l2 in zip(lines1[i1:i2], lines2[j1:j2]):
-                    self.tree_pp.insert("", "end", values=(l1, l2))
-            elif tag == 'replace':
-                sub1 = lines1[i1:i2]
-                sub2 = lines2[j1:j2]
-                for l1, l2 in itertools.zip_longest(sub1, sub2, fillvalue=""):
-                    self.tree_pp.insert("", "end", values=(l1, l2), tags=("diff",))
-            elif tag == 'delete':
-                for l1 in lines1[i1:i2]:
-                    self.tree_pp.insert("", "end", values=(l1, "--- FEHLT ---"), tags=("missing1",))
-            elif tag == 'insert':
-                for l2 in lines2[j1:j2]:
-                    self.tree_pp.insert("", "end", values=("--- FEHLT ---", l2), tags=("missing2",))
+        self.pp_folds = {}
+        self.pp_queue = [(iter_pp_rows(lines1, lines2, opcodes), None)]
+        with DIAG.span("pp_render", opcodes=len(opcodes)): self.insert_pp_batch(PP_FIRST_BATCH)
+
+    def insert_pp_batch(self, batch_size=None):
+        self.pp_after_id = None
+        budget = batch_size or PP_BATCH_SIZE
+        while self.pp_queue and budget > 0:
+            rows, before = self.pp_queue[0]
+            # before: Platzhalter, vor dem eingefügt wird (beim Aufklappen), sonst ans Ende
+            index = self.tree_pp.index(before) if before else "end"
+            inserted = 0
+            for values, tags, fold in itertools.islice(rows, budget):
+                iid = self.tree_pp.insert("", index, values=values, tags=tags)
+                if fold is not None: self.pp_folds[iid] = fold
+                if before: index += 1
+                inserted += 1
+            budget -= inserted
+            count("items_inserted", inserted)
+            if budget > 0:
+                # Quelle erschöpft
+                self.pp_queue.pop(0)
+                if before:
+                    self.pp_folds.pop(before, None)
+                    self.tree_pp.delete(before)
+        if self.pp_queue:
+            self.pp_after_id = self.root.after(1, self.insert_pp_batch)
+
+    def expand_pp_fold(self, event):
+        iid = self.tree_pp.identify_row(event.y)
+        fold = self.pp_folds.get(iid)
+        if fold is None or self.pp_result is None: return
+        if any(before == iid for _, before in self.pp_queue): return "break"
+        lines1, lines2, _ = self.pp_result
+        _, i1, i2, j1, j2 = fold
+        self.pp_queue.append((iter_pp_rows(lines1, lines2, [('equal', i1, i2, j1, j2)]), iid))
+        if self.pp_after_id is None: self.insert_pp_batch()
+        return "break"
+
+    # ---------------------------------------------------------
+    # TAB 4: WERKZEUG-VERLAUF
+    # ---------------------------------------------------------
+    def build_history_section(self):
+        top_frame = tk.Frame(self.tab_history, padx=10, pady=10)
+        top_frame.pack(fill=tk.X)
+
+        tk.Label(top_frame, text="⚙️ Parametersatz:", font=("Segoe UI", 10, "bold")).pack(side=tk.LEFT, padx=5)
+        self.combo_hist_paramset = ttk.Combobox(top_frame, state="readonly", width=25)
+        self.combo_hist_paramset.pack(side=tk.LEFT, padx=5)
+        self.combo_hist_paramset.bind("<<ComboboxSelected>>", self.on_history_paramset_change)
+
+        tk.Label(top_frame, text="Werkzeug:").pack(side=tk.LEFT, padx=(15, 5))
+        self.combo_hist_tool = ttk.Combobox(top_frame, state="readonly", width=35)
+        self.combo_hist_tool.pack(side=tk.LEFT, padx=5)
+        self.combo_hist_tool.bind("<<ComboboxSelected>>", self.on_history_tool_change)
+
+        tk.Label(top_frame, text="Parameter:").pack(side=tk.LEFT, padx=(15, 5))
+        self.combo_hist_param = ttk.Combobox(top_frame, state="readonly", width=20)
+        self.combo_hist_param.pack(side=tk.LEFT, padx=5)
+        self.combo_hist_param.bind("<<ComboboxSelected>>", lambda e: self.show_history())
+
+        ttk.Button(top_frame, text="🔍 Verlauf anzeigen", command=self.show_history, style="Estlcam.TButton").pack(side=tk.RIGHT, padx=5)
+        ttk.Button(top_frame, text="🔄 Index aktualisieren", command=self.update_history_index).pack(side=tk.RIGHT, padx=5)
+
+        self.lbl_history = tk.Label(self.tab_history, text="", anchor="w", padx=15)
+        self.lbl_history.pack(fill=tk.X)
+
+        bot_frame = tk.Frame(self.tab_history, padx=10, pady=10)
+        bot_frame.pack(fill=tk.BOTH, expand=True)
+        bot_frame.columnconfigure(0, weight=1)
+        bot_frame.rowconfigure(0, weight=1)
+
+        columns = ("date", "snapshot", "initials", "param", "old", "new")
+        self.tree_history = ttk.Treeview(bot_frame, show="headings", columns=columns)
+        for col, text, width in zip(columns, ("Datum", "Snapshot", "Kürzel", "Parameter", "Alt", "Neu"), (130, 300, 60, 160, 160, 160)):
+            self.tree_history.heading(col, text=text)
+            self.tree_history.column(col, anchor=tk.W, width=width)
+        vsb = ttk.Scrollbar(bot_frame, orient="vertical", command=self.tree_history.yview)
+        self.tree_history.configure(yscrollcommand=vsb.set)
+        self.tree_history.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+
+        self.history = ToolHistory(self.entry_onedrive.get())
+        self.history_tools = []
+        self.fill_history_filters()
+        self.update_history_index()
+
+    def update_history_index(self):
+        # Neue Snapshots im Hintergrund einlesen, danach Auswahllisten auffrischen
+        self.lbl_history.config(text="Index wird aktualisiert …")
+        self.jobs.submit("history", update_history, self.entry_onedrive.get(), list_tools_snapshots, report_progress,
+                         on_done=self.finish_history_index, on_error=self.show_job_error, label="Werkzeug-Verlauf einlesen")
+
+    def finish_history_index(self, result):
+        self.history, added, removed = result
+        self.fill_history_filters()
+        if added or removed: self.show_history()
+
+    def fill_history_filters(self):
+        count = self.history.snapshot_count()
+        self.lbl_history.config(text=f"{count} Snapshots im Index" if count else "Noch keine Snapshots im Index")
+        paramsets = self.history.paramsets()
+        self.combo_hist_paramset["values"] = paramsets
+        if self.combo_hist_paramset.get() not in paramsets:
+            self.combo_hist_paramset.set(paramsets[0] if paramsets else "")
+        self.on_history_paramset_change()
+
+    def on_history_paramset_change(self, event=None):
+        ps = self.combo_hist_paramset.get()
+        self.history_tools = self.history.tools(ps) if ps else []
+        labels = [f"{tool} – {name}" for tool, name in self.history_tools]
+        current = self.combo_hist_tool.get()
+        self.combo_hist_tool["values"] = labels
+        if current not in labels: self.combo_hist_tool.set(labels[0] if labels else "")
+        self.on_history_tool_change()
+
+    def selected_history_tool(self):
+        idx = self.combo_hist_tool.current()
+        return self.history_tools[idx][0] if 0 <= idx < len(self.history_tools) else None
+
+    def on_history_tool_change(self, event=None):
+        tool = self.selected_history_tool()
+        params = self.history.params(self.combo_hist_paramset.get(), tool) if tool is not None else []
+        current = self.combo_hist_param.get()
+        self.combo_hist_param["values"] = ["Alle"] + params
+        if current not in params: self.combo_hist_param.set("Alle")
+        if event is not None: self.show_history()
+
+    def show_history(self):
+        self.tree_history.delete(*self.tree_history.get_children())
+        tool = self.selected_history_tool()
+        if tool is None: return
+        param = self.combo_hist_param.get()
+        rows = self.history.timeline(self.combo_hist_paramset.get(), tool, None if param in ("", "Alle") else param)
+        # Neueste Änderung oben
+        for r in reversed(rows):
+            old = "–" if r.old is None else r.old
+            new = "entfällt" if r.new is None else r.new
+            self.tree_history.insert("", "end", values=(r.date, r.snapshot, r.initials or "", r.param, old, new))
+
+    # ---------------------------------------------------------
+    # TAB 5: DIAGNOSE (Messpunkte, Log & Profiling)
+    # ---------------------------------------------------------
+    def build_diag_section(self):
+        top_frame = tk.Frame(self.tab_diag, padx=10, pady=10)
+        top_frame.pack(fill=tk.X)
+
+        if DIAG.profile is None: profile = f"Profiling aus – zum Einschalten Umgebungsvariable {ENV_PROFILE}=compare_diff,pp_diff (oder =1 für alle) setzen"
+        else: profile = f"Profiling aktiv ({'alle Messpunkte' if DIAG.profile == '*' else ', '.join(sorted(DIAG.profile))}) → {DIAG.profile_dir}"
+        tk.Label(top_frame, text=f"Log: {DIAG.log_path}\n{profile}", justify=tk.LEFT, anchor="w").pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="📂 Log-Ordner öffnen", command=self.open_diag_folder).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(top_frame, text="🗑 Zurücksetzen", command=self.reset_diag).pack(side=tk.RIGHT, padx=5)
+
+        bot_frame = tk.Frame(self.tab_diag, padx=10, pady=10)
+        bot_frame.pack(fill=tk.BOTH, expand=True)
+        bot_frame.columnconfigure(0, weight=1)
+        bot_frame.rowconfigure(3, weight=1)
+
+        tk.Label(bot_frame, text="Übersicht seit Programmstart", font=("Segoe UI", 10, "bold")).grid(row=0, column=0, sticky="w", pady=(0, 5))
+        columns = ("name", "calls", "last", "avg", "max", "counters")
+        self.tree_diag = ttk.Treeview(bot_frame, show="headings", columns=columns, height=8)
+        for col, text, width in zip(columns, ("Messpunkt", "Aufrufe", "Letzter (ms)", "Ø (ms)", "Max (ms)", "Zähler (letzter Lauf)"), (140, 70, 100, 100, 100, 700)):
+            self.tree_diag.heading(col, text=text)
+            self.tree_diag.column(col, anchor=tk.W if col in ("name", "counters") else tk.E, width=width, stretch=col == "counters")
+        self.tree_diag.grid(row=1, column=0, columnspan=2, sticky="ew")
+
+        tk.Label(bot_frame, text="Letzte Läufe", font=("Segoe UI", 10, "bold")).grid(row=2, column=0, sticky="w", pady=(10, 5))
+        columns = ("time", "name", "ms", "thread", "counters")
+        self.tree_diag_recent = ttk.Treeview(bot_frame, show="headings", columns=columns)
+        for col, text, width in zip(columns, ("Zeit", "Messpunkt", "Dauer (ms)", "Thread", "Zähler"), (140, 140, 100, 140, 650)):
+            self.tree_diag_recent.heading(col, text=text)
+            self.tree_diag_recent.column(col, anchor=tk.E if col == "ms" else tk.W, width=width, stretch=col == "counters")
+        vsb = ttk.Scrollbar(bot_frame, orient="vertical", command=self.tree_diag_recent.yview)
+        self.tree_diag_recent.configure(yscrollcommand=vsb.set)
+        self.tree_diag_recent.grid(row=3, column=0, sticky="nsew")
+        vsb.grid(row=3, column=1, sticky="ns")
+
+        self.diag_version = None
+        self.diag_after_id = None
+
+    def refresh_diag(self):
+        # Zeichnet nur neu, wenn seit dem letzten Mal gemessen wurde; läuft nur, solange der Tab offen ist
+        if str(self.tab_diag) in self.lazy_tabs: return
+        if self.diag_after_id is not None: self.root.after_cancel(self.diag_after_id)
+        self.diag_after_id = None
+        if str(self.notebook.select()) != str(self.tab_diag): return
+
+        if DIAG.version != self.diag_version:
+            self.diag_version = DIAG.version
+            self.tree_diag.delete(*self.tree_diag.get_children())
+            for name, calls, last, avg, worst, counters in DIAG.summary():
+                self.tree_diag.insert("", "end", values=(name, calls, f"{last * 1000:.1f}", f"{avg * 1000:.1f}", f"{worst * 1000:.1f}", format_counters(counters)))
+            # Parse-Cache seit Programmstart (Treffer = Tools.dat ohne erneutes Einlesen)
+            self.tree_diag.insert("", "end", values=("Parse-Cache", "", "", "", "", format_counters(self.parse_cache.stats())))
+            self.tree_diag_recent.delete(*self.tree_diag_recent.get_children())
+            # Neueste oben
+            for entry in reversed(DIAG.recent()):
+                name = entry["name"] + (f" ⚠ {entry['error']}" if "error" in entry else "") + (" (profiliert)" if "profile" in entry else "")
+                self.tree_diag_recent.insert("", "end", values=(entry["time"], name, f"{entry['ms']:.1f}", entry["thread"], format_counters(entry["counters"])))
+        self.diag_after_id = self.root.after(DIAG_REFRESH_MS, self.refresh_diag)
+
+    def reset_diag(self):
+        DIAG.reset()
+        self.refresh_diag()
+
+    def open_diag_folder(self):
+        folder = os.path.dirname(DIAG.log_path)
+        try:
+            os.makedirs(folder, exist_ok=True)
+            os.startfile(folder)
+        except (AttributeError, OSError) as e:
+            messagebox.showinfo("Log-Ordner", f"{folder}\n\n({e})")
 
     # ---------------------------------------------------------
-    # TAB 4 & 5: README & CHANGELOG
+    # TAB 6 & 7: README & CHANGELOG
     # ---------------------------------------------------------
     def build_text_tab(self, parent_frame, filename):
         text_widget = tk.Text(parent_frame, wrap="word", font=("Consolas", 10))
@@ -780,58 +1172,116 @@ class FileSyncGUI:
     # ---------------------------------------------------------
 
     def update_tables_tools(self):
-        self.table_estlcam.delete(*self.table_estlcam.get_children())
-        path_A = self.entry_estlcam_tools.get()
-
-        if os.path.isfile(path_A):
-            mtime = os.path.getmtime(path_A)
-            dt = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
-            self.table_estlcam.insert("", "end", values=("Tools.dat", "", dt))
-
-        self.table_onedrive.delete(*self.table_onedrive.get_children())
-        path_B_dir = self.entry_onedrive.get()
-
-        if not os.path.isdir(path_B_dir): return
-        files_sorted = find_tools_files(path_B_dir)
-        if not files_sorted: return
-
-        latest = files_sorted[0]
-        for f in files_sorted:
-            full = os.path.join(path_B_dir, f)
-            mtime = os.path.getmtime(full)
-            dt = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
-            initials = extract_initials_from_filename(f)
-            tag = "latest" if f == latest else "normal"
-            if initials == CURRENT_INITIALS:
-                tag = "user_current"
-            self.table_onedrive.insert("", "end", values=(f, initials, dt), tags=(tag,))
+        dir_path = self.entry_onedrive.get()
+        self.jobs.submit("scan_tools", self.startup.timed("Ordner-Scan Toollisten", DIAG.timed("scan_tools", scan_with_manifest)), self.entry_estlcam_tools.get(), dir_path, list_tools_snapshots, "Tools.dat",
+                         on_done=lambda res: self.fill_snapshot_tables(self.table_estlcam, self.table_onedrive, res, "tools", dir_path),
+                         on_error=self.show_job_error, label="Toollisten-Ordner lesen")
 
     def update_tables_post(self):
-        self.table_post_estlcam.delete(*self.table_post_estlcam.get_children())
-        path_post = self.entry_estlcam_post.get()
-
-        if os.path.isfile(path_post):
-            mtime = os.path.getmtime(path_post)
-            dt = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
-            self.table_post_estlcam.insert("", "end", values=(os.path.basename(path_post), "", dt))
+        dir_path = self.entry_post_dir.get()
+        self.jobs.submit("scan_post", self.startup.timed("Ordner-Scan Postprozessoren", DIAG.timed("scan_post", scan_with_manifest)), self.entry_estlcam_post.get(), dir_path, list_post_snapshots, None,
+                         on_done=lambda res: self.fill_snapshot_tables(self.table_post_estlcam, self.table_post_versions, res, "post", dir_path),
+                         on_error=self.show_job_error, label="Postprozessor-Ordner lesen")
+
+    def fill_snapshot_tables(self, table_current, table_versions, result, key, dir_path):
+        current_row, rows, missing = result
+        table_current.delete(*table_current.get_children())
+        if current_row is not None:
+            table_current.insert("", "end", values=current_row)
+
+        table_versions.delete(*table_versions.get_children())
+        for f, initials, dt, tag, record in rows:
+            table_versions.insert("", "end", values=(f, initials, dt, describe(record)), tags=(tag,))
+        if missing: self.rebuild_manifest(key, dir_path, missing)
+
+    # --- Manifest im Sync-Ordner ---
+    def refresh_tables(self, key):
+        if key == "tools": self.update_tables_tools()
+        else: self.update_tables_post()
+
+    def rebuild_manifest(self, key, dir_path, entries):
+        # Fehlende Manifest-Einträge im Hintergrund nachtragen, danach Tabelle neu füllen.
+        # Läuft schon ein Nachtrag für diesen Ordner, nicht noch einmal anstoßen.
+        channel = f"manifest_rebuild_{key}"
+        if channel in self.jobs.active: return
+        # Nur neu füllen, wenn etwas nachgetragen wurde (sonst Endlosschleife bei gesperrten Dateien)
+        self.jobs.submit(channel, SNAPSHOT_MANIFEST.rebuild, dir_path, entries, report_progress,
+                         on_done=lambda done: done and self.refresh_tables(key),
+                         on_error=self.show_job_error, label=f"Manifest ergänzen ({len(entries)} Dateien)")
+
+    def record_export(self, key, new_file):
+        # Eigener Kanal und keep: ein Nachtrag oder der nächste Export darf den Eintrag nicht verschlucken
+        self.jobs.submit(f"manifest_record_{key}", SNAPSHOT_MANIFEST.record_export, new_file,
+                         on_done=lambda _: self.refresh_tables(key),
+                         on_error=self.show_job_error, label="Manifest-Eintrag schreiben", keep=True)
+
+    # --- Doppelte Snapshots ---
+    def identical_export_choice(self, key, dir_path, match, digest, new_path):
+        # Rückgabe: "copy" (trotzdem kopieren) oder "done" (als Alias vermerkt bzw. übersprungen)
+        alias_name = os.path.basename(new_path)
+        if alias_name == match.name:
+            # Gleicher Dateiname (z. B. Postprozessor am selben Tag) – da gibt es nichts zu vermerken
+            self.status.config(text=f"Unverändert – {match.name} ist bereits aktuell.")
+            messagebox.showinfo("Keine Änderung", f"Der Inhalt ist identisch mit\n{match.name}\n\nEs wurde keine neue Kopie angelegt.")
+            return "done"
+
+        record = SNAPSHOT_MANIFEST.records(dir_path).get(match.name)
+        who = f" (exportiert von {record['initials']})" if record and record.get("initials") else ""
+        answer = messagebox.askyesnocancel(
+            "Identischer Stand",
+            f"Der Inhalt ist identisch mit der vorhandenen Datei\n{match.name}{who}.\n\n"
+            "Ja: nur als Export vermerken (keine neue Kopie)\n"
+            "Nein: trotzdem eine neue Kopie anlegen\n"
+            "Abbrechen: Export überspringen")
+        if answer is False: return "copy"
+        if answer is None:
+            self.status.config(text=f"Export übersprungen – identisch mit {match.name}")
+            return "done"
+
+        self.own_exports.add(alias_name)
+        self.jobs.submit(f"manifest_record_{key}", SNAPSHOT_MANIFEST.record_alias, dir_path, alias_name, match.name, digest, match.size,
+                         on_done=lambda _: self.refresh_tables(key),
+                         on_error=self.show_job_error, label="Export vermerken", keep=True)
+        sync_key, direction = ("last_sync_tools", "estlcam_to_onedrive") if key == "tools" else ("last_sync_post", "estlcam_to_postdir")
+        save_last_paths(**{sync_key: {"direction": direction, "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}})
+        self.update_sync_labels()
+        self.status.config(text=f"Als Export vermerkt: {alias_name} = {match.name} (keine neue Kopie)")
+        return "done"
 
-        self.table_post_versions.delete(*self.table_post_versions.get_children())
-        path_dir = self.entry_post_dir.get()
+    def dedupe_folder(self, key):
+        dir_path = self.entry_onedrive.get() if key == "tools" else self.entry_post_dir.get()
+        if not os.path.isdir(dir_path):
+            messagebox.showerror("Fehler", "Ordner existiert nicht.")
+            return
+        list_snapshots = list_tools_snapshots if key == "tools" else list_post_snapshots
+        self.jobs.submit(f"dedupe_{key}", scan_duplicates, dir_path, list_snapshots, SNAPSHOT_MANIFEST, report_progress,
+                         on_done=lambda groups: self.confirm_dedupe(key, dir_path, groups),
+                         on_error=self.show_job_error, label="Doppelte Snapshots suchen")
+
+    def confirm_dedupe(self, key, dir_path, groups):
+        if not groups:
+            messagebox.showinfo("Aufräumen", "Keine doppelten Snapshots gefunden.")
+            return
+        n = sum(len(g.remove) for g in groups)
+        size = sum(g.size * len(g.remove) for g in groups)
+        lines = [f"{e.name}  =  {g.keep.name}" for g in groups for e in g.remove]
+        if len(lines) > 15: lines = lines[:15] + [f"… und {len(lines) - 15} weitere"]
+        if not messagebox.askyesno(
+                "Doppelte Snapshots",
+                f"{n} Dateien ({size / 1e6:.1f} MB) haben exakt denselben Inhalt wie eine ältere Datei:\n\n"
+                + "\n".join(lines) + "\n\nJetzt entfernen? Sie bleiben im Manifest als Export vermerkt. "
+                "Die neueste Datei im Ordner wird nie entfernt."):
+            return
+        self.jobs.submit(f"dedupe_{key}", remove_duplicates, dir_path, groups, SNAPSHOT_MANIFEST, report_progress,
+                         on_done=lambda res: self.finish_dedupe(key, res),
+                         on_error=self.show_job_error, label=f"{n} doppelte Snapshots entfernen", keep=True)
 
-        if not os.path.isdir(path_dir): return
-        files_sorted = find_post_files(path_dir)
-        if not files_sorted: return
-
-        latest = files_sorted[0]
-        for f in files_sorted:
-            full = os.path.join(path_dir, f)
-            mtime = os.path.getmtime(full)
-            dt = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
-            initials = extract_initials_from_filename(f)
-            tag = "latest" if f == latest else "normal"
-            if initials == CURRENT_INITIALS:
-                tag = "user_current"
-            self.table_post_versions.insert("", "end", values=(f, initials, dt), tags=(tag,))
+    def finish_dedupe(self, key, result):
+        removed, freed, errors = result
+        self.refresh_tables(key)
+        self.status.config(text=f"Aufgeräumt: {len(removed)} doppelte Snapshots entfernt ({freed / 1e6:.1f} MB frei)")
+        if errors:
+            messagebox.showwarning("Aufräumen", "Nicht alles konnte entfernt werden:\n\n" + "\n".join(errors[:15]))
 
     def update_sync_labels(self):
         sync_tools = self.paths.get("last_sync_tools", {})
@@ -855,25 +1305,65 @@ class FileSyncGUI:
             else: text = f"Postprozessoren – letzte Synchronisierung: Exportordner → Estlcam am {time_p}"
             self.sync_label_post.config(text=text)
 
-    def check_for_new_tools_files(self):
-        path_B_dir = self.paths["path_onedrive_dir"]
-        if not os.path.isdir(path_B_dir): return
-        current_files = find_tools_files(path_B_dir)
-        old_files = self.paths.get("last_onedrive_files", [])
-        new_files = [f for f in current_files if f not in old_files]
-        if new_files:
-            messagebox.showinfo("Neue Toollisten in OneDrive", "Seit dem letzten Start wurden neue ToolList-Dateien in OneDrive gefunden:\n\n" + "\n".join(new_files))
-        save_last_paths(last_onedrive_files=current_files)
-
-    def check_for_new_post_files(self):
-        path_dir = self.paths["path_post_dir"]
-        if not os.path.isdir(path_dir): return
-        current_files = find_post_files(path_dir)
-        old_files = self.paths.get("last_post_files", [])
-        new_files = [f for f in current_files if f not in old_files]
-        if new_files:
-            messagebox.showinfo("Neue Postprozessor-Versionen", "Seit dem letzten Start wurden neue Postprozessor-Dateien gefunden:\n\n" + "\n".join(new_files))
-        save_last_paths(last_post_files=current_files)
+    # --- Live-Ordnerüberwachung ---
+    def poll_folder_events(self):
+        try:
+            while True:
+                try: change = self.watcher.events.get_nowait()
+                except queue.Empty: break
+                self.apply_folder_change(change)
+        finally:
+            self.root.after(FOLDER_EVENT_POLL_MS, self.poll_folder_events)
+
+    def apply_folder_change(self, change):
+        if change.key == "tools":
+            table, current_dir, files_key = self.table_onedrive, self.entry_onedrive.get(), "last_onedrive_files"
+            title, what = "Neue Toollisten in OneDrive", "ToolList-Dateien in OneDrive"
+        else:
+            table, current_dir, files_key = self.table_post_versions, self.entry_post_dir.get(), "last_post_files"
+            title, what = "Neue Postprozessor-Versionen", "Postprozessor-Dateien"
+        # Ereignis für einen inzwischen abgewählten Ordner
+        if os.path.abspath(change.path) != os.path.abspath(current_dir): return
+
+        records = SNAPSHOT_MANIFEST.records(change.path) if change.added else {}
+        self.apply_snapshot_changes(table, change, records)
+        save_last_paths(**{files_key: [e.name for e in change.snapshots]})
+
+        foreign = [f for f in change.added if f not in self.own_exports]
+        if change.added or change.removed:
+            self.status.config(text=f"Ordner aktualisiert: {len(change.added)} neu, {len(change.removed)} entfernt")
+        # Von anderen Rechnern exportierte Dateien haben ihren Eintrag meist schon mitgebracht
+        missing = SNAPSHOT_MANIFEST.missing([e for e in change.snapshots if e.name in change.added and e.name not in self.own_exports], records)
+        if missing: self.rebuild_manifest(change.key, change.path, missing)
+        # Verlauf nur nachführen, wenn der Tab schon benutzt wird
+        if change.key == "tools" and str(self.tab_history) not in self.lazy_tabs: self.update_history_index()
+        if foreign:
+            lines = []
+            for f in foreign:
+                rec = records.get(f)
+                lines.append(f"{f}  ({rec.get('initials') or '?'}, {describe(rec)})" if rec else f)
+            messagebox.showinfo(title, f"Neue {what} gefunden:\n\n" + "\n".join(lines))
+
+    def apply_snapshot_changes(self, table, change, records=None):
+        # Nur die betroffenen Zeilen einfügen/löschen statt die Tabelle neu aufzubauen
+        entries = {e.name: e for e in change.snapshots}
+        latest = change.snapshots[0].name if change.snapshots else None
+        items = {str(table.item(iid, "values")[0]): iid for iid in table.get_children()}
+
+        for name in change.removed:
+            iid = items.pop(name, None)
+            if iid is not None: table.delete(iid)
+        for name in change.added:
+            if name in items or name not in entries: continue
+            f, initials, dt, tag, record = snapshot_row(entries[name], name == latest, (records or {}).get(name))
+            # Tabelle ist absteigend nach Dateiname sortiert
+            index = sum(1 for other in items if other > name)
+            items[name] = table.insert("", index, values=(f, initials, dt, describe(record)), tags=(tag,))
+
+        # Die Markierung "neueste Datei" kann gewandert sein
+        for k, iid in enumerate(table.get_children()):
+            if k == 0 or "latest" in table.item(iid, "tags"):
+                table.item(iid, tags=(snapshot_tag(str(table.item(iid, "values")[0]), k == 0),))
 
     # ---------------------------------------------------------
     # Buttons und Aktionen
@@ -894,6 +1384,8 @@ class FileSyncGUI:
             self.entry_onedrive.insert(0, dir_path)
             save_last_paths(path_onedrive_dir=self.entry_onedrive.get())
             self.update_tables_tools()
+            self.watcher.watch("tools", dir_path, TOOLS_PREFIX)
+            if str(self.tab_history) not in self.lazy_tabs: self.update_history_index()
 
     def select_estlcam_post(self):
         file_path = filedialog.askopenfilename(title="Estlcam Postprozessor-Datei auswählen")
@@ -910,6 +1402,7 @@ class FileSyncGUI:
             self.entry_post_dir.insert(0, dir_path)
             save_last_paths(path_post_dir=self.entry_post_dir.get())
             self.update_tables_post()
+            self.watcher.watch("post", dir_path, POST_PREFIX)
 
     def select_estlcam_exe(self):
         file_path = filedialog.askopenfilename(title="Estlcam Programmdatei auswählen", filetypes=[("EXE Dateien", "*.exe"), ("Alle Dateien", "*.*")])
@@ -928,14 +1421,28 @@ class FileSyncGUI:
             messagebox.showerror("Fehler", "OneDrive-Ordner existiert nicht.")
             return
 
-        new_B = copy_tools_A_to_new_B(path_A, path_B_dir)
+        # Vorher im Hintergrund prüfen, ob genau dieser Stand schon in OneDrive liegt
+        self.jobs.submit("export_tools", check_export, path_A, path_B_dir, list_tools_snapshots,
+                         on_done=lambda res: self.export_tools(path_A, path_B_dir, *res),
+                         on_error=self.show_job_error, label="Tools.dat mit OneDrive abgleichen")
+
+    def export_tools(self, path_A, path_B_dir, match, digest):
+        if match is not None and self.identical_export_choice("tools", path_B_dir, match, digest, generate_new_tools_filename(path_B_dir)) == "done": return
+
+        # Name schon vorher merken, damit die Ordnerüberwachung den eigenen Export nicht meldet
+        self.own_exports.add(os.path.basename(generate_new_tools_filename(path_B_dir)))
+        self.jobs.submit("export_tools", copy_tools_A_to_new_B, path_A, path_B_dir, report_bytes,
+                         on_done=lambda new_B: self.finish_export_tools(path_A, path_B_dir, new_B),
+                         on_error=self.show_job_error, label="Tools.dat nach OneDrive kopieren", keep=True)
+
+    def finish_export_tools(self, path_A, path_B_dir, new_B):
+        self.own_exports.add(os.path.basename(new_B))
         save_last_paths(
             path_estlcam_tools=path_A, path_onedrive_dir=path_B_dir,
             last_sync_tools={"direction": "estlcam_to_onedrive", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
             last_onedrive_files=find_tools_files(path_B_dir)
         )
-        self.paths = load_last_paths()
-        self.update_tables_tools()
+        self.record_export("tools", new_B)
         self.update_sync_labels()
         self.status.config(text=f"Neue ToolList in OneDrive erstellt: {os.path.basename(new_B)}")
         messagebox.showinfo("Erfolg", f"Tools.dat wurde nach\n{new_B}\nexportiert.")
@@ -962,13 +1469,16 @@ class FileSyncGUI:
             messagebox.showerror("Fehler", "Kein Zielpfad für Estlcam Tools.dat angegeben.")
             return
 
-        copy_tools_B_to_A(selected_file, path_A)
+        self.jobs.submit("import_tools", copy_tools_B_to_A, selected_file, path_A, report_bytes,
+                         on_done=lambda _: self.finish_import_tools(path_A, path_B_dir, filename),
+                         on_error=self.show_job_error, label=f"{filename} nach Estlcam kopieren", keep=True)
+
+    def finish_import_tools(self, path_A, path_B_dir, filename):
         save_last_paths(
             path_estlcam_tools=path_A, path_onedrive_dir=path_B_dir,
             last_sync_tools={"direction": "onedrive_to_estlcam", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
             last_onedrive_files=find_tools_files(path_B_dir)
         )
-        self.paths = load_last_paths()
         self.update_tables_tools()
         self.update_sync_labels()
         self.status.config(text=f"{filename} wurde in Estlcam übernommen.")
@@ -984,14 +1494,26 @@ class FileSyncGUI:
             messagebox.showerror("Fehler", "Postprozessor-Exportordner existiert nicht.")
             return
 
-        new_file = copy_post_A_to_new_B(path_post, path_dir)
+        self.jobs.submit("export_post", check_export, path_post, path_dir, list_post_snapshots,
+                         on_done=lambda res: self.export_post(path_post, path_dir, *res),
+                         on_error=self.show_job_error, label="Postprozessor mit Exportordner abgleichen")
+
+    def export_post(self, path_post, path_dir, match, digest):
+        if match is not None and self.identical_export_choice("post", path_dir, match, digest, generate_new_post_filename(path_dir)) == "done": return
+
+        self.own_exports.add(os.path.basename(generate_new_post_filename(path_dir)))
+        self.jobs.submit("export_post", copy_post_A_to_new_B, path_post, path_dir, report_bytes,
+                         on_done=lambda new_file: self.finish_export_post(path_post, path_dir, new_file),
+                         on_error=self.show_job_error, label="Postprozessor in den Exportordner kopieren", keep=True)
+
+    def finish_export_post(self, path_post, path_dir, new_file):
+        self.own_exports.add(os.path.basename(new_file))
         save_last_paths(
             path_estlcam_post=path_post, path_post_dir=path_dir,
             last_sync_post={"direction": "estlcam_to_postdir", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
             last_post_files=find_post_files(path_dir)
         )
-        self.paths = load_last_paths()
-        self.update_tables_post()
+        self.record_export("post", new_file)
         self.update_sync_labels()
         self.status.config(text=f"Neuer Postprozessor exportiert: {os.path.basename(new_file)}")
         messagebox.showinfo("Erfolg", f"Postprozessor wurde nach\n{new_file}\nexportiert.")
@@ -1018,13 +1540,16 @@ class FileSyncGUI:
             messagebox.showerror("Fehler", "Kein Zielpfad für Estlcam Postprozessor-Datei angegeben.")
             return
 
-        copy_post_B_to_A(selected_file, path_post)
+        self.jobs.submit("import_post", copy_post_B_to_A, selected_file, path_post, report_bytes,
+                         on_done=lambda _: self.finish_import_post(path_post, path_dir, filename),
+                         on_error=self.show_job_error, label=f"{filename} nach Estlcam kopieren", keep=True)
+
+    def finish_import_post(self, path_post, path_dir, filename):
         save_last_paths(
             path_estlcam_post=path_post, path_post_dir=path_dir,
             last_sync_post={"direction": "postdir_to_estlcam", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
             last_post_files=find_post_files(path_dir)
         )
-        self.paths = load_last_paths()
         self.update_tables_post()
         self.update_sync_labels()
         self.status.config(text=f"{filename} wurde als aktiver Postprozessor übernommen.")
@@ -1045,204 +1570,137 @@ class FileSyncGUI:
     # Werkzeug-Vergleich (Tab 2) - Estlcam Binär-Parser & Diff
     # ---------------------------------------------------------
 
-    def read_estlcam_dat_for_compare(self, filepath):
-        with gzip.open(filepath, 'rb') as f:
-            data = f.read()
-
-        records, current_record, current_tool_base, global_paramsets = [], {}, {}, []
-        pos = 0
+    def open_compare_index(self, filepath):
+        # Läuft im Hintergrund-Thread: hier keine Tk-Aufrufe!
+        # Nur entpacken + Grenzen suchen; die Rohdaten-Hashes gleich mit, damit das
+        # Dropdown gleiche Parametersätze ohne Dekodieren als "identisch" zeigen kann.
+        from estlcam_dat import open_tools_index
+        from tool_table import is_table_file, open_table_index
+        # Exportierte Werkzeugtabellen (Parquet/Feather/CSV) direkt, ohne Tools.dat
+        if is_table_file(filepath): index = open_table_index(filepath)
+        else: index = open_tools_index(filepath, cache=self.parse_cache)
+        for ps in index.paramsets(): index.raw_digest(ps)
+        count("paramsets", len(index.paramsets()))
+        return index
+
+    def compare_paramset(self, idx1, idx2, ps):
+        # Hintergrund-Thread (count_paramsets)
+        from tool_diff import compare_tool_tables
+        if ps in idx1.paramsets() and ps in idx2.paramsets() and idx1.raw_digest(ps) == idx2.raw_digest(ps): return [], [], [], {}
+        return compare_tool_tables(idx1.frame(ps), idx2.frame(ps))
+
+    def prepare_comparison(self):
+        # Nach jedem Laden: Dropdown neu aufbauen, zuerst wird nur der gewählte Parametersatz
+        # dekodiert + verglichen. Die übrigen folgen danach im Hintergrund (count_paramsets).
+        self.compare_results = {}
+        self.compare_generation += 1
+        self.update_paramset_dropdown(keep_selection=False)
+        self.run_comparison()
 
-        while pos < len(data):
-            key_len = data[pos]
-            if key_len == 0 or key_len > 50: pos += 1; continue
-            key_bytes = data[pos+1:pos+1+key_len]
-            if not all(32 <= b < 127 for b in key_bytes): pos += 1; continue
-            key = key_bytes.decode('ascii')
-            next_pos = pos + 1 + key_len
-            
-            if key == 'Last':
-                if next_pos < len(data):
-                    str_len = data[next_pos]
-                    if next_pos + 1 + str_len <= len(data):
-                        val_bytes = data[next_pos+1 : next_pos+1+str_len]
-                        try: val = val_bytes.decode('utf-8')
-                        except UnicodeDecodeError: val = val_bytes.decode('latin-1', errors='ignore')
-                        if val not in global_paramsets: global_paramsets.append(val)
-                        pos = next_pos + 1 + str_len
-                        continue
-
-            if next_pos + 2 <= len(data):
-                type_indicator = data[next_pos:next_pos+2]
-                val = None
-                if type_indicator == b'\x01D':
-                    if next_pos + 2 + 8 <= len(data):
-                        val = struct.unpack('<d', data[next_pos+2:next_pos+2+8])[0]
-                        next_pos += 2 + 8
-                elif type_indicator == b'\x01S':
-                    if next_pos + 2 < len(data):
-                        str_len = data[next_pos+2]
-                        if next_pos + 3 + str_len <= len(data):
-                            val_bytes = data[next_pos+3:next_pos+3+str_len]
-                            try: val = val_bytes.decode('utf-8')
-                            except UnicodeDecodeError: val = val_bytes.decode('latin-1', errors='ignore')
-                            next_pos += 3 + str_len
-                
-                if val is not None:
-                    if key in ['Number', 'Name']:
-                        if key == 'Number' and 'Name' in current_record:
-                            records.append(current_record)
-                            current_record = {'Paramset': 'Standard'}
-                            current_tool_base = {}
-                        elif key == 'Name' and 'Name' in current_record:
-                            records.append(current_record)
-                            current_record = {'Paramset': 'Standard'}
-                            current_tool_base = {}
-                            
-                    elif key == 'Suitability':
-                        if current_record: records.append(current_record)
-                        current_record = current_tool_base.copy()
-                        idx = int(val) - 2
-                        if 0 <= idx < len(global_paramsets): current_record['Paramset'] = global_paramsets[idx]
-                        else: current_record['Paramset'] = f"Paramset {int(val)}"
-                    
-                    current_record[key] = val
-                    if key in ['Number', 'Name', 'Diameter', 'Flutes']: current_tool_base[key] = val
-                        
-                    pos = next_pos
-                    continue
-            pos += 1
-
-        if current_record and 'Name' in current_record: records.append(current_record)
-
-        df = pd.DataFrame(records)
-        if df.empty: return df
-        
-        if 'Paramset' not in df.columns: df['Paramset'] = 'Standard'
-        df['Paramset'] = df['Paramset'].fillna('Standard')
-        
-        if 'F' in df.columns: df['F_mm_min'] = (df['F'] * 60).round(0)
-        if 'Number' in df.columns: df['Number'] = df['Number'].fillna(0).astype(int)
-        
-        rename_map = {
-            'Number': 'W-Nr.', 'Name': 'Werkzeugname', 'Diameter': 'Ø (mm)', 
-            'Flutes': 'Zähne', 'Dpp': 'Zustellung', 'F_mm_min': 'Vorschub', 'Rpm': 'Drehzahl',
-            'Fz': 'Vorschub/Zahn', 'Plunge_Angle': 'Eintauchwinkel', 'Stepover': 'Querzustellung'
-        }
-        df_final = df.rename(columns=rename_map)
-        
-        cols = df_final.columns.tolist()
-        front_cols = ['Paramset', 'W-Nr.', 'Werkzeugname', 'Ø (mm)', 'Zähne', 'Zustellung', 'Vorschub', 'Drehzahl']
-        front_existing = [c for c in front_cols if c in cols]
-        
-        if 'F' in cols: cols.remove('F') 
-        
-        other_cols = [c for c in cols if c not in front_existing and c != 'F']
-        df_final = df_final[front_existing + sorted(other_cols)]
-        
-        return df_final
+    def count_paramsets(self, generation):
+        # Ein Job pro Parametersatz, nacheinander: die Anzahl Änderungen erscheint im Dropdown,
+        # sobald ein Satz fertig ist. Gleiche Rohdaten gelten ohne Dekodieren als identisch.
+        idx1, idx2 = self.compare_index[1], self.compare_index[2]
+        if generation != self.compare_generation or idx1 is None or idx2 is None: return
+        all_ps = sorted(set(idx1.paramsets()) | set(idx2.paramsets()))
+        pending = [ps for ps in all_ps if ps not in self.compare_results]
+        if not pending: return
+        ps = pending[0]
+
+        def done(result):
+            if generation != self.compare_generation: return
+            self.compare_results.setdefault(ps, result)
+            self.update_paramset_dropdown()
+            self.count_paramsets(generation)
+
+        self.jobs.submit("compare_counts", DIAG.timed("compare_count", self.compare_paramset), idx1, idx2, ps,
+                         on_done=done, on_error=self.show_job_error,
+                         label=f"Parametersätze vergleichen ({len(all_ps) - len(pending) + 1}/{len(all_ps)})")
+
+    def paramset_label(self, ps):
+        from tool_diff import count_changes
+        result = self.compare_results.get(ps)
+        if result is not None:
+            changes = count_changes(result)
+            return f"{ps} – {changes} Änderungen" if changes else f"{ps} – identisch"
+        idx1, idx2 = self.compare_index[1], self.compare_index[2]
+        if idx1 is not None and idx2 is not None and ps in idx1.paramsets() and ps in idx2.paramsets():
+            if idx1.raw_digest(ps) == idx2.raw_digest(ps): return f"{ps} – identisch"
+        return ps
+
+    def update_paramset_dropdown(self, keep_selection=True):
+        current = self.get_selected_paramset() if keep_selection else None
+        all_ps = set()
+        for index in self.compare_index.values():
+            if index is not None: all_ps.update(index.paramsets())
+        all_ps = sorted(all_ps)
+
+        self.paramset_labels = {self.paramset_label(ps): ps for ps in all_ps}
+        self.combo_paramset['values'] = list(self.paramset_labels)
 
-    def update_paramset_dropdown(self):
-        ps1 = set(self.df1_full['Paramset'].unique()) if self.df1_full is not None and not self.df1_full.empty else set()
-        ps2 = set(self.df2_full['Paramset'].unique()) if self.df2_full is not None and not self.df2_full.empty else set()
-        
-        all_ps = list(ps1.union(ps2))
-        all_ps.sort()
-        self.combo_paramset['values'] = all_ps
-        
         if all_ps:
-            if "Standard" in all_ps: self.combo_paramset.set("Standard")
-            else: self.combo_paramset.set(all_ps[0])
+            if current in all_ps: default_ps = current
+            elif self.compare_focus_paramset in all_ps: default_ps = self.compare_focus_paramset
+            else: default_ps = "Standard" if "Standard" in all_ps else all_ps[0]
+            self.combo_paramset.set(next(l for l, ps in self.paramset_labels.items() if ps == default_ps))
         else: self.combo_paramset.set("")
 
+    def get_selected_paramset(self):
+        label = self.combo_paramset.get()
+        return self.paramset_labels.get(label, label)
+
     def populate_tree(self, tree, df, diff_rows=None, missing_rows=None, diff_info=None):
-        if diff_rows is None: diff_rows = []
-        if missing_rows is None: missing_rows = []
-        if diff_info is None: diff_info = {}
-        
-        for item in tree.get_children(): tree.delete(item)
-        
-        display_cols = [c for c in df.columns if c != 'Paramset']
-        tree["columns"] = display_cols
-        
-        for col in display_cols:
-            tree.heading(col, text=col)
-            width = 300 if col == "Werkzeugname" else 120
-            tree.column(col, width=width, minwidth=100, stretch=False, anchor=tk.CENTER if col != "Werkzeugname" else tk.W)
-            
-        for idx, row in df.iterrows():
-            wnr = row.get("W-Nr.", None)
-            formatted_row = []
-            
-            for c in display_cols:
-                val = row[c]
-                if pd.isna(val): 
-                    val = "-"
-                elif isinstance(val, float): 
-                    val = round(val, 2)
-                    
-                if wnr in diff_info and c in diff_info[wnr]:
-                    val = f"» {val} «"
-                    
-                formatted_row.append(val)
-                
-            tags = ()
-            if wnr in diff_rows: tags = ("diff",)
-            elif wnr in missing_rows: tags = ("missing",)
-            tree.insert("", "end", values=formatted_row, tags=tags)
+        from tool_diff import display_columns, row_formatter
+        with DIAG.span("populate_tree", rows=len(df)):
+            display_cols = display_columns(df)
+            tree["columns"] = display_cols
 
-    def run_comparison(self):
-        selected_ps = self.combo_paramset.get()
-        if not selected_ps: return
-        
-        df1 = self.df1_full[self.df1_full['Paramset'] == selected_ps] if self.df1_full is not None else None
-        df2 = self.df2_full[self.df2_full['Paramset'] == selected_ps] if self.df2_full is not None else None
+            for col in display_cols:
+                tree.heading(col, text=col)
+                width = 300 if col == "Werkzeugname" else 120
+                tree.column(col, width=width, minwidth=100, stretch=False, anchor=tk.CENTER if col != "Werkzeugname" else tk.W)
 
-        if df1 is None and df2 is None: return
+            # Nur die sichtbaren Zeilen werden formatiert und als Treeview-Items angelegt
+            get_row = row_formatter(df, display_cols, diff_rows or (), missing_rows or (), diff_info)
+            self.virtual_tables[tree].set_rows(len(df), get_row)
 
-        diff_rows, missing_1, missing_2 = [], [], []
-        diff_info = {} 
-        
-        if df1 is not None and df2 is not None:
-            df1_dict = {row["W-Nr."]: row for _, row in df1.iterrows()}
-            df2_dict = {row["W-Nr."]: row for _, row in df2.iterrows()}
-            all_wnr = set(df1_dict.keys()).union(set(df2_dict.keys()))
-            
-            for wnr in all_wnr:
-                if wnr not in df1_dict: missing_1.append(wnr)
-                elif wnr not in df2_dict: missing_2.append(wnr)
-                else:
-                    r1, r2 = df1_dict[wnr], df2_dict[wnr]
-                    diff_cols = []
-                    all_cols = set(r1.index).union(set(r2.index))
-                    
-                    for col in all_cols:
-                        if col == 'Paramset' or col == 'W-Nr.': continue 
-                        
-                        v1 = r1[col] if col in r1.index else None
-                        v2 = r2[col] if col in r2.index else None
-                        
-                        if pd.isna(v1) and pd.isna(v2): continue
-                        
-                        if pd.isna(v1) != pd.isna(v2):
-                            diff_cols.append(col)
-                            continue
-                            
-                        try:
-                            if round(float(v1), 3) != round(float(v2), 3):
-                                diff_cols.append(col)
-                        except (ValueError, TypeError):
-                            if str(v1).strip() != str(v2).strip():
-                                diff_cols.append(col)
-                                
-                    if diff_cols:
-                        diff_rows.append(wnr)
-                        diff_info[wnr] = diff_cols
-                        
-        if df1 is not None: self.populate_tree(self.tree1, df1, diff_rows, missing_1, diff_info)
-        if df2 is not None: self.populate_tree(self.tree2, df2, diff_rows, missing_2, diff_info)
+    def run_comparison(self):
+        selected_ps = self.get_selected_paramset()
+        if not selected_ps: return
+        idx1, idx2 = self.compare_index[1], self.compare_index[2]
+        if idx1 is None and idx2 is None: return
+
+        def work():
+            # Erstes Anzeigen eines Parametersatzes dekodiert ihn (gemerkt bzw. aus dem Parse-Cache),
+            # jeder weitere Wechsel dorthin ist nur noch Nachschlagen.
+            from tool_diff import compare_tool_tables
+            df1 = idx1.frame(selected_ps) if idx1 is not None else None
+            df2 = idx2.frame(selected_ps) if idx2 is not None else None
+            result = self.compare_results.get(selected_ps)
+            if result is None and idx1 is not None and idx2 is not None and idx1.paramsets() and idx2.paramsets():
+                result = compare_tool_tables(df1, df2)
+            return df1, df2, result
+
+        def done(res):
+            df1, df2, result = res
+            diff_rows, missing_1, missing_2, diff_info = [], [], [], {}
+            if result is not None:
+                if selected_ps not in self.compare_results:
+                    self.compare_results[selected_ps] = result
+                    self.update_paramset_dropdown()
+                diff_rows, missing_1, missing_2, diff_info = result
+
+            if df1 is not None: self.populate_tree(self.tree1, df1, diff_rows, missing_1, diff_info)
+            if df2 is not None: self.populate_tree(self.tree2, df2, diff_rows, missing_2, diff_info)
+            # Erst jetzt die übrigen Sätze: sie sollen das Anzeigen nicht ausbremsen
+            if self.counted_generation != self.compare_generation:
+                self.counted_generation = self.compare_generation
+                self.count_paramsets(self.compare_generation)
+
+        self.jobs.submit("compare_diff", DIAG.timed("compare_diff", work), on_done=done, on_error=self.show_job_error, label=f"Parametersatz {selected_ps} vergleichen")
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = FileSyncGUI(root)
+    with STARTUP.step("Tk-Fenster erzeugen"): root = tk.Tk()
+    with STARTUP.step("FileSyncGUI.__init__ gesamt"): app = FileSyncGUI(root)
 
     root.mainloop()
@@ -0,0 +1,206 @@
+import os
+import gc
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+from datetime import datetime
+
+from synthetic_dat import SyntheticSpec, generate_pair, paramset_names
+
+#Author Nico-RDF
+
+# =========================================================
+# BENCHMARK (Parser, Diff, Tabellen-Aufbereitung, PP-Diff)
+# =========================================================
+# Misst mit synthetischen Dateien (synthetic_dat.py) in mehreren Größen, damit
+# Ergebnisse ohne echte Kunden-Toollisten reproduzierbar und vergleichbar sind:
+#   parse_full       ganze Tools.dat einlesen (Streaming-Parser + DataFrame)
+#   index_open       entpacken + Offset-Index (wie beim Laden im Vergleichs-Tab)
+#   decode_paramset  einen Parametersatz aus dem Index dekodieren
+#   diff_paramset    einen Parametersatz vergleichen (Vergleichs-Tab)
+#   diff_all         alle Parametersätze in einem Durchlauf (Mehrfach-Vergleich/CLI)
+#   render_prep      Zeilen für die Tabelle formatieren (alle Zeilen = einmal ganz durchscrollen)
+#   pp_diff          Postprozessor-Diff
+#   pp_render_prep   Zeilen für die PP-Tabelle (eingeklappt, 3 Kontextzeilen)
+#   pp_diff_repetitive  PP-Diff zweier Dateien aus nur 4 verschiedenen Zeilen (kein Anker)
+#   pp_diff_templates   PP-Diff: 8 verschiedene Zeilen, 5 % durch neue Zeilen ersetzt
+# Pro Messung zählt das beste von N Läufen (plus Median). Die Diff-Ergebnisse
+# werden gegen die beim Erzeugen bekannten Änderungen geprüft.
+# Ergebnisse als JSON; mit --compare alt.json werden Verschlechterungen markiert
+# (Exit-Code 1 wie bei den diff-Befehlen der Kommandozeile).
+
+SCALES = {
+    "small":  {"spec": SyntheticSpec(tools=200, paramsets=3, params=20), "pp_lines": 5000, "pp_repetitive": 5000},
+    "medium": {"spec": SyntheticSpec(tools=1000, paramsets=5, params=40), "pp_lines": 50000, "pp_repetitive": 20000},
+    "large":  {"spec": SyntheticSpec(tools=4000, paramsets=8, params=60), "pp_lines": 200000, "pp_repetitive": 50000},
+}
+DEFAULT_SCALES = ("small", "medium")
+DEFAULT_REPEAT = 3
+# Änderungsraten der zweiten Datei
+CHANGED_RATE = 0.05
+REMOVED_RATE = 0.01
+ADDED_RATE = 0.01
+PP_CHANGE_RATE = 0.01
+PP_SUBSTITUTE_RATE = 0.05
+# Ab diesem Faktor (neu / alt) gilt eine Messung als langsamer geworden
+DEFAULT_THRESHOLD = 1.25
+
+def opcodes_valid(lines1, lines2, opcodes):
+    # Opcodes decken beide Seiten lückenlos ab, equal-Blöcke sind wirklich gleich
+    i = j = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        if (i1, j1) != (i, j) or (tag == 'equal' and lines1[i1:i2] != lines2[j1:j2]): return False
+        i, j = i2, j2
+    return (i, j) == (len(lines1), len(lines2))
+
+def measure(func, repeat):
+    # Rückgabe: (Ergebnis des letzten Laufs, [Sekunden pro Lauf])
+    runs, result = [], None
+    for _ in range(repeat):
+        result = None  # Ergebnis des vorigen Laufs freigeben, bevor gemessen wird
+        gc.collect()
+        t0 = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - t0)
+    return result, runs
+
+def summarize_runs(runs):
+    ordered = sorted(runs)
+    return {"best": ordered[0], "median": ordered[len(ordered) // 2], "runs": runs}
+
+def run_scale(name, config, repeat, workdir, log=print):
+    from estlcam_dat import read_estlcam_dat, open_tools_index, records_to_dataframe
+    from tool_diff import compare_tool_tables, compare_all_paramsets, count_changes, display_columns, row_formatter
+    from pp_diff import (synthetic_postprocessor, repetitive_postprocessor, mutate_lines, substitute_lines,
+                         diff_opcodes, fold_opcodes, iter_pp_rows)
+
+    spec = config["spec"]
+    path1, path2 = os.path.join(workdir, f"{name}_a.dat"), os.path.join(workdir, f"{name}_b.dat")
+    log(f"[{name}] Dateien erzeugen: {spec.tools} Werkzeuge, {spec.paramsets} Parametersätze, {spec.params} Parameter …")
+    expected = generate_pair(path1, path2, spec, CHANGED_RATE, REMOVED_RATE, ADDED_RATE)
+    # Gemessen wird ein echter Parametersatz (nicht "Standard")
+    ps = paramset_names(spec.paramsets)[0]
+
+    results, checks = {}, {}
+    def bench(key, func):
+        result, runs = measure(func, repeat)
+        results[key] = summarize_runs(runs)
+        log(f"[{name}] {key:<16} {results[key]['best'] * 1000:10.1f} ms")
+        return result
+
+    full1 = bench("parse_full", lambda: read_estlcam_dat(path1))
+    full2 = read_estlcam_dat(path2)
+    index1 = bench("index_open", lambda: open_tools_index(path1))
+    index2 = open_tools_index(path2)
+    df1 = bench("decode_paramset", lambda: records_to_dataframe(index1.records(ps)))
+    df2 = records_to_dataframe(index2.records(ps))
+
+    result = bench("diff_paramset", lambda: compare_tool_tables(df1, df2))
+    checks["diff_paramset"] = count_changes(result) == expected[ps]
+    all_results = bench("diff_all", lambda: compare_all_paramsets(full1, full2))
+    checks["diff_all"] = {p: count_changes(r) for p, r in all_results.items()} == expected
+
+    diff_rows, missing_1, _, diff_info = result
+    def render():
+        cols = display_columns(df1)
+        get_row = row_formatter(df1, cols, diff_rows, missing_1, diff_info)
+        return [get_row(i) for i in range(len(df1))]
+    rows = bench("render_prep", render)
+    checks["render_prep"] = len(rows) == len(df1)
+
+    lines1 = synthetic_postprocessor(config["pp_lines"])
+    lines2 = mutate_lines(lines1, PP_CHANGE_RATE)
+    opcodes = bench("pp_diff", lambda: diff_opcodes(lines1, lines2))
+    checks["pp_diff"] = opcodes_valid(lines1, lines2, opcodes)
+    bench("pp_render_prep", lambda: list(iter_pp_rows(lines1, lines2, fold_opcodes(opcodes, 3))))
+
+    n = config["pp_repetitive"]
+    rep1, rep2 = repetitive_postprocessor(n, 4, seed=1), repetitive_postprocessor(n, 4, seed=2)
+    opcodes = bench("pp_diff_repetitive", lambda: diff_opcodes(rep1, rep2))
+    checks["pp_diff_repetitive"] = opcodes_valid(rep1, rep2, opcodes)
+    tpl1 = repetitive_postprocessor(n, 8, seed=3)
+    tpl2 = substitute_lines(tpl1, int(n * PP_SUBSTITUTE_RATE))
+    opcodes = bench("pp_diff_templates", lambda: diff_opcodes(tpl1, tpl2))
+    checks["pp_diff_templates"] = opcodes_valid(tpl1, tpl2, opcodes)
+
+    for key, ok in checks.items():
+        if not ok: log(f"[{name}] WARNUNG: Ergebnis von {key} stimmt nicht")
+    return {
+        "spec": spec._asdict(), "pp_lines": config["pp_lines"], "paramset": ps,
+        "bytes_packed": os.path.getsize(path1), "bytes_unpacked": len(index1.data), "records": len(full1),
+        "expected_changes": expected, "results": results, "checks": checks,
+    }
+
+def environment():
+    import numpy as np
+    import pandas as pd
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(),
+            "cpus": os.cpu_count(), "pandas": pd.__version__, "numpy": np.__version__}
+
+def run_benchmarks(scales=DEFAULT_SCALES, repeat=DEFAULT_REPEAT, log=print):
+    report = {"created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "repeat": repeat,
+              "environment": environment(), "scales": {}}
+    with tempfile.TemporaryDirectory(prefix="estlcam_bench_") as workdir:
+        for name in scales:
+            report["scales"][name] = run_scale(name, SCALES[name], repeat, workdir, log)
+    return report
+
+def compare_reports(old, new, threshold=DEFAULT_THRESHOLD):
+    # Rückgabe: [(Größe, Messung, alt s, neu s, Faktor, langsamer?)] für alle Messungen in beiden Berichten
+    rows = []
+    for scale, data in new["scales"].items():
+        old_results = old.get("scales", {}).get(scale, {}).get("results", {})
+        for key, res in data["results"].items():
+            if key not in old_results: continue
+            before, after = old_results[key]["best"], res["best"]
+            factor = after / before if before else float("inf")
+            rows.append((scale, key, before, after, factor, factor > threshold))
+    return rows
+
+# ---------------------------------------------------------
+# python benchmark.py [--scales small,medium,large] [--repeat 3] [--output DATEI] [--compare ALT.json]
+# ---------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parser-/Diff-Benchmark mit synthetischen Dateien")
+    parser.add_argument("--scales", default=",".join(DEFAULT_SCALES), help=f"Größen: {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", "-o", help="Ergebnis-JSON (Standard: benchmark_DATUM.json)")
+    parser.add_argument("--compare", metavar="ALT.json", help="mit einem früheren Ergebnis vergleichen")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="ab diesem Faktor gilt eine Messung als langsamer")
+    args = parser.parse_args(argv)
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown: parser.error(f"unbekannte Größe: {', '.join(unknown)}")
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"Vergleichsdatei nicht lesbar: {e}")
+
+    report = run_benchmarks(scales, max(1, args.repeat))
+    output = args.output or f"benchmark_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Ergebnis gespeichert: {output}")
+
+    failed = [f"{s}/{k}" for s, data in report["scales"].items() for k, ok in data["checks"].items() if not ok]
+    if failed: print(f"Falsche Ergebnisse: {', '.join(failed)}", file=sys.stderr)
+    if baseline is None: return 1 if failed else 0
+
+    slower = False
+    print(f"\nVergleich mit {args.compare} ({baseline.get('created', '?')}):")
+    for scale, key, before, after, factor, worse in compare_reports(baseline, report, args.threshold):
+        mark = "  <-- langsamer" if worse else ""
+        print(f"  {scale:<7} {key:<16} {before * 1000:10.1f} ms -> {after * 1000:10.1f} ms  ({factor:5.2f}x){mark}")
+        slower = slower or worse
+    return 1 if failed or slower else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import os
+import json
+import atexit
+import hashlib
+import tempfile
+import threading
+
+#Author Nico-RDF
+
+# =========================================================
+# KONFIGURATION IM SPEICHER (last_paths.json)
+# =========================================================
+# Die Datei wird einmal gelesen, danach gilt der Stand im Speicher. Änderungen
+# werden gesammelt und nach kurzer Wartezeit in einem Rutsch geschrieben
+# (temporäre Datei + Umbenennen, ein Absturz hinterlässt nie eine halbe Datei).
+# Beim Beenden wird Offenes sofort geschrieben.
+#
+# Dateilisten (z. B. bekannte Snapshots im OneDrive-Ordner) wachsen mit jedem
+# Export. In der Hauptdatei steht pro Liste nur ein Hash über die Namen plus die
+# Abweichungen zu einer Basisliste; die Basis liegt in einer eigenen Datei
+# (*.files.json) und wird nur neu geschrieben, wenn die Abweichungen zu groß werden.
+# Ändert sich eine Liste nicht, wird gar nichts geschrieben.
+#
+# Schlägt das verzögerte Schreiben fehl (Platte voll, Datei gesperrt), landet der
+# Fehler im Diagnose-Log; flush() gibt ihn zurück, bis ein Schreiben wieder klappt.
+
+DEBOUNCE_SECONDS = 0.5
+# Ab so vielen Abweichungen (bzw. einem Viertel der Basis) wird die Basisliste neu geschrieben
+DELTA_MIN = 32
+
+def names_digest(names):
+    return hashlib.sha1("\n".join(sorted(names)).encode("utf-8")).hexdigest()
+
+def files_path_for(path):
+    return os.path.splitext(path)[0] + ".files.json"
+
+def write_json_atomic(path, data, indent=None):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+class ConfigStore:
+    def __init__(self, path, defaults, list_keys=(), debounce=DEBOUNCE_SECONDS):
+        self.path = path
+        self.files_path = files_path_for(path)
+        self.defaults = defaults
+        self.list_keys = tuple(list_keys)
+        self.debounce = debounce
+        self.writes = 0
+        self.error = None   # letzter Schreibfehler (OSError) oder None
+        self._data = None
+        self._lists = {}   # Schlüssel -> {"base": Hash, "base_names": [...]} (Basisliste auf der Platte)
+        self._dirty = False
+        self._files_dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
+
+    # --- Lesen ---
+    def load(self):
+        # Immer dasselbe Dictionary – nur lesen, Änderungen über update()
+        with self._lock:
+            if self._data is None: self._data = self._read()
+            return self._data
+
+    def _read(self):
+        data = {k: json.loads(json.dumps(v)) for k, v in self.defaults.items()}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except Exception:
+            return data
+        if not isinstance(stored, dict): return data
+
+        files = None
+        for key, value in stored.items():
+            if key in self.list_keys and isinstance(value, dict):
+                if files is None: files = self._read_files()
+                value = self._resolve_list(key, value, files)
+            data[key] = value
+        return data
+
+    def _read_files(self):
+        try:
+            with open(self.files_path, "r", encoding="utf-8") as f:
+                files = json.load(f)
+        except Exception:
+            return {}
+        return files if isinstance(files, dict) else {}
+
+    def _resolve_list(self, key, entry, files):
+        # Basis + Abweichungen -> Liste. Passt ein Hash nicht (Basisdatei aus einem anderen Schreibvorgang),
+        # ist Basis + Abweichungen trotzdem der beste Stand; die Basis wird beim nächsten Schreiben erneuert.
+        # Nur ohne Basisdatei gilt die Liste als unbekannt (sonst wäre jede Datei "neu").
+        base = files.get(key) or {}
+        base_names = base.get("names")
+        if not isinstance(base_names, list): return []
+        names = sorted((set(base_names) - set(entry.get("removed", ()))) | set(entry.get("added", ())))
+        if base.get("digest") == entry.get("base") and names_digest(names) == entry.get("digest"):
+            self._lists[key] = {"base": base["digest"], "base_names": base_names}
+        return names
+
+    # --- Schreiben ---
+    def update(self, **kwargs):
+        with self._lock:
+            data = self.load()
+            changed = False
+            for key, value in kwargs.items():
+                if value is None: continue
+                if key in self.list_keys: value = sorted(set(value))
+                if data.get(key) == value: continue
+                data[key] = value
+                changed = True
+            if changed: self._schedule()
+
+    def _schedule(self):
+        self._dirty = True
+        if self._timer is not None: return
+        if self.debounce <= 0:
+            self.flush()
+            return
+        # Weitere Änderungen innerhalb der Wartezeit landen im selben Schreibvorgang
+        self._timer = threading.Timer(self.debounce, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _stored_list(self, key, names):
+        digest = names_digest(names)
+        state = self._lists.get(key)
+        if state is not None:
+            base = set(state["base_names"])
+            added, removed = sorted(set(names) - base), sorted(base - set(names))
+            if len(added) + len(removed) <= max(DELTA_MIN, len(base) // 4):
+                return {"digest": digest, "base": state["base"], "count": len(names), "added": added, "removed": removed}
+        self._lists[key] = {"base": digest, "base_names": list(names)}
+        self._files_dirty = True
+        return {"digest": digest, "base": digest, "count": len(names), "added": [], "removed": []}
+
+    def flush(self):
+        # Rückgabe: None oder der OSError, an dem das Schreiben (auch ein früheres, verzögertes) gescheitert ist
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty or self._data is None: return None
+            stored = {}
+            for key, value in self._data.items():
+                if key in self.list_keys and isinstance(value, list): value = self._stored_list(key, value)
+                stored[key] = value
+            try:
+                # Basislisten zuerst: die Hauptdatei verweist per Hash darauf
+                if self._files_dirty:
+                    write_json_atomic(self.files_path, {k: {"digest": s["base"], "names": s["base_names"]} for k, s in self._lists.items()})
+                    self._files_dirty = False
+                write_json_atomic(self.path, stored, indent=4)
+            except OSError as e:
+                # Nächste Änderung bzw. flush() versucht es erneut; die alte Datei ist unverändert
+                if self.error is None or str(self.error) != str(e): _log_write_error(e)
+                self.error = e
+                return e
+            self._dirty = False
+            self.error = None
+            self.writes += 1
+            return None
+
+def _log_write_error(error):
+    from diagnostics import DIAG
+    DIAG.log_error("config_write", error)
+
+_STORES = []
+
+def _flush_all():
+    # Letzter Versuch beim Beenden; Fehler stehen schon im Diagnose-Log
+    for store in _STORES: store.flush()
+
+atexit.register(_flush_all)
+
+def open_store(path, defaults, list_keys=(), debounce=DEBOUNCE_SECONDS):
+    store = ConfigStore(path, defaults, list_keys, debounce)
+    _STORES.append(store)
+    return store
@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from parse_cache import app_data_dir
+
+#Author Nico-RDF
+
+# =========================================================
+# MESSPUNKTE & PROFILING (Diagnose-Tab)
+# =========================================================
+# Die teuren Stellen (Toolliste öffnen, Parametersatz vergleichen, Tabelle füllen,
+# PP-Vergleich, Ordner-Scans) laufen in einem Messpunkt: Laufzeit + Zähler
+# (entpackte Bytes, Tokens, Datensätze, verglichene Zellen, Zeilen …).
+# Jeder Lauf landet als eine JSON-Zeile in %APPDATA%/EstlcamSync/diagnostics.jsonl
+# und in der Übersicht im Diagnose-Tab. Zähler meldet der Code von innen über
+# count() – wie report_progress() ohne Bezug zum Aufrufer und außerhalb eines
+# Messpunkts wirkungslos.
+#
+# Profiling: ESTLCAM_PROFILE=compare_diff,pp_diff (oder =1 für alle Messpunkte)
+# lässt die genannten Messpunkte unter cProfile laufen und legt pro Lauf eine
+# .prof-Datei in %APPDATA%/EstlcamSync/profiles ab (ansehen z. B. mit snakeviz
+# oder python -m pstats). Ohne die Variable wird nichts profiliert.
+
+ENV_PROFILE = "ESTLCAM_PROFILE"
+LOG_NAME = "diagnostics.jsonl"
+# Größer -> nach diagnostics.jsonl.1 verschieben und neu beginnen
+LOG_MAX_BYTES = 1024 * 1024
+# So viele Läufe zeigt der Diagnose-Tab
+RECENT_MAX = 200
+
+_local = threading.local()
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None: stack = _local.stack = []
+    return stack
+
+def current_span():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+def count(key, n=1):
+    # Aus dem gemessenen Code aufrufen; zählt in alle offenen Messpunkte dieses Threads
+    stack = getattr(_local, "stack", None)
+    if not stack: return
+    for span in stack: span.add(key, n)
+
+def profile_targets(value=None):
+    # None = aus, "*" = alle, sonst Menge von Messpunkt-Namen
+    value = os.environ.get(ENV_PROFILE, "") if value is None else value
+    value = value.strip()
+    if value in ("", "0"): return None
+    if value.lower() in ("1", "all", "*"): return "*"
+    return {v.strip() for v in value.split(",") if v.strip()}
+
+def default_log_path():
+    return os.path.join(app_data_dir(), LOG_NAME)
+
+def default_profile_dir():
+    return os.path.join(app_data_dir(), "profiles")
+
+class Span:
+    __slots__ = ("name", "counters")
+
+    def __init__(self, name, counters):
+        self.name = name
+        self.counters = counters
+
+    def add(self, key, n=1):
+        self.counters[key] = self.counters.get(key, 0) + n
+
+    def set(self, **counters):
+        self.counters.update(counters)
+
+class Diagnostics:
+    def __init__(self, log_path=None, profile=None, profile_dir=None):
+        self.log_path = log_path or default_log_path()
+        self.profile = profile_targets() if profile is None else profile_targets(profile)
+        self.profile_dir = profile_dir or default_profile_dir()
+        self.version = 0   # zählt hoch bei jedem Lauf (der Diagnose-Tab zeichnet nur dann neu)
+        self._stats = {}
+        self._recent = deque(maxlen=RECENT_MAX)
+        self._log_size = None
+        self._lock = threading.Lock()
+        self._profile_ids = 0
+
+    def profiling(self, name):
+        return self.profile == "*" or (self.profile is not None and name in self.profile)
+
+    @contextmanager
+    def span(self, name, **counters):
+        span = Span(name, dict(counters))
+        stack = _stack()
+        profiler = self._start_profiler(name)
+        stack.append(span)
+        error = None
+        t = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            seconds = time.perf_counter() - t
+            stack.pop()
+            prof_path = self._stop_profiler(name, profiler)
+            self._record(span, seconds, error, prof_path)
+
+    def timed(self, name, func):
+        # Für Hintergrund-Jobs: misst im Worker-Thread (wie StartupTimer.timed)
+        def wrapper(*args, **kwargs):
+            with self.span(name): return func(*args, **kwargs)
+        return wrapper
+
+    # --- cProfile ---
+    def _start_profiler(self, name):
+        # Verschachtelte Messpunkte landen im Profil des äußeren
+        if not self.profiling(name) or getattr(_local, "profiling", False): return None
+        import cProfile
+        profiler = cProfile.Profile()
+        # Ab Python 3.12 darf nur ein Profiler gleichzeitig laufen (z. B. parallele Jobs) -> dann ohne
+        try: profiler.enable()
+        except ValueError: return None
+        _local.profiling = True
+        return profiler
+
+    def _stop_profiler(self, name, profiler):
+        if profiler is None: return None
+        profiler.disable()
+        _local.profiling = False
+        with self._lock:
+            self._profile_ids += 1
+            n = self._profile_ids
+        path = os.path.join(self.profile_dir, f"{name}_{datetime.now().strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{n}.prof")
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError:
+            return None
+        return path
+
+    # --- Ergebnisse ---
+    def _record(self, span, seconds, error, prof_path):
+        entry = {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "name": span.name,
+                 "ms": round(seconds * 1000, 2), "thread": threading.current_thread().name, "counters": span.counters}
+        if error is not None: entry["error"] = error
+        if prof_path is not None: entry["profile"] = prof_path
+        with self._lock:
+            stat = self._stats.get(span.name)
+            if stat is None: stat = self._stats[span.name] = {"calls": 0, "total": 0.0, "max": 0.0}
+            stat["calls"] += 1
+            stat["total"] += seconds
+            stat["max"] = max(stat["max"], seconds)
+            stat["last"] = seconds
+            stat["counters"] = span.counters
+            self._recent.append(entry)
+            self.version += 1
+            self._write(entry)
+
+    def _write(self, entry):
+        # Log ist nur zur Diagnose – Schreibfehler ignorieren
+        try:
+            if self._log_size is None:
+                os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                self._log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+            if self._log_size > LOG_MAX_BYTES:
+                os.replace(self.log_path, self.log_path + ".1")
+                self._log_size = 0
+            line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+            with open(self.log_path, "a", encoding="utf-8") as f: f.write(line)
+            self._log_size += len(line.encode("utf-8"))
+        except OSError:
+            pass
+
+    def log_error(self, name, error):
+        # Fehler außerhalb eines Messpunkts (z. B. verzögertes Speichern): Log + Diagnose-Tab, keine Statistik
+        entry = {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "name": name, "ms": 0.0,
+                 "thread": threading.current_thread().name, "counters": {}, "error": f"{type(error).__name__}: {error}"}
+        with self._lock:
+            self._recent.append(entry)
+            self.version += 1
+            self._write(entry)
+
+    def summary(self):
+        # [(Name, Aufrufe, letzte s, Ø s, max s, Zähler des letzten Laufs)], Name sortiert
+        with self._lock:
+            return [(name, s["calls"], s["last"], s["total"] / s["calls"], s["max"], dict(s["counters"]))
+                    for name, s in sorted(self._stats.items())]
+
+    def recent(self):
+        with self._lock: return list(self._recent)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._recent.clear()
+            self.version += 1
+
+def format_counters(counters):
+    parts = []
+    for key, value in counters.items():
+        if isinstance(value, float): value = f"{value:.1f}"
+        elif isinstance(value, int) and key.startswith("bytes"): value = f"{value / 1e6:.1f} MB"
+        parts.append(f"{key}={value}")
+    return ", ".join(parts)
+
+DIAG = Diagnostics()
+
+# ---------------------------------------------------------
+# python diagnostics.py [LOG]   Übersicht über das Log (Standard: %APPDATA%)
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else default_log_path()
+    stats = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try: entry = json.loads(line)
+                except ValueError: continue
+                stats.setdefault(entry.get("name"), []).append(entry.get("ms", 0.0))
+    except OSError as e:
+        print(f"Log nicht lesbar: {e}", file=sys.stderr)
+        sys.exit(1)
+    for name, values in sorted(stats.items()):
+        values.sort()
+        print(f"{name:<16} {len(values):5d} Läufe   Median {values[len(values) // 2]:9.1f} ms   max {values[-1]:9.1f} ms")
@@ -0,0 +1,81 @@
+import os
+import time
+import threading
+from collections import namedtuple
+
+from diagnostics import count
+
+#Author Nico-RDF
+
+# =========================================================
+# VERZEICHNIS-INDEX FÜR SNAPSHOT-ORDNER
+# =========================================================
+# Ein os.scandir-Durchlauf liefert Name, Größe und Änderungszeit aller Dateien
+# auf einmal (unter Windows ohne zusätzlichen Zugriff pro Datei). Das Ergebnis
+# bleibt im Speicher. Solange sich die Änderungszeit des Ordners nicht ändert,
+# wird bei einem erneuten Aufruf nur der Ordner selbst geprüft – nicht jede Datei.
+
+SnapshotEntry = namedtuple("SnapshotEntry", "name path size mtime")
+
+# Ordner, die kurz vor dem Scan geändert wurden, sind nicht vertrauenswürdig
+# (grobe mtime-Auflösung z. B. bei Netzlaufwerken) -> beim nächsten Mal neu lesen
+RACY_WINDOW = 2.0
+# Sicherheitsnetz für Dateisysteme, die die Ordner-mtime nicht zuverlässig setzen
+MAX_AGE = 60.0
+
+class DirectoryIndex:
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self.scans = 0
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    def entries(self, dir_path):
+        # Rückgabe: {Dateiname: SnapshotEntry} aller Dateien im Ordner
+        key = os.path.abspath(dir_path)
+        try: dir_mtime = os.stat(key).st_mtime_ns
+        except OSError:
+            with self._lock: self._dirs.pop(key, None)
+            return {}
+
+        now = time.time()
+        with self._lock: cached = self._dirs.get(key)
+        if cached is not None:
+            cached_mtime, scanned_at, entries = cached
+            if (cached_mtime == dir_mtime and now - scanned_at < self.max_age
+                    and scanned_at - dir_mtime / 1e9 > RACY_WINDOW):
+                count("dirs_cached")
+                return entries
+
+        entries = self._scan(key)
+        count("dirs_scanned")
+        count("files", len(entries))
+        with self._lock:
+            self._dirs[key] = (dir_mtime, now, entries)
+            self.scans += 1
+        return entries
+
+    def snapshots(self, dir_path, prefix):
+        # Passende Dateien, neueste zuerst (Dateiname enthält Datum/Uhrzeit)
+        entries = self.entries(dir_path)
+        return sorted((e for e in entries.values() if e.name.startswith(prefix)), key=lambda e: e.name, reverse=True)
+
+    def invalidate(self, dir_path=None):
+        with self._lock:
+            if dir_path is None: self._dirs.clear()
+            else: self._dirs.pop(os.path.abspath(dir_path), None)
+
+    def _scan(self, dir_path):
+        entries = {}
+        try:
+            with os.scandir(dir_path) as it:
+                for e in it:
+                    try:
+                        if not e.is_file(): continue
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    entries[e.name] = SnapshotEntry(e.name, e.path, st.st_size, st.st_mtime)
+        except OSError:
+            return {}
+        return entries
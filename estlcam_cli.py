@@ -0,0 +1,459 @@
+import os
+import sys
+import gzip
+import argparse
+import traceback
+from datetime import datetime
+
+import sync_files
+from sync_files import (
+    load_last_paths, save_last_paths,
+    copy_tools_A_to_new_B, copy_tools_B_to_A, find_tools_files, generate_new_tools_filename,
+    copy_post_A_to_new_B, copy_post_B_to_A, find_post_files, generate_new_post_filename,
+    list_tools_snapshots, list_post_snapshots
+)
+from snapshot_manifest import SNAPSHOT_MANIFEST, scan_with_manifest, describe
+from snapshot_dedup import check_export, scan_duplicates, remove_duplicates
+from diagnostics import DIAG
+
+#Author Nico-RDF
+
+# =========================================================
+# KOMMANDOZEILE (ohne tkinter, z. B. für geplante Aufgaben)
+# =========================================================
+# python estlcam_cli.py export tools|post   [--source DATEI] [--dest ORDNER] [--if-identical alias|skip|copy]
+# python estlcam_cli.py import tools|post   [--file NAME] [--dir ORDNER] [--target DATEI]
+# python estlcam_cli.py list tools|post     [--dir ORDNER] [--format text|json] [--update-manifest]
+# python estlcam_cli.py dedupe tools|post   [--dir ORDNER] [--apply]
+# python estlcam_cli.py history [--dir ORDNER] [--paramset NAME [--tool NR [--param NAME]]] [--no-update] [--format text|json]
+# python estlcam_cli.py diff-tools A.dat B.dat [--paramset NAME]
+# python estlcam_cli.py diff-pp A B [--context N]
+# python estlcam_cli.py matrix [DATEIEN …] [--dir ORDNER --last N] [--paramset NAME] [--all] [--format text|json]
+# python estlcam_cli.py parse Tools.dat [--format json|csv|parquet|feather] [--output DATEI]
+# Ohne Pfadangaben gelten die in der Oberfläche gespeicherten Pfade (last_paths.json).
+# pandas wird nur von parse/diff-tools geladen, damit der Start schnell bleibt.
+# Jeder Befehl ist ein Messpunkt (cmd_…) im Diagnose-Log; ESTLCAM_PROFILE=cmd_diff_tools profiliert ihn.
+
+# Exit-Codes
+EXIT_OK = 0
+EXIT_DIFFERENT = 1       # diff-*, matrix: Unterschiede gefunden
+EXIT_USAGE = 2           # falsche Parameter / fehlende Pfade (wie argparse)
+EXIT_NOT_FOUND = 3       # Datei oder Ordner existiert nicht
+EXIT_IO_ERROR = 4        # Lesen/Schreiben fehlgeschlagen
+EXIT_PARSE_ERROR = 5     # Tools.dat konnte nicht gelesen werden
+EXIT_INTERNAL_ERROR = 6  # unerwarteter Fehler (Programmfehler) – nicht mit 1 = "Unterschiede" verwechseln
+
+# Pro Dateiart: Schlüssel in last_paths.json + Dateifunktionen
+KINDS = {
+    "tools": {
+        "source_key": "path_estlcam_tools", "dir_key": "path_onedrive_dir",
+        "sync_key": "last_sync_tools", "files_key": "last_onedrive_files",
+        "export_direction": "estlcam_to_onedrive", "import_direction": "onedrive_to_estlcam",
+        "export": copy_tools_A_to_new_B, "import": copy_tools_B_to_A, "find": find_tools_files,
+        "list": list_tools_snapshots, "new_name": generate_new_tools_filename,
+    },
+    "post": {
+        "source_key": "path_estlcam_post", "dir_key": "path_post_dir",
+        "sync_key": "last_sync_post", "files_key": "last_post_files",
+        "export_direction": "estlcam_to_postdir", "import_direction": "postdir_to_estlcam",
+        "export": copy_post_A_to_new_B, "import": copy_post_B_to_A, "find": find_post_files,
+        "list": list_post_snapshots, "new_name": generate_new_post_filename,
+    },
+}
+
+class CliError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+def fail(message, code):
+    raise CliError(message, code)
+
+def resolve(value, paths, key, label):
+    value = value or paths.get(key, "")
+    if not value: fail(f"Kein Pfad für {label} angegeben (Option oder last_paths.json).", EXIT_USAGE)
+    return value
+
+def record_sync(kind, direction, path_file, path_dir):
+    k = KINDS[kind]
+    save_last_paths(**{
+        k["source_key"]: path_file, k["dir_key"]: path_dir,
+        k["sync_key"]: {"direction": direction, "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
+        k["files_key"]: k["find"](path_dir),
+    })
+
+# ---------------------------------------------------------
+# Sync-Befehle
+# ---------------------------------------------------------
+
+def cmd_export(args):
+    k = KINDS[args.kind]
+    paths = load_last_paths()
+    source = resolve(args.source, paths, k["source_key"], "die Quelldatei")
+    dest = resolve(args.dest, paths, k["dir_key"], "den Zielordner")
+    if not os.path.isfile(source): fail(f"Quelldatei nicht gefunden: {source}", EXIT_NOT_FOUND)
+    if not os.path.isdir(dest): fail(f"Zielordner existiert nicht: {dest}", EXIT_NOT_FOUND)
+
+    if args.if_identical != "copy":
+        try: match, digest = check_export(source, dest, k["list"])
+        except OSError as e: fail(f"Vergleich mit vorhandenen Snapshots fehlgeschlagen: {e}", EXIT_IO_ERROR)
+        if match is not None:
+            # Inhalt liegt schon im Ordner: keine neue Kopie, Pfad der vorhandenen Datei ausgeben
+            alias_name = os.path.basename(k["new_name"](dest))
+            if args.if_identical == "alias" and alias_name != match.name:
+                try: SNAPSHOT_MANIFEST.record_alias(dest, alias_name, match.name, digest, match.size)
+                except OSError as e: print(f"Warnung: Manifest nicht aktualisiert: {e}", file=sys.stderr)
+                if not args.no_save: record_sync(args.kind, k["export_direction"], source, dest)
+            print(f"Identisch mit {match.name} – keine neue Kopie.", file=sys.stderr)
+            print(match.path)
+            return EXIT_OK
+
+    try: new_file = k["export"](source, dest)
+    except OSError as e: fail(f"Export fehlgeschlagen: {e}", EXIT_IO_ERROR)
+    if not args.no_save: record_sync(args.kind, k["export_direction"], source, dest)
+    try: SNAPSHOT_MANIFEST.record_export(new_file)
+    except OSError as e: print(f"Warnung: Manifest nicht aktualisiert: {e}", file=sys.stderr)
+    print(new_file)
+    return EXIT_OK
+
+def cmd_import(args):
+    k = KINDS[args.kind]
+    paths = load_last_paths()
+    src_dir = resolve(args.dir, paths, k["dir_key"], "den Quellordner")
+    target = resolve(args.target, paths, k["source_key"], "die Zieldatei")
+    if not os.path.isdir(src_dir): fail(f"Quellordner existiert nicht: {src_dir}", EXIT_NOT_FOUND)
+
+    filename = args.file
+    if not filename:
+        files = k["find"](src_dir)
+        if not files: fail(f"Keine passenden Dateien in {src_dir}", EXIT_NOT_FOUND)
+        filename = files[0]
+    selected = os.path.join(src_dir, filename)
+    if not os.path.isfile(selected): fail(f"Datei nicht gefunden: {selected}", EXIT_NOT_FOUND)
+
+    try: k["import"](selected, target)
+    except OSError as e: fail(f"Import fehlgeschlagen: {e}", EXIT_IO_ERROR)
+    if not args.no_save: record_sync(args.kind, k["import_direction"], target, src_dir)
+    print(f"{filename} -> {target}")
+    return EXIT_OK
+
+def cmd_list(args):
+    k = KINDS[args.kind]
+    paths = load_last_paths()
+    src_dir = resolve(args.dir, paths, k["dir_key"], "den Ordner")
+    if not os.path.isdir(src_dir): fail(f"Ordner existiert nicht: {src_dir}", EXIT_NOT_FOUND)
+
+    _, rows, missing = scan_with_manifest("", src_dir, k["list"])
+    if missing and args.update_manifest:
+        try: SNAPSHOT_MANIFEST.rebuild(src_dir, missing)
+        except OSError as e: fail(f"Manifest konnte nicht geschrieben werden: {e}", EXIT_IO_ERROR)
+        _, rows, missing = scan_with_manifest("", src_dir, k["list"])
+
+    if args.format == "json":
+        import json
+        # Manifest-Felder (sha1, tools, paramsets bzw. lines) nur, wenn ein Eintrag existiert
+        skip = ("v", "file", "kind", "initials")
+        print(json.dumps([{"file": f, "initials": ini, "modified": dt, "latest": n == 0,
+                           **{key: val for key, val in (rec or {}).items() if key not in skip}}
+                          for n, (f, ini, dt, _, rec) in enumerate(rows)], indent=2, ensure_ascii=False))
+    else:
+        for f, ini, dt, _, rec in rows: print(f"{dt}\t{ini}\t{f}\t{describe(rec)}")
+    return EXIT_OK
+
+def cmd_dedupe(args):
+    k = KINDS[args.kind]
+    paths = load_last_paths()
+    src_dir = resolve(args.dir, paths, k["dir_key"], "den Ordner")
+    if not os.path.isdir(src_dir): fail(f"Ordner existiert nicht: {src_dir}", EXIT_NOT_FOUND)
+
+    try: groups = scan_duplicates(src_dir, k["list"])
+    except OSError as e: fail(f"Ordner konnte nicht gelesen werden: {e}", EXIT_IO_ERROR)
+    for g in groups:
+        print(f"= {g.keep.name}")
+        for e in g.remove: print(f"  - {e.name}")
+    n = sum(len(g.remove) for g in groups)
+    size = sum(g.size * len(g.remove) for g in groups)
+    if not args.apply:
+        print(f"{n} doppelte Snapshots ({size / 1e6:.1f} MB). Mit --apply entfernen.", file=sys.stderr)
+        return EXIT_OK
+
+    removed, freed, errors = remove_duplicates(src_dir, groups)
+    for err in errors: print(f"Warnung: {err}", file=sys.stderr)
+    print(f"{len(removed)} doppelte Snapshots entfernt ({freed / 1e6:.1f} MB).", file=sys.stderr)
+    return EXIT_IO_ERROR if errors else EXIT_OK
+
+def cmd_history(args):
+    from tool_history import ToolHistory
+    paths = load_last_paths()
+    src_dir = resolve(args.dir, paths, KINDS["tools"]["dir_key"], "den Ordner")
+    if not os.path.isdir(src_dir): fail(f"Ordner existiert nicht: {src_dir}", EXIT_NOT_FOUND)
+
+    history = ToolHistory(src_dir)
+    if not args.no_update:
+        import sqlite3
+        try: added, removed = history.update(list_tools_snapshots(src_dir))
+        except (OSError, sqlite3.Error) as e: fail(f"Verlaufs-Index konnte nicht aktualisiert werden: {e}", EXIT_IO_ERROR)
+        if added or removed: print(f"Index: {added} Snapshots eingelesen, {removed} entfernt.", file=sys.stderr)
+
+    # Ohne --paramset: Sätze auflisten, ohne --tool: Werkzeuge, sonst den Verlauf
+    if not args.paramset: out = history.paramsets()
+    elif args.tool is None: out = [{"tool": tool, "name": name} for tool, name in history.tools(args.paramset)]
+    else: out = [r._asdict() for r in history.timeline(args.paramset, args.tool, args.param)]
+
+    if args.format == "json":
+        import json
+        print(json.dumps(out, indent=2, ensure_ascii=False))
+    elif not args.paramset:
+        for ps in out: print(ps)
+    elif args.tool is None:
+        for r in out: print(f"{r['tool']}\t{r['name']}")
+    else:
+        for r in out:
+            old = "–" if r["old"] is None else r["old"]
+            new = "entfällt" if r["new"] is None else r["new"]
+            print(f"{r['date']}\t{r['initials'] or ''}\t{r['snapshot']}\t{r['param']}: {old} -> {new}")
+    return EXIT_OK
+
+# ---------------------------------------------------------
+# Parser & Diffs
+# ---------------------------------------------------------
+
+def load_dat(filepath, use_cache=True, paramset=None):
+    # paramset: nur diesen Parametersatz dekodieren (Offset-Index), None = ganze Datei
+    if not os.path.isfile(filepath): fail(f"Datei nicht gefunden: {filepath}", EXIT_NOT_FOUND)
+    from estlcam_dat import read_estlcam_dat, open_tools_index
+    from tool_table import ToolTableError, is_table_file, open_table_index
+    try:
+        # Exportierte Werkzeugtabellen (parse --format parquet/feather/csv) direkt laden
+        if is_table_file(filepath):
+            index = open_table_index(filepath)
+            if paramset is not None: return index.frame(paramset)
+            return index.df
+        cache = None
+        if use_cache:
+            from parse_cache import ParseCache
+            cache = ParseCache()
+        if paramset is not None: return open_tools_index(filepath, cache).frame(paramset)
+        if cache is None: return read_estlcam_dat(filepath)
+        return cache.get_or_parse(filepath, read_estlcam_dat)
+    except ToolTableError as e:
+        fail(str(e), EXIT_PARSE_ERROR)
+    except gzip.BadGzipFile as e:
+        fail(f"{filepath} ist keine lesbare Tools.dat: {e}", EXIT_PARSE_ERROR)
+    except OSError as e:
+        fail(f"{filepath} konnte nicht gelesen werden: {e}", EXIT_IO_ERROR)
+    except Exception as e:
+        fail(f"{filepath} ist keine lesbare Tools.dat: {e}", EXIT_PARSE_ERROR)
+
+def cmd_parse(args):
+    from tool_diff import FINGERPRINT_COL
+    df = load_dat(args.file, not args.no_cache).drop(columns=FINGERPRINT_COL, errors='ignore')
+    if args.paramset:
+        if args.paramset not in set(df['Paramset']): fail(f"Parametersatz '{args.paramset}' nicht gefunden.", EXIT_USAGE)
+        df = df[df['Paramset'] == args.paramset]
+
+    if args.format in ("parquet", "feather"):
+        # Binär: nur in eine Datei; Paramset/Werkzeugname werden als Kategorie gespeichert
+        from tool_table import ToolTableError, export_tool_table, table_format
+        if not args.output or table_format(args.output) != args.format:
+            ext = ".parquet" if args.format == "parquet" else ".feather (oder .arrow)"
+            fail(f"--format {args.format} braucht --output DATEI{ext}", EXIT_USAGE)
+        try: export_tool_table(df, args.output)
+        except ToolTableError as e: fail(str(e), EXIT_USAGE)
+        except OSError as e: fail(f"{args.output} konnte nicht geschrieben werden: {e}", EXIT_IO_ERROR)
+        return EXIT_OK
+
+    if args.format == "csv": text = df.to_csv(index=False, sep=args.sep)
+    else: text = df.to_json(orient="records", force_ascii=False, indent=2)
+
+    if args.output:
+        try:
+            with open(args.output, "w", encoding="utf-8", newline="") as f: f.write(text)
+        except OSError as e: fail(f"{args.output} konnte nicht geschrieben werden: {e}", EXIT_IO_ERROR)
+    else:
+        sys.stdout.write(text)
+        if not text.endswith("\n"): sys.stdout.write("\n")
+    return EXIT_OK
+
+def cmd_diff_tools(args):
+    from tool_diff import compare_all_paramsets, compare_tool_tables, count_changes
+    if args.paramset:
+        # Nur der gewünschte Parametersatz wird dekodiert
+        df1 = load_dat(args.file1, not args.no_cache, args.paramset)
+        df2 = load_dat(args.file2, not args.no_cache, args.paramset)
+        if df1.empty and df2.empty: fail(f"Parametersatz '{args.paramset}' nicht gefunden.", EXIT_USAGE)
+        results = {args.paramset: compare_tool_tables(df1, df2)}
+    else:
+        df1 = load_dat(args.file1, not args.no_cache)
+        df2 = load_dat(args.file2, not args.no_cache)
+        results = compare_all_paramsets(df1, df2)
+
+    total = 0
+    for ps, result in results.items():
+        diff_rows, missing_1, missing_2, diff_info = result
+        n = count_changes(result)
+        total += n
+        if args.quiet: continue
+        print(f"[{ps}] {n} Änderungen" if n else f"[{ps}] identisch")
+        for wnr in missing_2: print(f"  - {wnr}\tnur in Liste 1")
+        for wnr in missing_1: print(f"  + {wnr}\tnur in Liste 2")
+        for wnr in diff_rows: print(f"  ~ {wnr}\t{', '.join(str(c) for c in diff_info[wnr])}")
+    return EXIT_DIFFERENT if total else EXIT_OK
+
+def cmd_diff_pp(args):
+    from pp_diff import read_pp_lines, diff_opcodes, fold_opcodes
+    for p in (args.file1, args.file2):
+        if not os.path.isfile(p): fail(f"Datei nicht gefunden: {p}", EXIT_NOT_FOUND)
+    try: lines1, lines2 = read_pp_lines(args.file1), read_pp_lines(args.file2)
+    except OSError as e: fail(f"Datei konnte nicht gelesen werden: {e}", EXIT_IO_ERROR)
+
+    opcodes = diff_opcodes(lines1, lines2)
+    changed = any(tag != 'equal' for tag, *_ in opcodes)
+    if args.quiet or not changed: return EXIT_DIFFERENT if changed else EXIT_OK
+
+    for tag, i1, i2, j1, j2 in fold_opcodes(opcodes, args.context):
+        if tag == 'fold': print(f"@@ {i2 - i1} gleiche Zeilen (Datei 1: {i1 + 1}-{i2}, Datei 2: {j1 + 1}-{j2}) @@")
+        elif tag == 'equal':
+            for l in lines1[i1:i2]: print(f"  {l}")
+        else:
+            for l in lines1[i1:i2]: print(f"- {l}")
+            for l in lines2[j1:j2]: print(f"+ {l}")
+    return EXIT_DIFFERENT
+
+def cmd_matrix(args):
+    from tool_matrix import build_matrix, row_differs, cell_text, column_label
+    if args.files: files = args.files
+    else:
+        # Ohne Dateien: die neuesten Snapshots aus dem Toollisten-Ordner, alt -> neu
+        src_dir = resolve(args.dir, load_last_paths(), KINDS["tools"]["dir_key"], "den Ordner")
+        if not os.path.isdir(src_dir): fail(f"Ordner existiert nicht: {src_dir}", EXIT_NOT_FOUND)
+        files = [e.path for e in reversed(list_tools_snapshots(src_dir)[:args.last])]
+    if len(files) < 2: fail("Für den Mehrfach-Vergleich werden mindestens zwei Dateien gebraucht.", EXIT_USAGE)
+    for p in files:
+        if not os.path.isfile(p): fail(f"Datei nicht gefunden: {p}", EXIT_NOT_FOUND)
+
+    result = build_matrix(files)
+    for n, err in sorted(result.errors.items()): print(f"Warnung: {files[n]} ist unlesbar: {err}", file=sys.stderr)
+    rows = [r for r in result.rows if not args.paramset or r.paramset == args.paramset]
+    if args.paramset and not rows: fail(f"Parametersatz '{args.paramset}' nicht gefunden.", EXIT_USAGE)
+    differing = [r for r in rows if row_differs(r)]
+    shown = rows if args.all else differing
+
+    if args.format == "json":
+        import json
+        print(json.dumps({"files": files, "rows": [{"paramset": r.paramset, "tool": r.tool, "name": r.name,
+                                                    "variants": [cell_text(v) for v in r.variants]} for r in shown]},
+                         indent=2, ensure_ascii=False))
+    else:
+        print("\t".join(["Parametersatz", "W-Nr.", "Werkzeugname"] + [column_label(p) for p in files]))
+        for r in shown: print("\t".join([r.paramset, str(r.tool), r.name] + [cell_text(v) for v in r.variants]))
+        print(f"{len(differing)} von {len(rows)} Werkzeugen unterscheiden sich (A, B, … = Varianten, – = fehlt, ? = unlesbar).", file=sys.stderr)
+    return EXIT_DIFFERENT if differing else EXIT_OK
+
+# ---------------------------------------------------------
+# Einstieg
+# ---------------------------------------------------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="estlcam_cli", description="Estlcam Sync ohne Oberfläche")
+    parser.add_argument("--config", help=f"Pfad zur {sync_files.CONFIG_FILE} (Standard: aktueller Ordner)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="Estlcam-Datei als neuen Snapshot in den Ordner kopieren")
+    p.add_argument("kind", choices=KINDS)
+    p.add_argument("--source", help="Tools.dat bzw. Postprozessor-Datei")
+    p.add_argument("--dest", help="Zielordner (OneDrive / Exportordner)")
+    p.add_argument("--no-save", action="store_true", help="last_paths.json nicht aktualisieren")
+    p.add_argument("--if-identical", choices=("alias", "skip", "copy"), default="alias",
+                   help="Inhalt existiert schon: nur im Manifest vermerken (Standard), nichts tun oder trotzdem kopieren")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("import", help="Snapshot aus dem Ordner nach Estlcam übernehmen")
+    p.add_argument("kind", choices=KINDS)
+    p.add_argument("--file", help="Dateiname im Ordner (Standard: neueste Datei)")
+    p.add_argument("--dir", help="Quellordner (OneDrive / Exportordner)")
+    p.add_argument("--target", help="Ziel: Tools.dat bzw. Postprozessor-Datei")
+    p.add_argument("--no-save", action="store_true", help="last_paths.json nicht aktualisieren")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("list", help="Snapshots im Ordner auflisten (neueste zuerst)")
+    p.add_argument("kind", choices=KINDS)
+    p.add_argument("--dir", help="Ordner (Standard: aus last_paths.json)")
+    p.add_argument("--format", choices=("text", "json"), default="text")
+    p.add_argument("--update-manifest", action="store_true", help="Fehlende Manifest-Einträge vorher nachtragen")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("dedupe", help="Inhaltsgleiche Snapshots finden (mit --apply entfernen)")
+    p.add_argument("kind", choices=KINDS)
+    p.add_argument("--dir", help="Ordner (Standard: aus last_paths.json)")
+    p.add_argument("--apply", action="store_true", help="Doppelte wirklich entfernen (sonst nur anzeigen)")
+    p.set_defaults(func=cmd_dedupe)
+
+    p = sub.add_parser("history", help="Änderungsverlauf eines Werkzeugs über alle Toollisten-Snapshots")
+    p.add_argument("--dir", help="Toollisten-Ordner (Standard: aus last_paths.json)")
+    p.add_argument("--paramset", help="Parametersatz (ohne: Sätze auflisten)")
+    p.add_argument("--tool", type=int, help="W-Nr. (ohne: Werkzeuge des Satzes auflisten)")
+    p.add_argument("--param", help="Nur diesen Parameter (z. B. Drehzahl)")
+    p.add_argument("--no-update", action="store_true", help="Index nicht vorher aktualisieren")
+    p.add_argument("--format", choices=("text", "json"), default="text")
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("diff-tools", help="Zwei Tools.dat vergleichen (Exit 1 bei Unterschieden)")
+    p.add_argument("file1")
+    p.add_argument("file2")
+    p.add_argument("--paramset", help="Nur diesen Parametersatz vergleichen")
+    p.add_argument("--quiet", "-q", action="store_true", help="Nur Exit-Code, keine Ausgabe")
+    p.add_argument("--no-cache", action="store_true", help="Parse-Cache nicht verwenden")
+    p.set_defaults(func=cmd_diff_tools)
+
+    p = sub.add_parser("diff-pp", help="Zwei Postprozessoren vergleichen (Exit 1 bei Unterschieden)")
+    p.add_argument("file1")
+    p.add_argument("file2")
+    p.add_argument("--context", type=int, default=3, help="Kontextzeilen um jede Änderung (Standard: 3)")
+    p.add_argument("--quiet", "-q", action="store_true", help="Nur Exit-Code, keine Ausgabe")
+    p.set_defaults(func=cmd_diff_pp)
+
+    p = sub.add_parser("matrix", help="Viele Toollisten auf einmal vergleichen (Exit 1 bei Unterschieden)")
+    p.add_argument("files", nargs="*", help="Toollisten in Spaltenreihenfolge (ohne: neueste aus dem Ordner)")
+    p.add_argument("--dir", help="Toollisten-Ordner (Standard: aus last_paths.json)")
+    p.add_argument("--last", type=int, default=12, help="So viele neueste Snapshots aus dem Ordner (Standard: 12)")
+    p.add_argument("--paramset", help="Nur diesen Parametersatz")
+    p.add_argument("--all", action="store_true", help="Auch Werkzeuge ohne Unterschiede ausgeben")
+    p.add_argument("--format", choices=("text", "json"), default="text")
+    p.set_defaults(func=cmd_matrix)
+
+    p = sub.add_parser("parse", help="Tools.dat als JSON, CSV, Parquet oder Feather ausgeben")
+    p.add_argument("file")
+    p.add_argument("--format", choices=("json", "csv", "parquet", "feather"), default="json",
+                   help="parquet/feather brauchen pyarrow und --output")
+    p.add_argument("--sep", default=",", help="Trennzeichen für CSV (Standard: ,)")
+    p.add_argument("--paramset", help="Nur diesen Parametersatz ausgeben")
+    p.add_argument("--output", "-o", help="In Datei schreiben statt auf stdout")
+    p.add_argument("--no-cache", action="store_true", help="Parse-Cache nicht verwenden")
+    p.set_defaults(func=cmd_parse)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.config: sync_files.CONFIG_FILE = args.config
+    try:
+        with DIAG.span(args.func.__name__): return args.func(args)
+    except CliError as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return e.code
+    except BrokenPipeError:
+        # Ausgabe wurde abgeschnitten (z. B. "| head") – kein Fehler
+        sys.stdout = open(os.devnull, "w")
+        return EXIT_OK
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        # Sonst endet Python mit 1 – für Skripte hieße das "Unterschiede gefunden"
+        traceback.print_exc()
+        print(f"Unerwarteter Fehler: {type(e).__name__}: {e}", file=sys.stderr)
+        return EXIT_INTERNAL_ERROR
+    finally:
+        for error in sync_files.flush_last_paths(): print(f"Warnung: Konfiguration nicht gespeichert: {error}", file=sys.stderr)
+
+if __name__ == "__main__":
+    sys.exit(main())
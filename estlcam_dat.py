@@ -0,0 +1,490 @@
+import gzip
+import hashlib
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from diagnostics import count
+
+#Author Nico-RDF
+
+# =========================================================
+# ESTLCAM TOOLS.DAT PARSER (Tokenizer + Datensatz-Aufbau)
+# =========================================================
+# Grammatik eines Tokens in der entpackten Tools.dat:
+#   <len><key>\x01D<double>       (Zahlenwert, 8 Byte little endian)
+#   <len><key>\x01S<len><str>     (Textwert)
+#   \x04Last<len><str>            (Name eines Parametersatzes)
+# Dazwischen liegen Bytes, die wir nicht kennen. Über diese wird per
+# Resync gesprungen, ohne sie Byte für Byte anzufassen.
+
+MAX_KEY_LEN = 50
+# Längstes mögliches Token: Längenbyte + Key + \x01S + Längenbyte + String
+MAX_TOKEN_LEN = 1 + MAX_KEY_LEN + 2 + 1 + 255
+# Blockgröße beim Entpacken (iter_tool_records)
+CHUNK_SIZE = 1024 * 1024
+PROGRESS_EVERY = 500
+
+_DOUBLE = struct.Struct('<d')
+_KEY_CHARS = re.compile(rb'[\x20-\x7e]+')
+# Nächste Stelle, an der ein Token beginnen kann. Jeder gültige Token passt auf
+# eine der Alternativen; ob das Längenbyte stimmt, wird danach geprüft.
+# Gruppe 1 ist nur beim Zahlen-Token gesetzt (schneller Pfad).
+_NEXT_TOKEN = re.compile(rb'\x04Last|[\x01-\x32]([\x20-\x7e]+)\x01D.{8}|[\x01-\x32][\x20-\x7e]+\x01S', re.DOTALL)
+
+TOKEN_LAST = "last"
+TOKEN_VALUE = "value"
+
+BASE_KEYS = ('Number', 'Name', 'Diameter', 'Flutes')
+
+RENAME_MAP = {
+    'Number': 'W-Nr.', 'Name': 'Werkzeugname', 'Diameter': 'Ø (mm)',
+    'Flutes': 'Zähne', 'Dpp': 'Zustellung', 'F_mm_min': 'Vorschub', 'Rpm': 'Drehzahl',
+    'Fz': 'Vorschub/Zahn', 'Plunge_Angle': 'Eintauchwinkel', 'Stepover': 'Querzustellung'
+}
+FRONT_COLS = ['Paramset', 'W-Nr.', 'Werkzeugname', 'Ø (mm)', 'Zähne', 'Zustellung', 'Vorschub', 'Drehzahl']
+
+# ---------------------------------------------------------
+# Tokenizer
+# ---------------------------------------------------------
+
+def _decode_str(buf, start, end):
+    val_bytes = bytes(buf[start:end])
+    try: return val_bytes.decode('utf-8')
+    except UnicodeDecodeError: return val_bytes.decode('latin-1', errors='ignore')
+
+def _try_token(buf, pos, n):
+    # Prüft exakt die Regeln des alten Byte-für-Byte-Parsers an Position pos.
+    # Rückgabe: (art, key, wert, ende) oder None
+    key_len = buf[pos]
+    if key_len == 0 or key_len > MAX_KEY_LEN: return None
+    next_pos = pos + 1 + key_len
+    if next_pos > n: return None
+    if not _KEY_CHARS.fullmatch(buf, pos + 1, next_pos): return None
+
+    if key_len == 4 and buf[pos+1:next_pos] == b'Last' and next_pos < n:
+        str_len = buf[next_pos]
+        if next_pos + 1 + str_len <= n:
+            return TOKEN_LAST, 'Last', _decode_str(buf, next_pos + 1, next_pos + 1 + str_len), next_pos + 1 + str_len
+
+    if next_pos + 2 > n or buf[next_pos] != 1: return None
+    type_char = buf[next_pos + 1]
+    if type_char == 68:  # 'D'
+        if next_pos + 2 + 8 <= n:
+            val = _DOUBLE.unpack_from(buf, next_pos + 2)[0]
+            return TOKEN_VALUE, str(buf[pos+1:next_pos], 'ascii'), val, next_pos + 2 + 8
+    elif type_char == 83:  # 'S'
+        if next_pos + 2 < n:
+            str_len = buf[next_pos + 2]
+            if next_pos + 3 + str_len <= n:
+                val = _decode_str(buf, next_pos + 3, next_pos + 3 + str_len)
+                return TOKEN_VALUE, str(buf[pos+1:next_pos], 'ascii'), val, next_pos + 3 + str_len
+    return None
+
+def scan_tokens(buf, pos=0, limit=None):
+    # Generator über alle Tokens, deren Start vor limit liegt: (art, key, wert).
+    # Die Position, ab der weitergelesen werden muss, ist der Rückgabewert des Generators.
+    n = len(buf)
+    if limit is None: limit = n
+    unpack_from = _DOUBLE.unpack_from
+    while pos < limit:
+        # finditer springt nach jedem Treffer direkt hinter dessen Ende weiter,
+        # das entspricht genau dem Ende eines sauberen Zahlen-Tokens.
+        for m in _NEXT_TOKEN.finditer(buf, pos):
+            start = m.start()
+            if start >= limit: return max(pos, limit)
+            key = m.group(1)
+            if key is not None and len(key) == buf[start]:
+                pos = m.end()
+                yield TOKEN_VALUE, key.decode('ascii'), unpack_from(buf, pos - 8)[0]
+                continue
+            # Langsamer Pfad: Text, Parametersatz oder unsaubere Stelle
+            tok = _try_token(buf, start, n)
+            if tok is None:
+                pos = start + 1
+            else:
+                kind, key, val, pos = tok
+                yield kind, key, val
+            break
+        else:
+            return max(pos, limit)
+    return pos
+
+def iter_tokens(data):
+    buf = data if isinstance(data, (bytes, bytearray)) else memoryview(data).cast('B')
+    yield from scan_tokens(buf)
+
+def iter_tokens_stream(fileobj, chunk_size=CHUNK_SIZE):
+    # Liest blockweise. Am Blockende werden MAX_TOKEN_LEN Bytes zurückgehalten,
+    # damit ein angeschnittener Token erst mit dem nächsten Block geprüft wird.
+    buf = bytearray()
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if chunk: buf += chunk
+        limit = len(buf) - MAX_TOKEN_LEN if chunk else len(buf)
+        if limit > 0:
+            pos = yield from scan_tokens(buf, 0, limit)
+            del buf[:pos]
+        if not chunk: return
+
+# ---------------------------------------------------------
+# Datensatz-Aufbau (Number / Name / Suitability Grenzen)
+# ---------------------------------------------------------
+
+class ToolRecordBuilder:
+    def __init__(self):
+        self.current_record = {}
+        self.current_tool_base = {}
+        self.global_paramsets = []
+
+    def feed(self, kind, key, val):
+        # Gibt einen fertigen Datensatz zurück, sobald er abgeschlossen ist, sonst None
+        if kind == TOKEN_LAST:
+            if val not in self.global_paramsets: self.global_paramsets.append(val)
+            return None
+
+        finished = None
+        if key in ('Number', 'Name'):
+            if 'Name' in self.current_record:
+                finished = self.current_record
+                self.current_record = {'Paramset': 'Standard'}
+                self.current_tool_base = {}
+
+        elif key == 'Suitability':
+            if self.current_record: finished = self.current_record
+            self.current_record = self.current_tool_base.copy()
+            idx = int(val) - 2
+            if 0 <= idx < len(self.global_paramsets): self.current_record['Paramset'] = self.global_paramsets[idx]
+            else: self.current_record['Paramset'] = f"Paramset {int(val)}"
+
+        self.current_record[key] = val
+        if key in BASE_KEYS: self.current_tool_base[key] = val
+        return finished
+
+    def close(self):
+        if self.current_record and 'Name' in self.current_record:
+            return self.current_record
+        return None
+
+def iter_records(tokens):
+    builder = ToolRecordBuilder()
+    for kind, key, val in tokens:
+        rec = builder.feed(kind, key, val)
+        if rec is not None: yield rec
+    rec = builder.close()
+    if rec is not None: yield rec
+
+def iter_tool_records(filepath, chunk_size=CHUNK_SIZE):
+    # Öffentliche Streaming-API: liefert jeden Werkzeug-/Parametersatz-Datensatz,
+    # sobald er abgeschlossen ist. Speicherbedarf bleibt unabhängig von der Dateigröße.
+    with gzip.open(filepath, 'rb') as f:
+        yield from iter_records(iter_tokens_stream(f, chunk_size))
+
+def parse_records(data):
+    return list(iter_records(iter_tokens(data)))
+
+# ---------------------------------------------------------
+# DataFrame für den Werkzeug-Vergleich
+# ---------------------------------------------------------
+
+def records_to_dataframe(records):
+    import pandas as pd  # nur hier gebraucht; Streaming & Zusammenfassung kommen ohne pandas aus
+    df = pd.DataFrame(records)
+    if df.empty: return df
+
+    if 'Paramset' not in df.columns: df['Paramset'] = 'Standard'
+    df['Paramset'] = df['Paramset'].fillna('Standard')
+
+    if 'F' in df.columns: df['F_mm_min'] = (df['F'] * 60).round(0)
+    if 'Number' in df.columns: df['Number'] = df['Number'].fillna(0).astype(int)
+
+    df_final = df.rename(columns=RENAME_MAP)
+
+    cols = df_final.columns.tolist()
+    front_existing = [c for c in FRONT_COLS if c in cols]
+
+    if 'F' in cols: cols.remove('F')
+
+    other_cols = [c for c in cols if c not in front_existing and c != 'F']
+    df_final = df_final[front_existing + sorted(other_cols)]
+
+    # Zeilen-Fingerabdrücke für den Vergleich (werden mit im Parse-Cache gespeichert)
+    from tool_diff import add_fingerprints
+    return add_fingerprints(df_final)
+
+def read_estlcam_dat(filepath, progress=None):
+    # progress(anzahl_datensaetze) wird alle PROGRESS_EVERY Datensätze aufgerufen
+    records = []
+    for rec in iter_tool_records(filepath):
+        records.append(rec)
+        if progress is not None and len(records) % PROGRESS_EVERY == 0: progress(len(records))
+    count("records", len(records))
+    return records_to_dataframe(records)
+
+# ---------------------------------------------------------
+# Offset-Index: Parametersätze erst bei Bedarf dekodieren
+# ---------------------------------------------------------
+# Der Vergleich zeigt immer nur einen Parametersatz. Ein schneller Vorlauf sucht
+# deshalb nur die Grenzen (Number/Name = neues Werkzeug, Suitability = neuer
+# Parametersatz-Block) und merkt sich Start/Ende in den entpackten Bytes plus
+# die Basiswerte des Werkzeugs. Dekodiert wird ein Satz erst, wenn er gebraucht
+# wird – mit dem normalen ToolRecordBuilder, nur eben auf seine Blöcke beschränkt.
+# Ungewöhnlich aufgebaute Dateien (Block vor dem ersten Werkzeug, Werkzeug ohne
+# Name, Token über eine Blockgrenze) werden wie bisher komplett sequenziell gelesen.
+#
+# Die Grenz-Muster können auch mitten in einem Text, einer Zahl oder einem
+# Parametersatz-Namen stehen. Eine Fundstelle zählt nur, wenn der sequenzielle
+# Parser dort wirklich einen Token beginnt (_token_starts):
+#   - Liegt sie in keinem möglichen Nutzdaten-Bereich (8 Byte nach \x01D, Länge +
+#     Text nach \x01S bzw. \x04Last), kann sie kein anderer Token überdecken –
+#     der Parser kommt genau dort an. Geprüft wird das für alle Fundstellen auf einmal.
+#   - Sonst wird die Token-Kette ab der letzten bestätigten Grenze bis dorthin
+#     gelesen. Bei sauberen Dateien betrifft das nur wenige Stellen.
+
+# Einzelne Muster statt einer Alternation: Literale sucht re per Schnellsuche,
+# das ist zusammen etwa doppelt so schnell wie ein gemeinsamer Ausdruck.
+# Typ D und S: der Datensatz-Aufbau wertet die Keys unabhängig vom Typ aus.
+_BOUNDARIES = [re.compile(p) for p in (rb'\x04Last', rb'\x06Number\x01[DS]', rb'\x04Name\x01[DS]',
+                                       rb'\x0bSuitability\x01[DS]', rb'\x08Diameter\x01[DS]', rb'\x06Flutes\x01[DS]')]
+_LAST = _BOUNDARIES[0]
+_TEXT_MARK = re.compile(rb'\x01S')
+
+def _covered(data, cands):
+    # bool pro Fundstelle: liegt in den Nutzdaten eines möglichen Tokens
+    import numpy as np
+    a = np.frombuffer(data, dtype=np.uint8)
+    n = len(a)
+    cands = np.asarray(cands, dtype=np.int64)
+    covered = np.zeros(len(cands), dtype=bool)
+    if n < 3 or not len(cands): return covered
+    # Zahl: \x01D steht 2 bis 9 Byte vor der Fundstelle (nur diese 8 Stellen ansehen)
+    for k in range(2, 10):
+        t = cands - k
+        ok = t >= 0
+        covered[ok] |= (a[t[ok]] == 1) & (a[t[ok] + 1] == 68)
+    # Text / Parametersatz-Name: Intervalle [Start, Ende) aller \x01S bzw. \x04Last (selten, daher per Suche)
+    # Anzahl Intervalle mit Start <= p < Ende = Starts <= p minus Enden <= p
+    for pattern, skip in ((_TEXT_MARK, 2), (_LAST, 5)):
+        marks = np.array([m.start() for m in pattern.finditer(data)], dtype=np.int64)
+        marks = marks[marks + skip < n]
+        if not len(marks): continue
+        starts, ends = marks + skip, np.sort(marks + skip + 1 + a[marks + skip])
+        covered |= np.searchsorted(starts, cands, 'right') > np.searchsorted(ends, cands, 'right')
+    return covered
+
+def _scan_end(data, start, limit):
+    # Position, an der scan_tokens nach allen Tokens vor limit weiterlesen würde
+    tokens = scan_tokens(data, start, limit)
+    try:
+        while True: next(tokens)
+    except StopIteration as stop:
+        return stop.value
+
+def _token_starts(data):
+    # [(Position, Token)] aller Grenz-Tokens, genau an den Stellen, an denen auch scan_tokens sie liest
+    n = len(data)
+    cands = sorted(m.start() for pattern in _BOUNDARIES for m in pattern.finditer(data))
+    count("boundaries", len(cands))
+    out, reached = [], 0   # reached: hier kommt der sequenzielle Parser sicher vorbei
+    for p, covered in zip(cands, _covered(data, cands).tolist()):
+        if p < reached: continue
+        if covered:
+            count("boundaries_walked")
+            reached = _scan_end(data, reached, p)
+            if reached != p: continue
+        tok = _try_token(data, p, n)
+        if tok is None: continue
+        out.append((p, tok))
+        reached = tok[3]
+    return out
+
+_Region = namedtuple("_Region", "start end base first base_end lasts")
+
+class _IndexFallback(Exception):
+    pass
+
+class ToolsDatIndex:
+    def __init__(self, data, filepath=None, cache=None):
+        # cache (ParseCache, optional): dekodierte Parametersätze überleben das Programmende
+        self.data = data
+        self.filepath = filepath
+        self.cache = cache
+        self.regions = {}   # Paramset -> [_Region, ...] in Dateireihenfolge
+        self._records = None  # nur bei Rückfall auf den sequenziellen Parser
+        self._frames = {}
+        self._digests = {}
+        # _lock: nur kurz für regions/_records/_digests (auch aus dem Tk-Thread gelesen),
+        # _frame_lock: ein Parametersatz wird nicht parallel doppelt dekodiert
+        self._lock = threading.Lock()
+        self._frame_lock = threading.Lock()
+        try: self._build()
+        except _IndexFallback: self._fall_back()
+
+    def _build(self):
+        data, n = self.data, len(self.data)
+        names, regions = [], self.regions
+        base, has_name, started, lasts = {}, False, False, []
+        # Offener Datensatz: (Paramset, Start, Basis bei Blöcken / None beim Werkzeugkopf)
+        open_ps, open_start, open_base = 'Standard', 0, None
+
+        def close(end):
+            # Basis am Ende + gesehene Parametersatz-Namen dienen beim Dekodieren als Gegenprobe
+            regions.setdefault(open_ps, []).append(_Region(open_start, end, open_base, open_start == 0, dict(base), tuple(lasts)))
+            lasts.clear()
+
+        count("bytes_unpacked", n)
+        for p, (kind, key, val, _) in _token_starts(data):
+            if kind == TOKEN_LAST:
+                if val not in names: names.append(val)
+                if val not in lasts: lasts.append(val)
+            elif key in ('Number', 'Name'):
+                if has_name:
+                    close(p)
+                    open_ps, open_start, open_base = 'Standard', p, None
+                    base, has_name = {}, False
+                elif open_base is not None: raise _IndexFallback()
+                base[key] = val
+                has_name = has_name or key == 'Name'
+                started = True
+            elif key == 'Suitability':
+                if not started or 'Name' not in base: raise _IndexFallback()
+                close(p)
+                # Unbrauchbarer Wert: der sequenzielle Parser soll denselben Fehler melden
+                try: idx = int(val) - 2
+                except (ValueError, TypeError, OverflowError): raise _IndexFallback()
+                open_ps = names[idx] if 0 <= idx < len(names) else f"Paramset {int(val)}"
+                open_start, open_base = p, dict(base)
+            elif key in BASE_KEYS:
+                base[key] = val
+        if has_name: close(n)
+
+    def _state(self):
+        with self._lock: return self.regions, self._records
+
+    def _fall_back(self):
+        # Erst komplett sequenziell lesen, dann in einem Schritt umschalten –
+        # paramsets()/raw_digest() sehen nie einen halb gefüllten Stand
+        records = parse_records(self.data)
+        count("fallback")
+        count("records", len(records))
+        by_paramset = {}
+        for rec in records:
+            by_paramset.setdefault(rec.get('Paramset', 'Standard'), []).append(rec)
+        with self._lock:
+            self.regions = None
+            self._records = by_paramset
+            self._digests.clear()
+        self._frames.clear()
+
+    def paramsets(self):
+        regions, records = self._state()
+        return sorted(regions if regions is not None else records)
+
+    def _decode(self, region):
+        builder = ToolRecordBuilder()
+        if region.base is not None: builder.current_tool_base = dict(region.base)
+        elif not region.first: builder.current_record = {'Paramset': 'Standard'}
+        tokens = 0
+        for kind, key, val in _scan_region(self.data, region.start, region.end):
+            builder.feed(kind, key, val)
+            tokens += 1
+        count("tokens", tokens)
+        # Hat der Vorlauf eine Grenze mitten in einem Token gefunden, passt das hier nicht mehr
+        if list(builder.current_tool_base.items()) != list(region.base_end.items()) or tuple(builder.global_paramsets) != region.lasts: raise _IndexFallback()
+        return builder.current_record
+
+    def records(self, ps):
+        regions, records = self._state()
+        if regions is not None:
+            try:
+                recs = []
+                for region in regions.get(ps, ()):
+                    rec = self._decode(region)
+                    if region.base is not None: rec['Paramset'] = ps
+                    if 'Name' in rec: recs.append(rec)
+                count("records", len(recs))
+                return recs
+            except _IndexFallback:
+                self._fall_back()
+                records = self._state()[1]
+        return list(records.get(ps, ()))
+
+    def frame(self, ps):
+        # Gemerkt: jeder Parametersatz wird höchstens einmal dekodiert
+        with self._frame_lock:
+            df = self._frames.get(ps)
+            if df is None and ps not in self.paramsets(): return records_to_dataframe([])
+            if df is None:
+                if self.cache is not None and self.filepath is not None:
+                    df = self.cache.get_or_parse(self.filepath, lambda _: records_to_dataframe(self.records(ps)), part=ps)
+                else:
+                    df = records_to_dataframe(self.records(ps))
+                self._frames[ps] = df
+            return df
+
+    def raw_digest(self, ps):
+        # Hash über die Rohbytes eines Parametersatzes (inkl. Basiswerte der Werkzeuge).
+        # Gleicher Hash in zwei Dateien = gleiche Datensätze, ohne zu dekodieren.
+        with self._lock:
+            digest = self._digests.get(ps)
+            regions, records = self.regions, self._records
+        if digest is not None: return digest
+        h = hashlib.blake2b(digest_size=16)
+        if regions is not None:
+            view = memoryview(self.data)
+            for region in regions.get(ps, ()):
+                if region.base is not None: h.update(repr(sorted(region.base.items())).encode('utf-8'))
+                h.update(view[region.start:region.end])
+        else:
+            h.update(repr(records.get(ps, ())).encode('utf-8'))
+        with self._lock:
+            stale = self.regions is not regions
+            if not stale: digest = self._digests.setdefault(ps, h.digest())
+        # Inzwischen auf den sequenziellen Parser umgeschaltet (passiert höchstens einmal): neu rechnen
+        return self.raw_digest(ps) if stale else digest
+
+def _scan_region(data, start, end):
+    # Wie scan_tokens, prüft aber, dass der letzte Token genau an der Blockgrenze endet
+    pos = yield from scan_tokens(data, start, end)
+    if pos != end: raise _IndexFallback()
+
+def open_tools_index(filepath, cache=None):
+    try: count("bytes_packed", os.path.getsize(filepath))
+    except OSError: pass
+    with gzip.open(filepath, 'rb') as f:
+        return ToolsDatIndex(f.read(), filepath, cache)
+
+def summarize_tools(filepath):
+    # Kurzüberblick ohne DataFrame: Anzahl Werkzeuge + Datensätze pro Parametersatz
+    numbers, paramsets = set(), {}
+    for rec in iter_tool_records(filepath):
+        numbers.add(rec.get('Number', rec.get('Name')))
+        ps = rec.get('Paramset', 'Standard')
+        paramsets[ps] = paramsets.get(ps, 0) + 1
+    return {"tools": len(numbers), "paramsets": paramsets}
+
+# ---------------------------------------------------------
+# Durchsatz messen: python estlcam_dat.py Tools.dat [...]
+# ---------------------------------------------------------
+
+def measure_throughput(filepath, repeat=3):
+    with gzip.open(filepath, 'rb') as f:
+        data = f.read()
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        records = parse_records(data)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    mb = len(data) / (1024 * 1024)
+    return {"bytes": len(data), "records": len(records), "seconds": best, "mb_per_s": mb / best if best else float("inf")}
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        r = measure_throughput(path)
+        print(f"{path}: {r['bytes'] / (1024 * 1024):.2f} MB entpackt, {r['records']} Datensätze, "
+              f"{r['seconds']:.3f} s -> {r['mb_per_s']:.1f} MB/s")
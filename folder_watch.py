@@ -0,0 +1,213 @@
+import os
+import sys
+import time
+import queue
+import select
+import struct
+import threading
+from collections import namedtuple
+
+from dir_index import DirectoryIndex
+
+#Author Nico-RDF
+
+# =========================================================
+# ORDNER-ÜBERWACHUNG (neue / gelöschte Snapshots live erkennen)
+# =========================================================
+# Ein Hintergrund-Thread beobachtet die Snapshot-Ordner:
+#   - Linux: inotify weckt den Thread, sobald sich im Ordner etwas tut.
+#   - Sonst (Windows, Netzlaufwerke): Polling über die Ordner-mtime (DirectoryIndex).
+#     Ohne Änderungen wird das Intervall schrittweise länger (Backoff).
+# Änderungen werden entprellt: Kopiert der OneDrive-Client 50 Dateien auf einmal,
+# gibt es erst nach einer kurzen Ruhepause EIN Ereignis mit allen neuen Dateien.
+# Ereignisse landen in watcher.events (Queue), der Tk-Thread holt sie per after() ab.
+
+FolderChange = namedtuple("FolderChange", "key path added removed snapshots")
+
+MIN_INTERVAL = 1.0      # Polling-Intervall direkt nach einer Änderung (s)
+MAX_INTERVAL = 15.0     # längstes Polling-Intervall ohne Änderungen (s)
+BACKOFF = 1.5
+DEBOUNCE = 1.0          # so lange muss Ruhe sein, bevor ein Ereignis rausgeht (s)
+MAX_DELAY = 10.0        # spätestens nach so vielen Sekunden wird trotzdem gemeldet
+
+# inotify-Konstanten (linux/inotify.h)
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_IGNORED = 0x8000
+IN_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+_EVENT = struct.Struct("iIII")
+
+class _Inotify:
+    def __init__(self):
+        import ctypes, ctypes.util
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self.fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1")
+
+    def add(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), IN_WATCH_MASK)
+        return wd if wd >= 0 else None
+
+    def remove(self, wd):
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self):
+        # Rückgabe: Liste (wd, mask); Dateinamen interessieren nicht, der Ordner wird neu gelesen
+        try: data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError: return []
+        events, pos = [], 0
+        while pos + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, pos)
+            events.append((wd, mask))
+            pos += _EVENT.size + length
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+def _open_inotify():
+    if not sys.platform.startswith("linux"): return None
+    try: return _Inotify()
+    except (OSError, AttributeError): return None
+
+class _Watch:
+    def __init__(self, path, prefix, known):
+        self.path = path
+        self.prefix = prefix
+        self.known = set(known) if known is not None else None
+        self.seen = None
+        self.wd = None
+        self.pending_since = None
+        self.last_change = None
+
+class FolderWatcher:
+    def __init__(self, index=None, use_inotify=True):
+        self.index = index or DirectoryIndex()
+        self.events = queue.Queue()
+        self.interval = MIN_INTERVAL
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._inotify = _open_inotify() if use_inotify else None
+        self._pipe = os.pipe() if self._inotify is not None else None
+
+    @property
+    def backend(self):
+        return "inotify" if self._inotify is not None else "polling"
+
+    # --- Tk-Thread ---
+    def watch(self, key, path, prefix, known=None):
+        # known: bereits bekannte Dateinamen (z. B. aus last_paths.json).
+        # None = Stand beim ersten Nachsehen (im Watcher-Thread, nicht im Tk-Thread)
+        w = _Watch(path, prefix, known)
+        with self._lock:
+            old = self._watches.pop(key, None)
+            if old is not None and old.wd is not None: self._inotify.remove(old.wd)
+            if self._inotify is not None and path and os.path.isdir(path): w.wd = self._inotify.add(path)
+            self._watches[key] = w
+        self.interval = MIN_INTERVAL
+        self._notify()
+
+    def unwatch(self, key):
+        with self._lock:
+            w = self._watches.pop(key, None)
+            if w is not None and w.wd is not None: self._inotify.remove(w.wd)
+
+    def start(self):
+        if self._thread is not None: return
+        self._thread = threading.Thread(target=self._run, name="estlcam-folder-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._notify()
+        if self._thread is not None: self._thread.join(timeout=2)
+        if self._inotify is not None:
+            self._inotify.close()
+            for fd in self._pipe: os.close(fd)
+            self._inotify = None
+
+    def _notify(self):
+        self._wake.set()
+        if self._pipe is not None:
+            try: os.write(self._pipe[1], b"x")
+            except OSError: pass
+
+    # --- Watcher-Thread ---
+    def _run(self):
+        while not self._stop.is_set():
+            fired = self._wait(self._next_timeout())
+            if self._stop.is_set(): break
+            changed = False
+            with self._lock: watches = list(self._watches.items())
+            for key, w in watches:
+                if w.wd is not None and w.wd in fired:
+                    self.index.invalidate(w.path)
+                changed |= self._check(key, w)
+            # Backoff nur beim Polling relevant: ohne Änderung wird seltener nachgesehen
+            self.interval = MIN_INTERVAL if changed else min(MAX_INTERVAL, self.interval * BACKOFF)
+
+    def _next_timeout(self):
+        with self._lock: watches = list(self._watches.values())
+        now = time.monotonic()
+        timeouts = []
+        for w in watches:
+            if w.pending_since is not None:
+                timeouts.append(max(0.05, min(w.last_change + DEBOUNCE, w.pending_since + MAX_DELAY) - now))
+        if any(w.wd is None for w in watches): timeouts.append(self.interval)
+        # Mit inotify trotzdem ab und zu nachsehen (z. B. gelöschter und neu angelegter Ordner)
+        timeouts.append(MAX_INTERVAL)
+        return min(timeouts)
+
+    def _wait(self, timeout):
+        # Rückgabe: Menge der inotify-Watch-Deskriptoren, die sich gemeldet haben
+        self._wake.clear()
+        if self._inotify is None:
+            self._wake.wait(timeout)
+            return set()
+        try: readable, _, _ = select.select([self._inotify.fd, self._pipe[0]], [], [], timeout)
+        except (OSError, ValueError): return set()
+        if self._pipe[0] in readable:
+            try: os.read(self._pipe[0], 1024)
+            except OSError: pass
+        fired = set()
+        if self._inotify.fd in readable:
+            for wd, mask in self._inotify.read():
+                fired.add(wd)
+                if mask & IN_IGNORED: self._drop_wd(wd)
+        return fired
+
+    def _drop_wd(self, wd):
+        # Ordner gelöscht/verschoben: für diesen Ordner aufs Polling zurückfallen
+        with self._lock:
+            for w in self._watches.values():
+                if w.wd == wd: w.wd = None
+
+    def _check(self, key, w):
+        now = time.monotonic()
+        names = {e.name for e in self.index.snapshots(w.path, w.prefix)} if w.path else set()
+        if w.known is None: w.known = set(names)
+        changed = names != w.seen
+        if changed:
+            w.seen = names
+            w.last_change = now
+            if w.pending_since is None: w.pending_since = now
+            if w.wd is None and self._inotify is not None and w.path and os.path.isdir(w.path):
+                with self._lock: w.wd = self._inotify.add(w.path)
+
+        if w.pending_since is not None and (now - w.last_change >= DEBOUNCE or now - w.pending_since >= MAX_DELAY):
+            w.pending_since = None
+            added = sorted(w.seen - w.known, reverse=True)
+            removed = sorted(w.known - w.seen, reverse=True)
+            w.known = set(w.seen)
+            if added or removed:
+                snapshots = self.index.snapshots(w.path, w.prefix) if w.path else []
+                self.events.put(FolderChange(key, w.path, added, removed, snapshots))
+        return changed
@@ -0,0 +1,160 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+#Author Nico-RDF
+
+# =========================================================
+# HINTERGRUND-JOBS (Parsen, Diff, Ordner-Scans)
+# =========================================================
+# Schwere Arbeit läuft in einem Thread-Pool, damit die Tk-Hauptschleife nie
+# blockiert. Ergebnisse landen in einer Queue, die der Tk-Thread per
+# root.after() abholt – Tk selbst wird nur aus dem Hauptthread angefasst.
+# Jeder Job gehört zu einem Kanal (z. B. "compare_file1"). Ein neuer Job im
+# selben Kanal bricht den alten ab; dessen Ergebnis wird verworfen.
+# Ausnahme keep=True für Jobs mit Nebenwirkungen (Kopieren, Manifest schreiben):
+# die laufen weiter, und ihr on_done (Buchführung zur fertigen Kopie) läuft immer.
+
+class JobCancelled(Exception):
+    pass
+
+_local = threading.local()
+
+def current_job():
+    return getattr(_local, "job", None)
+
+def report_progress(done, total=None, unit=None):
+    # Aus dem Worker aufrufen. Meldet den Fortschritt und bricht ab, wenn der Job überholt wurde.
+    job = current_job()
+    if job is None: return
+    if job.cancelled: raise JobCancelled()
+    job.done, job.total = done, total
+    if unit is not None: job.unit = unit
+
+def report_bytes(done, total=None):
+    # Für Kopiervorgänge: Statuszeile zeigt MB und Durchsatz statt Stückzahl
+    report_progress(done, total, "bytes")
+
+class Job:
+    def __init__(self, job_id, channel, label, keep=False):
+        self.id = job_id
+        self.channel = channel
+        self.label = label
+        self.keep = keep
+        self.done = None
+        self.total = None
+        self.unit = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def progress_text(self):
+        if self.done is None: return ""
+        if self.unit == "bytes":
+            total = f" / {self.total / 1e6:.1f}" if self.total else ""
+            return f" ({self.done / 1e6:.1f}{total} MB, {self.done / max(self.elapsed(), 1e-6) / 1e6:.0f} MB/s)"
+        if self.total: return f" ({self.done}/{self.total})"
+        return f" ({self.done})"
+
+class JobRunner:
+    def __init__(self, root, max_workers=2, on_status=None, poll_ms=100):
+        self.root = root
+        self.on_status = on_status
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="estlcam-job")
+        self.results = queue.Queue()
+        self.active = {}
+        self.last_finished = None
+        self._ids = itertools.count(1)
+        self._polling = False
+
+    def submit(self, channel, func, *args, on_done=None, on_error=None, label=None, keep=False):
+        previous = self.active.get(channel)
+        if previous is not None:
+            # Nicht überholbare Jobs bleiben unter eigenem Schlüssel aktiv (Statuszeile, _poll)
+            if previous.keep: self.active[(channel, previous.id)] = previous
+            else: previous.cancel()
+
+        job = Job(next(self._ids), channel, label or channel, keep)
+        self.active[channel] = job
+        self.executor.submit(self._run, job, func, args, on_done, on_error)
+        self._notify_status()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def cancel(self, channel):
+        job = self.active.pop(channel, None)
+        if job is not None: job.cancel()
+
+    def cancel_all(self):
+        for channel in list(self.active): self.cancel(channel)
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- Worker-Thread ---
+    def _run(self, job, func, args, on_done, on_error):
+        _local.job = job
+        result, error = None, None
+        try:
+            if job.cancelled: raise JobCancelled()
+            result = func(*args)
+        except Exception as e:
+            error = e
+        finally:
+            _local.job = None
+        self.results.put((job, result, error, on_done, on_error))
+
+    # --- Tk-Thread ---
+    def _poll(self):
+        try:
+            while True:
+                try: job, result, error, on_done, on_error = self.results.get_nowait()
+                except queue.Empty: break
+
+                job.finished = time.perf_counter()
+                for key in [k for k, j in self.active.items() if j is job]: del self.active[key]
+                if job.cancelled or isinstance(error, JobCancelled): continue
+
+                self.last_finished = job
+                try:
+                    if error is not None:
+                        if on_error is not None: on_error(error)
+                    elif on_done is not None:
+                        on_done(result)
+                except Exception as e:
+                    if on_error is not None: on_error(e)
+        finally:
+            self._notify_status()
+            if self.active or not self.results.empty():
+                self.root.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+
+    def status_text(self):
+        if self.active:
+            return "   ".join(f"⏳ {job.label}…{job.progress_text()} {job.elapsed():.1f} s" for job in self.active.values())
+        if self.last_finished is not None:
+            job = self.last_finished
+            summary = job.progress_text() if job.unit == "bytes" else ""
+            return f"✔ {job.label} fertig in {job.elapsed():.1f} s{summary}"
+        return ""
+
+    def _notify_status(self):
+        if self.on_status is not None: self.on_status(self.status_text())
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+
+#Author Nico-RDF
+
+# =========================================================
+# PARSE-CACHE FÜR TOOLS.DAT / TOOLLIST-SNAPSHOTS
+# =========================================================
+# Ein exportierter Snapshot ändert sich nie mehr. Das fertige DataFrame wird
+# deshalb einmal als Pickle abgelegt und beim nächsten Öffnen direkt geladen.
+# Schlüssel: Dateigröße + Inhalts-Hash (Pfad/Größe/mtime merken sich nur den Hash,
+# damit unveränderte Dateien in einer Sitzung nicht erneut gehasht werden).
+
+# Bei Änderungen am Parser-Ergebnis hochzählen, alte Einträge werden dann ignoriert
+CACHE_FORMAT = 4
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".pkl"
+
+def app_data_dir():
+    base = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".estlcamsync")
+    return os.path.join(base, "EstlcamSync")
+
+def default_cache_dir():
+    return os.path.join(app_data_dir(), "parse_cache")
+
+def file_digest(filepath, chunk_size=1024 * 1024):
+    h = hashlib.sha1()
+    with open(filepath, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk: break
+            h.update(chunk)
+    return h.hexdigest()
+
+class ParseCache:
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._digests = {}
+        # get_or_parse läuft in mehreren Hintergrund-Jobs gleichzeitig (Zähler, Hash-Gedächtnis)
+        self._lock = threading.Lock()
+
+    def key_for(self, filepath):
+        st = os.stat(filepath)
+        signature = (os.path.abspath(filepath), st.st_size, st.st_mtime_ns)
+        with self._lock: digest = self._digests.get(signature)
+        if digest is None:
+            digest = file_digest(filepath)
+            with self._lock: self._digests[signature] = digest
+        return f"v{CACHE_FORMAT}_{st.st_size}_{digest}"
+
+    def get_or_parse(self, filepath, parse, part=None):
+        # part: eigener Eintrag für einen Teil der Datei (z. B. einen Parametersatz)
+        try: key = self.key_for(filepath)
+        except OSError: return parse(filepath)
+        if part is not None: key += "_" + hashlib.sha1(part.encode("utf-8")).hexdigest()[:16]
+
+        entry = os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+        df = None
+        if os.path.isfile(entry):
+            import pandas as pd  # erst bei Bedarf, hält den Programmstart schlank
+            try: df = pd.read_pickle(entry)
+            except Exception: df = None
+
+        if df is not None:
+            with self._lock: self.hits += 1
+            # mtime dient als LRU-Zeitstempel
+            try: os.utime(entry)
+            except OSError: pass
+            return df
+
+        with self._lock: self.misses += 1
+        df = parse(filepath)
+        self._store(entry, df)
+        return df
+
+    def _store(self, entry, df):
+        tmp = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_pickle(tmp)
+            os.replace(tmp, entry)
+        except Exception:
+            # Cache ist nur ein Beschleuniger – Fehler beim Schreiben ignorieren
+            try: os.remove(tmp)
+            except OSError: pass
+            return
+        self._evict()
+
+    def _evict(self):
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.is_file() and e.name.endswith(ENTRY_SUFFIX)]
+        except OSError:
+            return
+        infos = []
+        for e in entries:
+            try: st = e.stat()
+            except OSError: continue
+            infos.append((st.st_mtime, st.st_size, e.path))
+
+        total, evicted = sum(size for _, size, _ in infos), 0
+        for _, size, path in sorted(infos):
+            if total <= self.max_bytes: break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        with self._lock: self.evictions += evicted
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir): return
+        for e in os.scandir(self.cache_dir):
+            if e.is_file() and e.name.endswith(ENTRY_SUFFIX):
+                try: os.remove(e.path)
+                except OSError: pass
+
+    def stats(self):
+        with self._lock: return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,325 @@
+import itertools
+import math
+import random
+import sys
+import time
+
+from diagnostics import count
+
+#Author Nico-RDF
+
+# =========================================================
+# ZEILEN-DIFF FÜR POSTPROZESSOREN (Tab 3)
+# =========================================================
+# Ersetzt difflib.SequenceMatcher für lange Dateien:
+#   1. Jede Zeile wird auf eine Ganzzahl-ID abgebildet (Vergleiche nur noch int == int).
+#   2. Histogramm-Diff: Gemeinsamer Anfang/Ende wird abgeschnitten, dann dient die
+#      seltenste gemeinsame Zeile als Anker, von dem aus der längste gleiche Block
+#      wächst. Links und rechts davon geht es rekursiv weiter.
+#   3. Findet sich kein seltener Anker (sehr repetitive Bereiche), übernimmt
+#      Myers' O(ND)-Algorithmus mit linearem Speicher (Middle Snake).
+# Ausgabe sind die gleichen Opcodes wie bei difflib: equal/replace/delete/insert.
+# Aufwand im Messpunkt "pp_diff": anchor_lines (vom Histogramm betrachtete Zeilen) und
+# myers_diagonals (von Myers geprüfte Diagonalen) – beide sollen etwa linear wachsen.
+
+# Ab so vielen Vorkommen gilt eine Zeile nicht mehr als brauchbarer Anker
+MAX_ANCHOR_COUNT = 64
+# Obergrenze für Myers (Anzahl Editierschritte), danach wird der Bereich als "replace" gewertet.
+# Der Aufwand wächst mit dem Quadrat der Schritte: die Grenze ist deshalb die Wurzel der
+# Bereichsgröße (√(Zeilen links + rechts), mindestens MIN_MYERS_COST). So bleiben sehr
+# repetitive Dateien (wenige verschiedene Zeilen, keine Anker) ähnlich schnell wie difflib,
+# das solche Bereiche ebenfalls als ein "replace" liefert.
+MIN_MYERS_COST = 64
+MAX_MYERS_COST = 4096
+
+def read_pp_lines(filepath):
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        return [l.rstrip('\n') for l in f.readlines()]
+
+def intern_lines(lines1, lines2):
+    ids = {}
+    a = [ids.setdefault(l, len(ids)) for l in lines1]
+    b = [ids.setdefault(l, len(ids)) for l in lines2]
+    return a, b
+
+def _strip_common(a, b, alo, ahi, blo, bhi, blocks):
+    start = alo
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        alo += 1; blo += 1
+    if alo > start: blocks.append((start, blo - (alo - start), alo - start))
+
+    end = ahi
+    while alo < ahi and blo < bhi and a[ahi-1] == b[bhi-1]:
+        ahi -= 1; bhi -= 1
+    if ahi < end: blocks.append((ahi, bhi, end - ahi))
+    return alo, ahi, blo, bhi
+
+# ---------------------------------------------------------
+# Histogramm-Anker
+# ---------------------------------------------------------
+
+def _find_anchor(a, b, alo, ahi, blo, bhi):
+    # Rückgabe: (i, j, länge) des Ankers, None (nichts gemeinsam) oder False (zu repetitiv)
+    count("anchor_lines", (ahi - alo) + (bhi - blo))
+    occ = {}
+    for i in range(alo, ahi):
+        positions = occ.get(a[i])
+        if positions is None: occ[a[i]] = [i]
+        else: positions.append(i)
+
+    counts = [len(occ[x]) for x in set(b[blo:bhi]) if x in occ]
+    if not counts: return None
+    lowest = min(counts)
+    if lowest > MAX_ANCHOR_COUNT: return False
+
+    best = None
+    j = blo
+    while j < bhi:
+        next_j = j + 1
+        positions = occ.get(b[j])
+        if positions is not None and len(positions) == lowest:
+            for i in positions:
+                sa, sb = i, j
+                while sa > alo and sb > blo and a[sa-1] == b[sb-1]:
+                    sa -= 1; sb -= 1
+                ea, eb = i + 1, j + 1
+                while ea < ahi and eb < bhi and a[ea] == b[eb]:
+                    ea += 1; eb += 1
+                if eb > next_j: next_j = eb
+                if best is None or ea - sa > best[2]: best = (sa, sb, ea - sa)
+        j = next_j
+    return best
+
+# ---------------------------------------------------------
+# Myers mit linearem Speicher
+# ---------------------------------------------------------
+
+def myers_cost_limit(len1, len2):
+    return min(MAX_MYERS_COST, max(MIN_MYERS_COST, math.isqrt(len1 + len2)))
+
+def _bisect(a, b, alo, ahi, blo, bhi):
+    # Middle Snake: liefert (x, y) relativ zu (alo, blo), an dem die Bereiche geteilt werden
+    len1, len2 = ahi - alo, bhi - blo
+    max_d = (len1 + len2 + 1) // 2
+    v_offset = max_d
+    v_length = 2 * max_d
+    v1 = [-1] * v_length
+    v2 = [-1] * v_length
+    v1[v_offset + 1] = 0
+    v2[v_offset + 1] = 0
+    delta = len1 - len2
+    front = (delta % 2 != 0)
+    k1start = k1end = k2start = k2end = 0
+
+    for d in range(min(max_d, myers_cost_limit(len1, len2))):
+        count("myers_diagonals", 2 * (d + 1))
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = v_offset + k1
+            if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                x1 = v1[k1_offset + 1]
+            else:
+                x1 = v1[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < len1 and y1 < len2 and a[alo + x1] == b[blo + y1]:
+                x1 += 1; y1 += 1
+            v1[k1_offset] = x1
+            if x1 > len1: k1end += 2
+            elif y1 > len2: k1start += 2
+            elif front:
+                k2_offset = v_offset + delta - k1
+                if 0 <= k2_offset < v_length and v2[k2_offset] != -1:
+                    if x1 >= len1 - v2[k2_offset]: return x1, y1
+
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = v_offset + k2
+            if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                x2 = v2[k2_offset + 1]
+            else:
+                x2 = v2[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < len1 and y2 < len2 and a[ahi - 1 - x2] == b[bhi - 1 - y2]:
+                x2 += 1; y2 += 1
+            v2[k2_offset] = x2
+            if x2 > len1: k2end += 2
+            elif y2 > len2: k2start += 2
+            elif not front:
+                k1_offset = v_offset + delta - k2
+                if 0 <= k1_offset < v_length and v1[k1_offset] != -1:
+                    x1 = v1[k1_offset]
+                    y1 = v_offset + x1 - k1_offset
+                    if x1 >= len1 - x2: return x1, y1
+    return None
+
+def _myers(a, b, alo, ahi, blo, bhi, blocks):
+    stack = [(alo, ahi, blo, bhi)]
+    while stack:
+        alo, ahi, blo, bhi = _strip_common(a, b, *stack.pop(), blocks)
+        if alo >= ahi or blo >= bhi: continue
+        if ahi - alo == 1 or bhi - blo == 1:
+            # Eine Seite hat nur noch eine Zeile: kommt sie drüben vor, ist das der einzige Treffer
+            if ahi - alo == 1:
+                for j in range(blo, bhi):
+                    if b[j] == a[alo]: blocks.append((alo, j, 1)); break
+            else:
+                for i in range(alo, ahi):
+                    if a[i] == b[blo]: blocks.append((i, blo, 1)); break
+            continue
+        split = _bisect(a, b, alo, ahi, blo, bhi)
+        if split is None: continue
+        x, y = split
+        stack.append((alo + x, ahi, blo + y, bhi))
+        stack.append((alo, alo + x, blo, blo + y))
+
+# ---------------------------------------------------------
+# Öffentliche API
+# ---------------------------------------------------------
+
+def matching_blocks(a, b):
+    blocks = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = _strip_common(a, b, *stack.pop(), blocks)
+        if alo >= ahi or blo >= bhi: continue
+        anchor = _find_anchor(a, b, alo, ahi, blo, bhi)
+        if anchor is None: continue
+        if anchor is False:
+            _myers(a, b, alo, ahi, blo, bhi, blocks)
+            continue
+        i, j, size = anchor
+        blocks.append(anchor)
+        stack.append((i + size, ahi, j + size, bhi))
+        stack.append((alo, i, blo, j))
+
+    # Sortieren und direkt aneinander liegende Blöcke zusammenfassen (wie difflib)
+    merged = []
+    for i, j, size in sorted(blocks):
+        if size == 0: continue
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1] = (merged[-1][0], merged[-1][1], merged[-1][2] + size)
+        else:
+            merged.append((i, j, size))
+    merged.append((len(a), len(b), 0))
+    return merged
+
+def diff_opcodes(lines1, lines2):
+    a, b = intern_lines(lines1, lines2)
+    opcodes = []
+    i = j = 0
+    for ai, bj, size in matching_blocks(a, b):
+        tag = ''
+        if i < ai and j < bj: tag = 'replace'
+        elif i < ai: tag = 'delete'
+        elif j < bj: tag = 'insert'
+        if tag: opcodes.append((tag, i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size: opcodes.append(('equal', ai, i, bj, j))
+    return opcodes
+
+# ---------------------------------------------------------
+# Zeilen für die Anzeige (Treeview)
+# ---------------------------------------------------------
+MISSING_TEXT = "--- FEHLT ---"
+
+def fold_opcodes(opcodes, context=3):
+    # "Nur Änderungen": Lange equal-Blöcke werden bis auf <context> Zeilen um jede
+    # Änderung herum zu einem 'fold'-Opcode zusammengefasst
+    folded = []
+    last = len(opcodes) - 1
+    for n, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+        if tag != 'equal':
+            folded.append((tag, i1, i2, j1, j2))
+            continue
+        keep_head = context if n > 0 else 0
+        keep_tail = context if n < last else 0
+        if i2 - i1 <= keep_head + keep_tail:
+            folded.append((tag, i1, i2, j1, j2))
+            continue
+        if keep_head: folded.append(('equal', i1, i1 + keep_head, j1, j1 + keep_head))
+        folded.append(('fold', i1 + keep_head, i2 - keep_tail, j1 + keep_head, j2 - keep_tail))
+        if keep_tail: folded.append(('equal', i2 - keep_tail, i2, j2 - keep_tail, j2))
+    return folded
+
+def iter_pp_rows(lines1, lines2, opcodes):
+    # Liefert (values, tags, fold) pro Tabellenzeile; fold ist bei Platzhaltern der Opcode, sonst None
+    for op in opcodes:
+        tag, i1, i2, j1, j2 = op
+        if tag == 'equal':
+            for l1, l2 in zip(lines1[i1:i2], lines2[j1:j2]):
+                yield (l1, l2), (), None
+        elif tag == 'replace':
+            for l1, l2 in itertools.zip_longest(lines1[i1:i2], lines2[j1:j2], fillvalue=""):
+                yield (l1, l2), ("diff",), None
+        elif tag == 'delete':
+            for l1 in lines1[i1:i2]:
+                yield (l1, MISSING_TEXT), ("missing1",), None
+        elif tag == 'insert':
+            for l2 in lines2[j1:j2]:
+                yield (MISSING_TEXT, l2), ("missing2",), None
+        elif tag == 'fold':
+            text = f"··· {i2 - i1} gleiche Zeilen ausgeblendet (Doppelklick zum Anzeigen) ···"
+            yield (text, text), ("fold",), op
+
+# ---------------------------------------------------------
+# Benchmark: python pp_diff.py [zeilen]  (synthetischer Postprozessor)
+# ---------------------------------------------------------
+
+def synthetic_postprocessor(n_lines, seed=1):
+    r = random.Random(seed)
+    templates = ["G01 X{:.3f} Y{:.3f} F{}", "G00 Z{:.1f}", "M03 S{}", "M05", "", "(Werkzeugwechsel {})",
+                 "IF [#{} GT 0] THEN", "ENDIF", "#{} = {}", "T{} M06"]
+    lines = []
+    for _ in range(n_lines):
+        t = r.choice(templates)
+        lines.append(t.format(*(r.randint(0, 500) for _ in range(t.count("{}") + t.count("{:")))))
+    return lines
+
+def repetitive_postprocessor(n_lines, distinct=4, seed=1):
+    # Nur wenige verschiedene Zeilen, zufällig gemischt: kein brauchbarer Anker, Myers muss aufgeben
+    r = random.Random(seed)
+    pool = [f"G01 X{i * 10} Y0" for i in range(distinct)]
+    return [r.choice(pool) for _ in range(n_lines)]
+
+def substitute_lines(lines, count, seed=2):
+    # count zufällige Zeilen durch neue, einmalige Zeilen ersetzen
+    r = random.Random(seed)
+    out = list(lines)
+    for i in r.sample(range(len(out)), min(count, len(out))): out[i] = f"(neu {i})"
+    return out
+
+def mutate_lines(lines, rate=0.01, seed=2):
+    r = random.Random(seed)
+    out = []
+    for line in lines:
+        x = r.random()
+        if x < rate / 3: continue
+        if x < 2 * rate / 3: out.append(line + " ; geändert")
+        elif x < rate: out.extend((line, f"(neu {r.randint(0, 10**6)})"))
+        else: out.append(line)
+    return out
+
+def _check(lines1, lines2, opcodes):
+    rebuilt = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            assert lines1[i1:i2] == lines2[j1:j2]
+            rebuilt.extend(lines1[i1:i2])
+        else:
+            rebuilt.extend(lines2[j1:j2])
+    assert rebuilt == lines2
+    return sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == 'equal')
+
+if __name__ == "__main__":
+    import difflib
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    lines1 = synthetic_postprocessor(n)
+    for rate in (0.001, 0.01, 0.05):
+        lines2 = mutate_lines(lines1, rate)
+        t0 = time.perf_counter()
+        old = difflib.SequenceMatcher(None, lines1, lines2).get_opcodes()
+        t_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = diff_opcodes(lines1, lines2)
+        t_new = time.perf_counter() - t0
+        eq_old, eq_new = _check(lines1, lines2, old), _check(lines1, lines2, new)
+        print(f"{n} Zeilen, Änderungsrate {rate:.1%}: difflib {t_old:.2f} s, neu {t_new:.2f} s ({t_old / t_new:.1f}x), "
+              f"gleiche Zeilen {eq_old} / {eq_new}")
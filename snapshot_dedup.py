@@ -0,0 +1,127 @@
+import os
+import filecmp
+import hashlib
+from collections import namedtuple
+
+from parse_cache import file_digest
+from snapshot_manifest import SNAPSHOT_MANIFEST, make_alias
+
+#Author Nico-RDF
+
+# =========================================================
+# DOPPELTE SNAPSHOTS (Vergleich über den Inhalts-Hash)
+# =========================================================
+# Vor dem Export: Gibt es im Ordner schon eine Datei mit exakt gleichem Inhalt?
+# Zuerst zählt nur die Größe (kommt ohnehin aus dem Verzeichnis-Index). Erst bei
+# gleicher Größe wird der SHA-1 verglichen – bevorzugt aus dem Manifest, nur
+# notfalls aus der Datei selbst (bei OneDrive "nur online" hieße das Download).
+# Aufräumen eines ganzen Ordners: nach Größe gruppieren, in Gruppen mit mehreren
+# Dateien erst die ersten 64 KB hashen und nur bei Gleichheit die ganze Datei.
+
+DuplicateGroup = namedtuple("DuplicateGroup", "keep remove sha1 size")
+
+PREFIX_BYTES = 64 * 1024
+
+def _known_digest(entry, records):
+    rec = (records or {}).get(entry.name)
+    if rec and rec.get("size") == entry.size and rec.get("sha1"): return rec["sha1"]
+    return None
+
+def _prefix_digest(path):
+    with open(path, "rb") as f: return hashlib.sha1(f.read(PREFIX_BYTES)).hexdigest()
+
+# ---------------------------------------------------------
+# Export: identischen Stand finden
+# ---------------------------------------------------------
+
+def find_identical(source_path, snapshots, records=None):
+    # Rückgabe: (neuester Snapshot mit gleichem Inhalt oder None, SHA-1 der Quelle oder None)
+    size = os.path.getsize(source_path)
+    candidates = [e for e in snapshots if e.size == size]
+    if not candidates: return None, None
+    digest = file_digest(source_path)
+    for e in candidates:
+        try: other = _known_digest(e, records) or file_digest(e.path)
+        except OSError: continue
+        if other == digest: return e, digest
+    return None, digest
+
+def check_export(source_path, dir_path, list_snapshots, manifest=SNAPSHOT_MANIFEST):
+    # Läuft im Hintergrund vor jedem Export
+    snapshots = list_snapshots(dir_path)
+    return find_identical(source_path, snapshots, manifest.records(dir_path) if snapshots else {})
+
+# ---------------------------------------------------------
+# Ordner aufräumen
+# ---------------------------------------------------------
+
+def find_duplicates(snapshots, records=None, progress=None):
+    # Behalten wird jeweils die älteste Datei einer Gruppe. Die neueste Datei im
+    # Ordner bleibt immer liegen, sonst würde sich "neueste Version" ändern.
+    by_size = {}
+    for e in snapshots: by_size.setdefault(e.size, []).append(e)
+    buckets = [b for b in by_size.values() if len(b) > 1]
+    newest = max((e.name for e in snapshots), default=None)
+    total = sum(len(b) for b in buckets)
+    done = 0
+
+    groups = []
+    for bucket in buckets:
+        if all(_known_digest(e, records) for e in bucket): candidates = [bucket]
+        else:
+            by_prefix = {}
+            for e in bucket:
+                try: by_prefix.setdefault(_prefix_digest(e.path), []).append(e)
+                except OSError: pass
+            candidates = [c for c in by_prefix.values() if len(c) > 1]
+
+        by_hash = {}
+        for c in candidates:
+            for e in c:
+                try: by_hash.setdefault(_known_digest(e, records) or file_digest(e.path), []).append(e)
+                except OSError: pass
+                done += 1
+                if progress is not None: progress(done, total)
+
+        for digest, same in by_hash.items():
+            if len(same) < 2: continue
+            same.sort(key=lambda e: e.name)
+            remove = [e for e in same[1:] if e.name != newest]
+            if remove: groups.append(DuplicateGroup(same[0], remove, digest, same[0].size))
+    groups.sort(key=lambda g: g.keep.name, reverse=True)
+    return groups
+
+def scan_duplicates(dir_path, list_snapshots, manifest=SNAPSHOT_MANIFEST, progress=None):
+    snapshots = list_snapshots(dir_path)
+    return find_duplicates(snapshots, manifest.records(dir_path) if snapshots else {}, progress)
+
+def remove_duplicates(dir_path, groups, manifest=SNAPSHOT_MANIFEST, progress=None):
+    # Vor dem Löschen Byte für Byte gegenprüfen. Jede entfernte Datei bleibt als
+    # Alias im Manifest stehen (wer hat wann exportiert), erst danach wird gelöscht.
+    # Rückgabe: (entfernte Dateinamen, freigegebene Bytes, Fehlermeldungen)
+    records = manifest.records(dir_path)
+    removed, freed, errors = [], 0, []
+    total, checked = sum(len(g.remove) for g in groups), 0
+    for g in groups:
+        verified = []
+        for e in g.remove:
+            if progress is not None: progress(checked, total)
+            checked += 1
+            try: same = filecmp.cmp(g.keep.path, e.path, shallow=False)
+            except OSError as err:
+                errors.append(f"{e.name}: {err}")
+                continue
+            if same: verified.append(e)
+            else: errors.append(f"{e.name}: Inhalt weicht doch ab – nicht entfernt")
+        if not verified: continue
+
+        manifest.append(dir_path, [make_alias(e.name, g.keep.name, g.sha1, e.size, "dedupe",
+                                              (records.get(e.name) or {}).get("created"), e.mtime) for e in verified])
+        for e in verified:
+            try: os.remove(e.path)
+            except OSError as err:
+                errors.append(f"{e.name}: {err}")
+                continue
+            removed.append(e.name)
+            freed += e.size
+    return removed, freed, errors
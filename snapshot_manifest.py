@@ -0,0 +1,194 @@
+import os
+import re
+import json
+import socket
+import threading
+from datetime import datetime
+
+from diagnostics import count
+from parse_cache import file_digest
+from sync_files import CURRENT_INITIALS, TOOLS_PREFIX, extract_initials_from_filename, scan_snapshot_table
+
+#Author Nico-RDF
+
+# =========================================================
+# MANIFEST IM SYNC-ORDNER
+# =========================================================
+# Neben den Snapshots liegt ein Ordner ".estlcam_manifest" mit einer JSON-Lines-
+# Datei pro Rechner (z. B. "NS_WERKSTATT-PC.jsonl"). Jeder Rechner hängt nur an
+# seine eigene Datei an – so gibt es keine OneDrive-Konflikte, wenn zwei Leute
+# gleichzeitig exportieren. Gelesen wird die Vereinigung aller Dateien.
+# Pro Snapshot: Dateiname, Größe, SHA-1, Initialen, Zeitpunkt und eine kurze
+# Inhaltsübersicht (Werkzeuge/Parametersätze bzw. Zeilen beim Postprozessor).
+# Fehlt ein Eintrag oder passt die Größe nicht mehr, wird er nachgetragen.
+# Aliase: Exporte ohne eigene Datei, weil der Inhalt schon als Snapshot existiert
+# ("alias_of" = Name der vorhandenen Datei). Sie zählen nicht als Snapshot.
+
+MANIFEST_DIR = ".estlcam_manifest"
+MANIFEST_SUFFIX = ".jsonl"
+MANIFEST_FORMAT = 1
+# Nachgetragene Einträge in Paketen schreiben, damit ein Abbruch nicht alles verwirft
+REBUILD_BATCH = 20
+
+def shard_name():
+    host = re.sub(r"[^A-Za-z0-9_-]+", "-", socket.gethostname() or "PC")
+    return f"{CURRENT_INITIALS}_{host}{MANIFEST_SUFFIX}"
+
+def kind_for(filename):
+    return "tools" if filename.startswith(TOOLS_PREFIX) else "post"
+
+def summarize(kind, filepath):
+    if kind == "tools":
+        from estlcam_dat import summarize_tools
+        return summarize_tools(filepath)
+    with open(filepath, "rb") as f:
+        return {"lines": sum(1 for _ in f)}
+
+def now_text():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def make_record(filepath, source="export", created=None):
+    name = os.path.basename(filepath)
+    kind = kind_for(name)
+    st = os.stat(filepath)
+    record = {
+        "v": MANIFEST_FORMAT, "file": name, "kind": kind, "size": st.st_size, "sha1": file_digest(filepath),
+        "initials": extract_initials_from_filename(name),
+        "created": created or datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
+        "recorded": now_text(), "by": shard_name()[:-len(MANIFEST_SUFFIX)],
+        "source": source,
+    }
+    try: record.update(summarize(kind, filepath))
+    except Exception as e:
+        # Unlesbare Datei trotzdem eintragen, sonst wird sie bei jedem Scan erneut versucht
+        record["error"] = str(e)
+    return record
+
+def make_alias(filename, alias_of, sha1, size, source="export", created=None, mtime=None):
+    if created is None:
+        created = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S") if mtime is not None else now_text()
+    return {
+        "v": MANIFEST_FORMAT, "file": filename, "kind": kind_for(filename), "alias_of": alias_of,
+        "size": size, "sha1": sha1, "initials": extract_initials_from_filename(filename),
+        "created": created, "recorded": now_text(), "by": shard_name()[:-len(MANIFEST_SUFFIX)], "source": source,
+    }
+
+def describe(record):
+    # Kurztext für die Spalte "Inhalt"
+    if record is None: return "…"
+    if "error" in record: return "unlesbar"
+    if record.get("kind") == "tools":
+        n_ps = len(record.get("paramsets", {}))
+        text = f"{record.get('tools', 0)} Werkzeuge, {n_ps} Sätze"
+    else:
+        text = f"{record.get('lines', 0)} Zeilen"
+    if record.get("aliases"): text += f" (+{len(record['aliases'])}× gleich exportiert)"
+    return text
+
+class SnapshotManifest:
+    def __init__(self):
+        self._shards = {}
+        self._lock = threading.Lock()
+        # Nachtrag und Export-Eintrag können gleichzeitig in dieselbe Shard-Datei schreiben
+        self._append_lock = threading.Lock()
+
+    def _read_shard(self, path):
+        try: st = os.stat(path)
+        except OSError: return []
+        signature = (st.st_size, st.st_mtime_ns)
+        with self._lock: cached = self._shards.get(path)
+        if cached is not None and cached[0] == signature: return cached[1]
+
+        records = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    # Unvollständige letzte Zeile (Sync noch nicht fertig) einfach überspringen
+                    try: rec = json.loads(line)
+                    except ValueError: continue
+                    if isinstance(rec, dict) and rec.get("file"): records.append(rec)
+        except OSError:
+            return []
+        with self._lock: self._shards[path] = (signature, records)
+        return records
+
+    def entries(self, dir_path):
+        # Rückgabe: ({Dateiname: neuester Eintrag}, {Snapshot: [Alias-Einträge]}) über alle Rechner
+        mdir = os.path.join(dir_path, MANIFEST_DIR)
+        try: shards = [e.path for e in os.scandir(mdir) if e.is_file() and e.name.endswith(MANIFEST_SUFFIX)]
+        except OSError: return {}, {}
+        merged = {}
+        for rec in sorted((r for p in shards for r in self._read_shard(p)), key=lambda r: r.get("recorded", "")):
+            if rec.get("deleted"): merged.pop(rec["file"], None)
+            else: merged[rec["file"]] = rec
+        records, aliases = {}, {}
+        for name, rec in merged.items():
+            if not rec.get("alias_of"):
+                records[name] = rec
+                continue
+            # Alias auf eine später selbst aufgeräumte Datei -> bis zur vorhandenen Datei folgen
+            target, seen = rec["alias_of"], {name}
+            while target not in seen and merged.get(target, {}).get("alias_of"):
+                seen.add(target)
+                target = merged[target]["alias_of"]
+            aliases.setdefault(target, []).append(rec)
+        return records, aliases
+
+    def records(self, dir_path):
+        return self.entries(dir_path)[0]
+
+    def append(self, dir_path, records):
+        if not records: return
+        mdir = os.path.join(dir_path, MANIFEST_DIR)
+        os.makedirs(mdir, exist_ok=True)
+        with self._append_lock, open(os.path.join(mdir, shard_name()), "a", encoding="utf-8") as f:
+            for rec in records: f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record_export(self, filepath):
+        record = make_record(filepath, "export", now_text())
+        self.append(os.path.dirname(filepath), [record])
+        return record
+
+    def record_alias(self, dir_path, filename, alias_of, sha1, size):
+        # Export ohne Kopie: Inhalt liegt schon als alias_of im Ordner
+        record = make_alias(filename, alias_of, sha1, size)
+        self.append(dir_path, [record])
+        return record
+
+    def record_deleted(self, dir_path, filename):
+        self.append(dir_path, [{"v": MANIFEST_FORMAT, "file": filename, "deleted": True, "recorded": now_text()}])
+
+    def missing(self, snapshots, records):
+        # Snapshots ohne passenden Eintrag (fehlend oder Größe geändert)
+        return [e for e in snapshots if e.name not in records or records[e.name].get("size") != e.size]
+
+    def rebuild(self, dir_path, entries, progress=None):
+        # Fehlende Einträge nachtragen (Fallback, wenn das Manifest fehlt oder veraltet ist)
+        batch, done = [], []
+        for n, e in enumerate(entries):
+            if progress is not None: progress(n, len(entries))
+            try: batch.append(make_record(e.path, "rebuild"))
+            except OSError: continue
+            if len(batch) >= REBUILD_BATCH:
+                self.append(dir_path, batch)
+                done += batch
+                batch = []
+        self.append(dir_path, batch)
+        return done + batch
+
+SNAPSHOT_MANIFEST = SnapshotManifest()
+
+def scan_with_manifest(path_current, dir_path, list_snapshots, current_name=None, manifest=SNAPSHOT_MANIFEST):
+    # Wie scan_snapshot_table, zusätzlich Inhalt aus dem Manifest und die Snapshots ohne Eintrag
+    snapshots = list_snapshots(dir_path)
+    records, aliases = manifest.entries(dir_path) if snapshots else ({}, {})
+    shown = dict(records)
+    for name, alias_records in aliases.items():
+        if name in shown: shown[name] = dict(shown[name], aliases=sorted(a["file"] for a in alias_records))
+    current_row, rows = scan_snapshot_table(path_current, dir_path, lambda _: snapshots, current_name, shown)
+    missing = manifest.missing(snapshots, records)
+    count("snapshots", len(snapshots))
+    count("manifest_missing", len(missing))
+    return current_row, rows, missing
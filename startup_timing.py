@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+
+#Author Nico-RDF
+
+# =========================================================
+# STARTZEIT-MESSUNG
+# =========================================================
+# Mit ESTLCAM_STARTUP_TIMING=1 wird nach dem Start auf stderr aufgeschlüsselt,
+# wofür die Zeit draufging: Imports, Konfiguration, einzelne build_*-Schritte
+# und die Ordner-Scans im Hintergrund. Ohne die Variable passiert nichts.
+
+ENV_FLAG = "ESTLCAM_STARTUP_TIMING"
+
+def timing_enabled():
+    return os.environ.get(ENV_FLAG, "") not in ("", "0")
+
+class StartupTimer:
+    def __init__(self, t0=None, enabled=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.enabled = timing_enabled() if enabled is None else enabled
+        self.steps = []
+        self.marks = []
+        self.reported = False
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, background=False):
+        if not self.enabled: return
+        if self.reported:
+            # Später gebaute Tabs o. Ä. direkt einzeln melden
+            self._print(f"[Startzeit] {name}: {seconds * 1000:.1f} ms")
+            return
+        with self._lock: self.steps.append((name, seconds, background))
+
+    @contextmanager
+    def step(self, name):
+        t = time.perf_counter()
+        try: yield
+        finally: self.add(name, time.perf_counter() - t)
+
+    def timed(self, name, func):
+        # Für Hintergrund-Jobs beim Start: misst die Laufzeit im Worker-Thread
+        if not self.enabled or self.reported: return func
+        def wrapper(*args):
+            t = time.perf_counter()
+            try: return func(*args)
+            finally: self.add(name, time.perf_counter() - t, background=True)
+        return wrapper
+
+    def mark(self, name):
+        if self.enabled and not self.reported: self.marks.append((name, time.perf_counter() - self.t0))
+
+    def report(self):
+        if not self.enabled or self.reported: return
+        self.reported = True
+        width = max([len(n) for n, _, _ in self.steps] + [len(n) for n, _ in self.marks] + [10]) + 15
+        lines = ["=== Startzeit ==="]
+        for name, seconds, background in self.steps:
+            label = f"{name} (Hintergrund)" if background else name
+            lines.append(f"  {label:<{width}} {seconds * 1000:8.1f} ms")
+        lines.append("  " + "-" * (width + 12))
+        for name, seconds in self.marks:
+            lines.append(f"  {name:<{width}} {seconds * 1000:8.1f} ms ab Programmstart")
+        self._print("\n".join(lines))
+
+    def _print(self, text):
+        # Unter pythonw gibt es kein stderr
+        if sys.stderr is None: return
+        print(text, file=sys.stderr, flush=True)
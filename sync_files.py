@@ -0,0 +1,233 @@
+import os
+import sys
+import shutil
+import getpass
+import tempfile
+from datetime import datetime
+
+from dir_index import DirectoryIndex
+from config_store import open_store
+
+#Author Nico-RDF
+
+# =========================================================
+# DATEI-SYNC OHNE GUI (Toollisten & Postprozessoren)
+# =========================================================
+# Alles, was Dateien findet, benennt und kopiert. Kein tkinter, kein pandas –
+# wird von der Oberfläche und von der Kommandozeile (estlcam_cli.py) genutzt.
+
+CONFIG_FILE = "last_paths.json"
+
+TOOLS_PREFIX = "ToolList_Powermill_V12"
+POST_PREFIX = "PostprozessorV12_"
+
+# Gemeinsamer Index aller Snapshot-Ordner (Name, Größe, mtime aus einem scandir-Durchlauf)
+SNAPSHOT_INDEX = DirectoryIndex()
+
+# Kopieren in Häppchen (Fortschritt pro Häppchen)
+COPY_CHUNK = 1024 * 1024
+
+# ---------------------------------------------------------
+# Benutzername & Initialen
+# ---------------------------------------------------------
+
+def get_user_initials():
+    username = getpass.getuser() or ""
+    clean = username.replace(".", " ").replace("_", " ").replace("-", " ")
+    parts = [p for p in clean.split() if p]
+    if not parts:
+        return "NA"
+    initials = "".join(p[0].upper() for p in parts)
+    return initials
+
+def get_user_display_name():
+    username = getpass.getuser() or ""
+    if not username:
+        return "Unbekannt"
+    clean = username.replace(".", " ").replace("_", " ").replace("-", " ")
+    parts = [p for p in clean.split() if p]
+    if not parts:
+        return username
+    return parts[0].capitalize()
+
+def extract_initials_from_filename(filename):
+    name, ext = os.path.splitext(filename)
+    parts = name.split("_")
+    if len(parts) < 2:
+        return ""
+    return parts[-1]
+
+CURRENT_INITIALS = get_user_initials()
+CURRENT_USER = get_user_display_name()
+
+# ---------------------------------------------------------
+# Pfad-Speicherung
+# ---------------------------------------------------------
+
+DEFAULT_PATHS = {
+    "path_estlcam_tools": "",
+    "path_onedrive_dir": "",
+    "path_estlcam_exe": "",
+    "path_estlcam_post": "",
+    "path_post_dir": "",
+    "last_sync_tools": {"direction": "", "timestamp": ""},
+    "last_sync_post": {"direction": "", "timestamp": ""},
+    "last_onedrive_files": [],
+    "last_post_files": []
+}
+# Werden kompakt (Hash + Abweichungen) gespeichert, siehe config_store.py
+FILE_LIST_KEYS = ("last_onedrive_files", "last_post_files")
+
+_CONFIG_STORES = {}
+
+def config_store():
+    # Ein Speicher pro Pfad (die Kommandozeile kann CONFIG_FILE per --config umstellen)
+    store = _CONFIG_STORES.get(CONFIG_FILE)
+    if store is None: store = _CONFIG_STORES[CONFIG_FILE] = open_store(CONFIG_FILE, DEFAULT_PATHS, FILE_LIST_KEYS)
+    return store
+
+def load_last_paths():
+    # Stand im Speicher (wird nur beim ersten Aufruf gelesen) – nicht direkt verändern
+    return config_store().load()
+
+def save_last_paths(**kwargs):
+    # Schreibt verzögert und gesammelt; flush_last_paths() erzwingt das Schreiben
+    config_store().update(**kwargs)
+
+def flush_last_paths():
+    # Rückgabe: Liste der Schreibfehler (leer = alles gespeichert)
+    return [e for e in (store.flush() for store in _CONFIG_STORES.values()) if e is not None]
+
+# ---------------------------------------------------------
+# Sicheres Kopieren
+# ---------------------------------------------------------
+# Nie direkt auf die Zieldatei schreiben: erst in eine temporäre Datei im
+# Zielordner (gleiches Laufwerk), auf die Platte zwingen (fsync) und dann in
+# einem Schritt umbenennen. Bricht der Vorgang ab, bleibt die alte Tools.dat
+# unversehrt. Der Punkt am Anfang des Namens hält die Datei aus den Snapshot-
+# Listen heraus. Unter Linux kopiert os.sendfile im Kernel, sonst readinto.
+
+def _copy_stream(src, dst, total, progress):
+    done = 0
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        try:
+            while True:
+                n = os.sendfile(dst.fileno(), src.fileno(), done, COPY_CHUNK)
+                if n == 0: return done
+                done += n
+                if progress is not None: progress(done, total)
+        except OSError:
+            # z. B. Dateisystem ohne sendfile: ab dem bisherigen Stand normal weiterkopieren
+            src.seek(done)
+    buf = memoryview(bytearray(COPY_CHUNK))
+    while True:
+        n = src.readinto(buf)
+        if not n: return done
+        dst.write(buf[:n])
+        done += n
+        if progress is not None: progress(done, total)
+
+def copy_file_atomic(src_path, dst_path, progress=None):
+    # progress(bytes_kopiert, bytes_gesamt) wird pro Häppchen aufgerufen
+    dst_dir = os.path.dirname(os.path.abspath(dst_path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(dst_path)}.", suffix=".tmp", dir=dst_dir)
+    try:
+        with open(src_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            total = os.fstat(src.fileno()).st_size
+            if progress is not None: progress(0, total)
+            done = _copy_stream(src, dst, total, progress)
+            dst.flush()
+            os.fsync(dst.fileno())
+        # Rechte der bisherigen Datei übernehmen (mkstemp legt mit 0600 an)
+        try: shutil.copymode(dst_path if os.path.exists(dst_path) else src_path, tmp)
+        except OSError: pass
+        os.replace(tmp, dst_path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+    _fsync_dir(dst_dir)
+    return done
+
+def _fsync_dir(dir_path):
+    # Umbenennung dauerhaft machen (nur POSIX; unter Windows nicht möglich/nötig)
+    if os.name != "posix": return
+    try: fd = os.open(dir_path, os.O_RDONLY)
+    except OSError: return
+    try: os.fsync(fd)
+    except OSError: pass
+    finally: os.close(fd)
+
+# ---------------------------------------------------------
+# Dateioperationen Toollisten & Postprozessoren
+# ---------------------------------------------------------
+
+def generate_new_tools_filename(base_dir):
+    now = datetime.now().strftime("%Y-%m-%d_%H-%M")
+    filename = f"ToolList_Powermill_V12_{now}_{CURRENT_INITIALS}.tl"
+    return os.path.join(base_dir, filename)
+
+def copy_tools_A_to_new_B(path_A, dir_B, progress=None):
+    new_B = generate_new_tools_filename(dir_B)
+    os.makedirs(dir_B, exist_ok=True)
+    copy_file_atomic(path_A, new_B, progress)
+    return new_B
+
+def copy_tools_B_to_A(path_B, path_A, progress=None):
+    copy_file_atomic(path_B, path_A, progress)
+    return path_A
+
+def list_tools_snapshots(path_B_dir):
+    return SNAPSHOT_INDEX.snapshots(path_B_dir, TOOLS_PREFIX)
+
+def find_tools_files(path_B_dir):
+    return [e.name for e in list_tools_snapshots(path_B_dir)]
+
+def generate_new_post_filename(base_dir):
+    today = datetime.now().strftime("%Y_%m_%d")
+    filename = f"PostprozessorV12_{today}_{CURRENT_INITIALS}"
+    return os.path.join(base_dir, filename)
+
+def copy_post_A_to_new_B(path_A, dir_B, progress=None):
+    new_B = generate_new_post_filename(dir_B)
+    os.makedirs(dir_B, exist_ok=True)
+    copy_file_atomic(path_A, new_B, progress)
+    return new_B
+
+def copy_post_B_to_A(path_B, path_A, progress=None):
+    copy_file_atomic(path_B, path_A, progress)
+    return path_A
+
+def list_post_snapshots(path_post_dir):
+    return SNAPSHOT_INDEX.snapshots(path_post_dir, POST_PREFIX)
+
+def find_post_files(path_post_dir):
+    return [e.name for e in list_post_snapshots(path_post_dir)]
+
+def scan_snapshot_table(path_current, dir_path, list_snapshots, current_name=None, records=None):
+    # Läuft im Hintergrund: liefert die Zeilen für "aktuelle Datei" + Versionstabelle.
+    # records: Manifest-Einträge {Dateiname: Eintrag}, landen als 5. Wert in jeder Zeile
+    current_row = None
+    if os.path.isfile(path_current):
+        mtime = os.path.getmtime(path_current)
+        dt = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
+        current_row = (current_name or os.path.basename(path_current), "", dt)
+
+    rows = []
+    snapshots = list_snapshots(dir_path)
+    if not snapshots: return current_row, rows
+
+    latest = snapshots[0].name
+    for e in snapshots:
+        rows.append(snapshot_row(e, e.name == latest, (records or {}).get(e.name)))
+    return current_row, rows
+
+def snapshot_tag(filename, is_latest):
+    if extract_initials_from_filename(filename) == CURRENT_INITIALS: return "user_current"
+    return "latest" if is_latest else "normal"
+
+def snapshot_row(entry, is_latest, record=None):
+    # Zeile für die Versionstabellen: (Datei, Initialen, Datum, Tag, Manifest-Eintrag)
+    dt = datetime.fromtimestamp(entry.mtime).strftime("%Y-%m-%d %H:%M:%S")
+    initials = (record or {}).get("initials") or extract_initials_from_filename(entry.name)
+    return entry.name, initials, dt, snapshot_tag(entry.name, is_latest), record
@@ -0,0 +1,194 @@
+import gzip
+import random
+import struct
+import argparse
+from collections import namedtuple
+from functools import lru_cache
+
+#Author Nico-RDF
+
+# =========================================================
+# SYNTHETISCHE TOOLS.DAT (für Benchmarks & Tests)
+# =========================================================
+# Schreibt gzip-Dateien im selben Aufbau wie eine echte Estlcam Tools.dat:
+#   - vorne die Parametersatz-Namen als \x04Last<len><Name>
+#   - pro Werkzeug ein Kopf: Number, Name, Diameter, Flutes + weitere Parameter
+#     (ergibt den Satz "Standard")
+#   - danach pro Parametersatz ein Block: Suitability (= Index + 2), F, Rpm, … + weitere Parameter
+#   - Werte als <len><key>\x01D<double> bzw. <len><key>\x01S<len><text>
+# Zwischen den Tokens liegen zufällige Füllbytes, die nie wie ein Token aussehen
+# (0x00 bzw. >= 0x80) – wie die unbekannten Bytes in echten Dateien.
+# Jedes Werkzeug hat einen eigenen Zufallsgenerator (Seed + Nummer): Dateien sind
+# reproduzierbar und werden Werkzeug für Werkzeug geschrieben, ohne alles im Speicher.
+#
+# Zweite, "geänderte" Datei (generate_pair): pro Zeile (Kopf bzw. Parametersatz-
+# Block) wird mit Wahrscheinlichkeit "changed" ein Wert geändert, Werkzeuge fallen
+# mit "removed" weg, "added" hängt neue an. Die erwartete Anzahl Änderungen pro
+# Parametersatz kommt mit zurück – so lässt sich das Diff-Ergebnis gegenprüfen.
+
+SyntheticSpec = namedtuple("SyntheticSpec", "tools paramsets params noise seed", defaults=(4, 1))
+
+PARAMSET_NAMES = ["Holz", "Alu", "POM", "Acryl", "MDF", "Messing", "Stahl", "HPL", "Kupfer", "Carbon"]
+# Füllbytes: können weder Längenbyte (0x01–0x32) noch Key-Zeichen (0x20–0x7e) sein.
+# Zufallsbytes werden per translate auf 0x00 bzw. 0x80–0xff abgebildet.
+_FILL_TABLE = bytes(b if b == 0 or b >= 0x80 else b | 0x80 for b in range(256))
+_DOUBLE = struct.Struct('<d')
+
+def paramset_names(count):
+    return [PARAMSET_NAMES[i] if i < len(PARAMSET_NAMES) else f"Satz {i + 1}" for i in range(count)]
+
+# ---------------------------------------------------------
+# Tokens
+# ---------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _prefix(key, type_char):
+    raw = key.encode('ascii')
+    return bytes([len(raw)]) + raw + b'\x01' + type_char
+
+def encode_value(key, val):
+    if isinstance(val, str):
+        raw = val.encode('utf-8')[:255]
+        return _prefix(key, b'S') + bytes([len(raw)]) + raw
+    return _prefix(key, b'D') + _DOUBLE.pack(float(val))
+
+def encode_last(name):
+    raw = name.encode('utf-8')[:255]
+    return b'\x04Last' + bytes([len(raw)]) + raw
+
+def _fill(r, noise):
+    if not noise: return b''
+    return r.randbytes(r.randrange(noise + 1)).translate(_FILL_TABLE)
+
+# ---------------------------------------------------------
+# Werkzeuge
+# ---------------------------------------------------------
+
+def make_tool(spec, number):
+    # {"head": {Key: Wert}, "blocks": [{Key: Wert}, … pro Parametersatz]}
+    r = random.Random(f"{spec.seed}:{number}")
+    head = {'Number': number, 'Name': f"Fräser {number} ø{r.randrange(1, 13)} {r.choice(('VHM', 'HSS', 'Diamant'))}",
+            'Diameter': round(r.uniform(0.5, 20), 3), 'Flutes': r.randrange(1, 5)}
+    for p in range(spec.params): head[f"Param_{p}"] = round(r.uniform(0, 100), 4)
+    blocks = []
+    for _ in range(spec.paramsets):
+        block = {'F': round(r.uniform(5, 60), 3), 'Rpm': r.randrange(8000, 24001, 500), 'Dpp': round(r.uniform(0.1, 5), 3),
+                 'Fz': round(r.uniform(0.01, 0.2), 4), 'Plunge_Angle': r.randrange(1, 90), 'Stepover': round(r.uniform(10, 60), 1)}
+        for p in range(spec.params): block[f"P{p}"] = round(r.uniform(0, 100), 4)
+        block['Comment'] = r.choice(("", "Schlichten", "Schruppen", "Test"))
+        blocks.append(block)
+    return {'head': head, 'blocks': blocks}
+
+def _changed_value(r, val):
+    if isinstance(val, str): return val + " geändert"
+    # Deutlich genug, dass der Vergleich (3 Nachkommastellen, F * 60 gerundet) es sieht
+    return val + 1 + r.randrange(100)
+
+def mutate_tool(tool, r, changed):
+    # Rückgabe: geändertes Werkzeug + Indizes der geänderten Zeilen (0 = Kopf, 1.. = Blöcke)
+    head, blocks = dict(tool['head']), [dict(b) for b in tool['blocks']]
+    rows = set()
+    # Im Kopf nur die zusätzlichen Parameter: Name/Ø/Zähne stehen in jeder Zeile und würden alle Sätze ändern
+    head_keys = [k for k in head if k.startswith("Param_")]
+    if head_keys and r.random() < changed:
+        key = r.choice(head_keys)
+        head[key] = _changed_value(r, head[key])
+        rows.add(0)
+    for i, block in enumerate(blocks):
+        if r.random() < changed:
+            key = r.choice(list(block))
+            block[key] = _changed_value(r, block[key])
+            rows.add(i + 1)
+    return {'head': head, 'blocks': blocks}, rows
+
+def encode_tool(tool, r, noise):
+    out = bytearray()
+    for key, val in tool['head'].items():
+        out += encode_value(key, val)
+        out += _fill(r, noise)
+    for i, block in enumerate(tool['blocks']):
+        out += encode_value('Suitability', i + 2)
+        out += _fill(r, noise)
+        for key, val in block.items():
+            out += encode_value(key, val)
+            out += _fill(r, noise)
+    return out
+
+def encode_header(spec, r):
+    out = bytearray(_fill(r, 40) or b'\x00')
+    for name in paramset_names(spec.paramsets):
+        out += encode_last(name)
+        out += _fill(r, spec.noise)
+    return out
+
+# ---------------------------------------------------------
+# Dateien schreiben
+# ---------------------------------------------------------
+
+def write_tools_dat(path, spec):
+    # Rückgabe: Anzahl entpackter Bytes
+    r = random.Random(f"{spec.seed}:fill")
+    size = 0
+    with gzip.open(path, 'wb', compresslevel=6) as f:
+        chunk = encode_header(spec, r)
+        for number in range(1, spec.tools + 1):
+            chunk += encode_tool(make_tool(spec, number), r, spec.noise)
+            if len(chunk) >= 1 << 20:
+                f.write(chunk)
+                size += len(chunk)
+                chunk = bytearray()
+        f.write(chunk)
+        size += len(chunk)
+    return size
+
+def generate_pair(path1, path2, spec, changed=0.05, removed=0.01, added=0.01, mutation_seed=2):
+    # Schreibt Original + geänderte Kopie. Rückgabe: {Paramset: erwartete Änderungen}
+    # (geänderte Zeilen + fehlende Werkzeuge auf beiden Seiten, wie count_changes zählt)
+    names = ["Standard"] + paramset_names(spec.paramsets)
+    expected = dict.fromkeys(names, 0)
+    write_tools_dat(path1, spec)
+
+    r = random.Random(f"{spec.seed}:{mutation_seed}:mutate")
+    fill = random.Random(f"{spec.seed}:{mutation_seed}:fill")
+    missing = 0
+    with gzip.open(path2, 'wb', compresslevel=6) as f:
+        f.write(encode_header(spec, fill))
+        for number in range(1, spec.tools + 1):
+            if r.random() < removed:
+                missing += 1
+                continue
+            tool, rows = mutate_tool(make_tool(spec, number), r, changed)
+            for row in rows: expected[names[row]] += 1
+            f.write(encode_tool(tool, fill, spec.noise))
+        extra = int(round(spec.tools * added))
+        for number in range(spec.tools + 1, spec.tools + extra + 1):
+            f.write(encode_tool(make_tool(spec._replace(seed=f"{spec.seed}:added"), number), fill, spec.noise))
+    missing += extra
+    return {ps: n + missing for ps, n in expected.items()}
+
+# ---------------------------------------------------------
+# python synthetic_dat.py A.dat [--tools 1000 --paramsets 5 --params 40] [--changed B.dat --rate 0.05]
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetische Tools.dat schreiben")
+    parser.add_argument("output")
+    parser.add_argument("--tools", type=int, default=1000)
+    parser.add_argument("--paramsets", type=int, default=5)
+    parser.add_argument("--params", type=int, default=40, help="zusätzliche Parameter pro Zeile")
+    parser.add_argument("--noise", type=int, default=4, help="max. Füllbytes zwischen zwei Tokens")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--changed", metavar="DATEI", help="zusätzlich eine geänderte Kopie schreiben")
+    parser.add_argument("--rate", type=float, default=0.05, help="Anteil geänderter Zeilen")
+    parser.add_argument("--removed", type=float, default=0.01)
+    parser.add_argument("--added", type=float, default=0.01)
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(args.tools, args.paramsets, args.params, args.noise, args.seed)
+    if args.changed:
+        expected = generate_pair(args.output, args.changed, spec, args.rate, args.removed, args.added)
+        print(f"{args.output} + {args.changed} geschrieben, erwartete Änderungen: "
+              + ", ".join(f"{ps} {n}" for ps, n in expected.items()))
+    else:
+        size = write_tools_dat(args.output, spec)
+        print(f"{args.output}: {spec.tools} Werkzeuge, {size / 1e6:.1f} MB entpackt")
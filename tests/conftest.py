@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+#Author Nico-RDF
+
+# Die Module liegen flach im Projektordner (kein Paket) – für pytest in den Suchpfad
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path: sys.path.insert(0, ROOT)
+
+@pytest.fixture(autouse=True)
+def app_data(tmp_path, monkeypatch):
+    # Parse-Cache, Konfiguration & Co. nie ins echte %APPDATA% schreiben
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    return tmp_path / "appdata"
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+import config_store
+import diagnostics
+from config_store import ConfigStore, files_path_for
+
+#Author Nico-RDF
+
+DEFAULTS = {"path": "", "files": []}
+
+def make_store(tmp_path, debounce=0):
+    return ConfigStore(str(tmp_path / "last_paths.json"), DEFAULTS, ("files",), debounce)
+
+@pytest.fixture
+def diag(tmp_path, monkeypatch):
+    log = diagnostics.Diagnostics(log_path=str(tmp_path / "diag.jsonl"), profile="")
+    monkeypatch.setattr(diagnostics, "DIAG", log)
+    return log
+
+def fail_writes(monkeypatch):
+    def write_json_atomic(path, data, indent=None): raise OSError(28, "No space left on device")
+    monkeypatch.setattr(config_store, "write_json_atomic", write_json_atomic)
+
+def test_roundtrip(tmp_path):
+    store = make_store(tmp_path)
+    assert store.load() == DEFAULTS and store.writes == 0
+    names = [f"ToolList_{i:03}.dat" for i in range(200)]
+    store.update(path="C:/ä ö", files=names)
+    assert make_store(tmp_path).load() == {"path": "C:/ä ö", "files": names}
+
+    # Kleine Änderung: nur die Hauptdatei mit Abweichungen, Basisliste bleibt unberührt
+    files_path = files_path_for(store.path)
+    before = (tmp_path / "last_paths.files.json").stat().st_mtime_ns
+    changed = names[1:] + ["ToolList_new.dat"]
+    store.update(files=changed)
+    assert (tmp_path / "last_paths.files.json").stat().st_mtime_ns == before
+    with open(store.path, encoding="utf-8") as f: entry = json.load(f)["files"]
+    assert (entry["added"], entry["removed"], entry["count"]) == (["ToolList_new.dat"], [names[0]], 200)
+    assert make_store(tmp_path).load()["files"] == sorted(changed)
+
+    # Viele Änderungen: neue Basis
+    store.update(files=names[:50])
+    with open(files_path, encoding="utf-8") as f: assert json.load(f)["files"]["names"] == names[:50]
+    assert make_store(tmp_path).load()["files"] == names[:50]
+
+    # Unveränderte Werte schreiben nichts
+    writes = store.writes
+    store.update(path="C:/ä ö", files=list(reversed(names[:50])))
+    assert store.writes == writes
+
+def test_debounce_collects_updates(tmp_path):
+    store = make_store(tmp_path, debounce=60)
+    for n in range(10): store.update(path=f"C:/{n}")
+    assert store.writes == 0 and not (tmp_path / "last_paths.json").exists()
+    assert store.flush() is None and store.writes == 1
+    assert make_store(tmp_path).load()["path"] == "C:/9"
+
+def test_write_error_is_logged_and_reported(tmp_path, monkeypatch, diag):
+    store = make_store(tmp_path, debounce=60)
+    store.update(path="C:/a")
+    fail_writes(monkeypatch)
+    # Verzögertes Schreiben scheitert -> Diagnose-Log, flush() meldet den Fehler
+    error = store.flush()
+    assert isinstance(error, OSError) and store.error is error
+    assert [e["name"] for e in diag.recent()] == ["config_write"]
+    assert "No space left" in diag.recent()[0]["error"]
+    with open(diag.log_path, encoding="utf-8") as f: assert json.loads(f.readline())["name"] == "config_write"
+
+    # Derselbe Fehler beim nächsten Versuch nicht noch einmal loggen
+    assert store.flush() is not None
+    assert len(diag.recent()) == 1
+
+    # Wieder beschreibbar: nichts geht verloren, Fehler ist weg
+    monkeypatch.undo()
+    assert store.flush() is None and store.error is None
+    assert make_store(tmp_path).load()["path"] == "C:/a"
+
+def test_mismatched_base_keeps_list(tmp_path):
+    store = make_store(tmp_path)
+    names = [f"ToolList_{i:03}.dat" for i in range(100)]
+    store.update(files=names)
+    store.update(files=names + ["ToolList_new.dat"])
+
+    # Basisdatei aus einem anderen Schreibvorgang (z. B. Absturz zwischen den beiden Dateien)
+    files_path = files_path_for(store.path)
+    with open(files_path, encoding="utf-8") as f: files = json.load(f)
+    files["files"]["digest"] = "0" * 40
+    files["files"]["names"] = names[:-1]
+    with open(files_path, "w", encoding="utf-8") as f: json.dump(files, f)
+
+    reread = make_store(tmp_path)
+    # Bester Stand statt [] (sonst meldet die Ordnerüberwachung gar nichts mehr)
+    assert reread.load()["files"] == sorted(names[:-1] + ["ToolList_new.dat"])
+    reread.update(files=names + ["ToolList_new.dat", "ToolList_newer.dat"])
+    assert make_store(tmp_path).load()["files"] == sorted(names + ["ToolList_new.dat", "ToolList_newer.dat"])
+
+def test_missing_base_is_unknown(tmp_path):
+    store = make_store(tmp_path)
+    store.update(files=["a.dat", "b.dat"])
+    (tmp_path / "last_paths.files.json").unlink()
+    assert make_store(tmp_path).load()["files"] == []
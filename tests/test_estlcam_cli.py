@@ -0,0 +1,33 @@
+import pytest
+
+import diagnostics
+import estlcam_cli
+from estlcam_cli import EXIT_DIFFERENT, EXIT_INTERNAL_ERROR, EXIT_NOT_FOUND, EXIT_OK, main
+
+#Author Nico-RDF
+
+# Exit-Codes für Skripte: 1 nur, wenn ein Vergleich wirklich Unterschiede gefunden hat
+
+@pytest.fixture
+def cli(tmp_path, monkeypatch):
+    monkeypatch.setattr(estlcam_cli, "DIAG", diagnostics.Diagnostics(log_path=str(tmp_path / "diag.jsonl"), profile=""))
+    def run(*argv): return main(["--config", str(tmp_path / "last_paths.json"), *argv])
+    return run
+
+def test_diff_pp_codes(tmp_path, cli):
+    a, b = tmp_path / "a.pp", tmp_path / "b.pp"
+    a.write_text("G0 X0\nG1 X1\n", encoding="utf-8")
+    b.write_text("G0 X0\nG1 X2\n", encoding="utf-8")
+    assert cli("diff-pp", str(a), str(a), "--quiet") == EXIT_OK
+    assert cli("diff-pp", str(a), str(b), "--quiet") == EXIT_DIFFERENT
+    assert cli("diff-pp", str(a), str(tmp_path / "fehlt.pp")) == EXIT_NOT_FOUND
+
+def test_unexpected_error_is_not_different(tmp_path, cli, monkeypatch, capsys):
+    def read_pp_lines(path): raise ValueError("kaputt")
+    monkeypatch.setattr("pp_diff.read_pp_lines", read_pp_lines)
+    a = tmp_path / "a.pp"
+    a.write_text("G0 X0\n", encoding="utf-8")
+    code = cli("diff-pp", str(a), str(a))
+    assert code == EXIT_INTERNAL_ERROR and code != EXIT_DIFFERENT
+    err = capsys.readouterr().err
+    assert "Traceback" in err and "Unerwarteter Fehler: ValueError: kaputt" in err
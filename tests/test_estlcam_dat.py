@@ -0,0 +1,118 @@
+import gzip
+import random
+
+import pytest
+
+from estlcam_dat import MAX_TOKEN_LEN, ToolsDatIndex, iter_tool_records, parse_records
+from synthetic_dat import SyntheticSpec, encode_last, encode_value, write_tools_dat
+
+#Author Nico-RDF
+
+# Offset-Index und Streaming-Parser gegen den sequenziellen Parser: jeder Parametersatz
+# muss schon beim ersten Dekodieren genau die Datensätze liefern, die parse_records findet,
+# und iter_tool_records muss bei jeder Blockgröße dasselbe liefern.
+
+SPEC = SyntheticSpec(tools=30, paramsets=3, params=5)
+# Fremdkörper für die Mutationen: Grenz-Tokens, halbe Tokens und Grenz-Muster in einem Text
+INSERTS = [encode_value('Number', 7), encode_value('Name', 'X'), encode_value('Suitability', 3), encode_value('Diameter', 2),
+           encode_value('Flutes', 1), encode_last('Foo'), encode_last(''), b'\x06Number\x01D', b'\x01S\x10', b'\x01D',
+           encode_value('Name', '\x06Number\x01D12345678'), encode_value('Comment', '\x04Name\x01S\x01X')]
+
+@pytest.fixture(scope="module")
+def clean_data(tmp_path_factory):
+    path = tmp_path_factory.mktemp("dat") / "Tools.dat"
+    write_tools_dat(str(path), SPEC)
+    with gzip.open(path, 'rb') as f: return f.read()
+
+def sequential(data):
+    by_paramset = {}
+    for rec in parse_records(data):
+        by_paramset.setdefault(rec.get('Paramset', 'Standard'), []).append(rec)
+    return by_paramset
+
+def assert_index_matches(data):
+    try: expected = sequential(data)
+    except (ValueError, OverflowError) as e:
+        # Unbrauchbare Datei: der Index meldet denselben Fehler
+        with pytest.raises(type(e)): ToolsDatIndex(data)
+        return
+    paramsets = set(expected) | set(ToolsDatIndex(data).paramsets())
+    for ps in paramsets:
+        # Frischer Index pro Satz: gezählt wird das erste Dekodieren, nicht ein späterer Rückfall
+        assert repr(ToolsDatIndex(data).records(ps)) == repr(expected.get(ps, [])), ps
+
+def assert_stream_matches(tmp_path, data, chunk_sizes=(1, 7, MAX_TOKEN_LEN, 4096)):
+    path = tmp_path / "stream.dat"
+    with gzip.open(path, 'wb') as f: f.write(data)
+    try: expected = repr(parse_records(data))
+    except (ValueError, OverflowError) as e:
+        for chunk_size in chunk_sizes:
+            with pytest.raises(type(e)): list(iter_tool_records(str(path), chunk_size))
+        return
+    for chunk_size in chunk_sizes:
+        assert repr(list(iter_tool_records(str(path), chunk_size))) == expected, chunk_size
+
+def mutate(r, data):
+    d = bytearray(data)
+    for _ in range(r.randrange(1, 6)):
+        op, p = r.randrange(4), r.randrange(len(d))
+        if op == 0: d[p] = r.randrange(256)
+        elif op == 1: d[p:p] = r.choice(INSERTS)
+        elif op == 2: del d[p:p + r.randrange(1, 40)]
+        else: d[p:p] = r.randbytes(r.randrange(1, 10))
+    return bytes(d)
+
+def test_clean_file(clean_data):
+    index = ToolsDatIndex(clean_data)
+    assert index.regions is not None
+    assert index.paramsets() == sorted(sequential(clean_data))
+    assert_index_matches(clean_data)
+
+def test_boundary_pattern_inside_text():
+    # "\x06Number\x01D…" und "\x04Last" als Teil eines Werkzeugnamens sind keine Grenzen
+    data = b''.join([b'\x00', encode_last('Alu'),
+                     encode_value('Number', 1), encode_value('Name', '\x06Number\x01D12345678'),
+                     encode_value('Suitability', 2), encode_value('F', 10.0),
+                     encode_value('Number', 2), encode_value('Name', 'B \x04Last\x03Foo'),
+                     encode_value('Suitability', 2), encode_value('F', 20.0)])
+    index = ToolsDatIndex(data)
+    assert index.regions is not None
+    assert index.paramsets() == ['Alu', 'Standard']
+    assert_index_matches(data)
+
+def test_empty_paramset_name():
+    # Leerer Last-Name ist ein eigener Parametersatz – im Index wie im Rückfall auf den Parser
+    data = b''.join([b'\x00', encode_last(''), encode_last('Alu'),
+                     encode_value('Number', 1), encode_value('Name', 'A'),
+                     encode_value('Suitability', 2), encode_value('F', 10.0),
+                     encode_value('Suitability', 3), encode_value('F', 20.0)])
+    expected = sequential(data)
+    assert sorted(expected) == ['', 'Alu', 'Standard']
+    index = ToolsDatIndex(data)
+    assert index.regions is not None and index.paramsets() == ['', 'Alu', 'Standard']
+    assert_index_matches(data)
+    index._fall_back()
+    assert index.paramsets() == ['', 'Alu', 'Standard']
+    assert repr(index.records('')) == repr(expected[''])
+
+def test_corrupted_files(clean_data):
+    r = random.Random(20)
+    for _ in range(300):
+        assert_index_matches(mutate(r, clean_data))
+
+def test_fallback_switches_state_at_once(clean_data):
+    index = ToolsDatIndex(clean_data)
+    digest = index.raw_digest('Alu')
+    index._fall_back()
+    assert index.regions is None
+    assert index.paramsets() == sorted(sequential(clean_data))
+    assert index.raw_digest('Alu') != digest
+    assert repr(index.records('Alu')) == repr(sequential(clean_data)['Alu'])
+
+def test_stream_clean_file(tmp_path, clean_data):
+    assert_stream_matches(tmp_path, clean_data)
+
+def test_stream_corrupted_files(tmp_path, clean_data):
+    r = random.Random(3)
+    for _ in range(60):
+        assert_stream_matches(tmp_path, mutate(r, clean_data), (1, 97, 4096))
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from jobs import JobRunner, report_progress
+
+#Author Nico-RDF
+
+# JobRunner ohne Tk: root.after() wird gemerkt und von pump() im Testthread ausgeführt
+
+class FakeRoot:
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, func):
+        self.pending.append(func)
+
+def pump(root, runner, timeout=5):
+    end = time.monotonic() + timeout
+    while root.pending and time.monotonic() < end:
+        root.pending.pop(0)()
+        if root.pending: time.sleep(0.005)
+    assert not runner.active
+
+def blocking_job(release, result):
+    def work():
+        release.wait(5)
+        report_progress(1, 1)
+        return result
+    return work
+
+def test_new_job_supersedes_old():
+    root, done = FakeRoot(), []
+    runner = JobRunner(root, max_workers=2, poll_ms=1)
+    release = threading.Event()
+    runner.submit("scan", blocking_job(release, "alt"), on_done=done.append)
+    runner.submit("scan", lambda: "neu", on_done=done.append)
+    release.set()
+    pump(root, runner)
+    assert done == ["neu"]
+
+def test_keep_job_is_not_superseded():
+    # Fertige Kopie: Buchführung (on_done) läuft, auch wenn im Kanal schon der nächste Job steht
+    root, done = FakeRoot(), []
+    runner = JobRunner(root, max_workers=2, poll_ms=1)
+    release = threading.Event()
+    runner.submit("export_tools", blocking_job(release, "kopie"), on_done=done.append, keep=True)
+    runner.submit("export_tools", lambda: "abgleich", on_done=done.append)
+    assert len(runner.active) == 2
+    assert "⏳" in runner.status_text()
+    release.set()
+    pump(root, runner)
+    assert sorted(done) == ["abgleich", "kopie"]
+
+def test_cancel_all_stops_keep_jobs():
+    root, done = FakeRoot(), []
+    runner = JobRunner(root, max_workers=1, poll_ms=1)
+    release = threading.Event()
+    runner.submit("export_tools", blocking_job(release, "kopie"), on_done=done.append, keep=True)
+    runner.submit("export_tools", lambda: "abgleich", on_done=done.append)
+    runner.cancel_all()
+    release.set()
+    pump(root, runner)
+    assert done == []
@@ -0,0 +1,116 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from parse_cache import ENTRY_SUFFIX, ParseCache
+
+#Author Nico-RDF
+
+# Parse-Cache: Schlüssel folgt dem Inhalt, Teile haben eigene Einträge, LRU hält max_bytes ein,
+# kaputte Einträge werden neu eingelesen und die Zähler stimmen auch bei parallelen Jobs.
+
+class Parser:
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, filepath):
+        with self._lock: self.calls += 1
+        with open(filepath, "rb") as f: data = f.read()
+        return pd.DataFrame({"size": [len(data)], "head": [data[:8].decode("latin-1")]})
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(str(tmp_path / "cache"))
+
+def write(path, data, mtime=None):
+    path.write_bytes(data)
+    if mtime is not None: os.utime(path, (mtime, mtime))
+    return str(path)
+
+def entries(cache):
+    return sorted(e.name for e in os.scandir(cache.cache_dir) if e.name.endswith(ENTRY_SUFFIX))
+
+def test_hit_after_first_parse(tmp_path, cache):
+    parse = Parser()
+    path = write(tmp_path / "a.dat", b"A" * 100)
+    first = cache.get_or_parse(path, parse)
+    second = cache.get_or_parse(path, parse)
+    assert parse.calls == 1 and second.equals(first)
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0}
+    # Neue Instanz (nächste Sitzung) liest von der Platte
+    assert ParseCache(cache.cache_dir).get_or_parse(path, parse).equals(first) and parse.calls == 1
+
+def test_content_change_invalidates(tmp_path, cache):
+    parse = Parser()
+    path = write(tmp_path / "a.dat", b"A" * 100, mtime=1_000_000)
+    cache.get_or_parse(path, parse)
+    # Gleiche Größe, anderer Inhalt, neue mtime -> neuer Schlüssel
+    write(tmp_path / "a.dat", b"B" * 100, mtime=1_000_100)
+    assert cache.get_or_parse(path, parse)["head"][0] == "B" * 8
+    assert parse.calls == 2 and len(entries(cache)) == 2
+
+    # Gleicher Inhalt unter anderem Namen -> derselbe Eintrag
+    copy = write(tmp_path / "b.dat", b"B" * 100)
+    cache.get_or_parse(copy, parse)
+    assert parse.calls == 2
+
+def test_parts_have_own_entries(tmp_path, cache):
+    parse = Parser()
+    path = write(tmp_path / "a.dat", b"A" * 100)
+    for part in ("Alu", "Holz", "Alu", None, "Holz"): cache.get_or_parse(path, parse, part)
+    assert parse.calls == 3 and len(entries(cache)) == 3
+    assert cache.stats()["hits"] == 2
+
+def test_lru_eviction(tmp_path):
+    parse = Parser()
+    paths = [write(tmp_path / f"{n}.dat", bytes([65 + n]) * 100) for n in range(4)]
+    cache = ParseCache(str(tmp_path / "cache"), max_bytes=10**9)
+    for p in paths[:3]: cache.get_or_parse(p, parse)
+    size = max(os.path.getsize(os.path.join(cache.cache_dir, e)) for e in entries(cache))
+    # Zugriffszeiten festlegen: 0 am längsten unbenutzt, dann 1, 2
+    by_path = {p: cache.key_for(p) + ENTRY_SUFFIX for p in paths}
+    for n, p in enumerate(paths[:3]): os.utime(os.path.join(cache.cache_dir, by_path[p]), (1_000_000 + n, 1_000_000 + n))
+
+    # Treffer auf 0 macht ihn zum jüngsten; beim nächsten Eintrag fliegt 1 raus
+    cache.get_or_parse(paths[0], parse)
+    cache.max_bytes = 3 * size + size // 2
+    cache.get_or_parse(paths[3], parse)
+    assert sorted(entries(cache)) == sorted(by_path[p] for p in (paths[0], paths[2], paths[3]))
+    assert cache.stats()["evictions"] == 1
+    assert sum(os.path.getsize(os.path.join(cache.cache_dir, e)) for e in entries(cache)) <= cache.max_bytes
+
+def test_corrupt_entry_is_reparsed(tmp_path, cache):
+    parse = Parser()
+    path = write(tmp_path / "a.dat", b"A" * 100)
+    expected = cache.get_or_parse(path, parse)
+    entry = os.path.join(cache.cache_dir, entries(cache)[0])
+    for garbage in (b"", b"kein pickle", b"\x80\x05\x95"):
+        with open(entry, "wb") as f: f.write(garbage)
+        assert cache.get_or_parse(path, parse).equals(expected)
+    assert parse.calls == 4
+    # Danach wieder ein gültiger Eintrag
+    assert cache.get_or_parse(path, parse).equals(expected) and parse.calls == 4
+
+def test_unreadable_file_is_parsed_directly(tmp_path, cache):
+    assert cache.get_or_parse(str(tmp_path / "fehlt.dat"), lambda p: "direkt") == "direkt"
+    assert cache.stats() == {"hits": 0, "misses": 0, "evictions": 0}
+
+def test_parallel_jobs(tmp_path, cache):
+    parse = Parser()
+    paths = [write(tmp_path / f"{n}.dat", bytes([65 + n]) * 1000) for n in range(4)]
+    errors = []
+    def job(k):
+        try:
+            for n in range(50): cache.get_or_parse(paths[(n + k) % 4], parse, f"ps{n % 3}")
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=job, args=(k,)) for k in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    stats = cache.stats()
+    assert errors == []
+    assert stats["hits"] + stats["misses"] == 8 * 50
+    assert stats["misses"] == parse.calls and len(entries(cache)) == 12
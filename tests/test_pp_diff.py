@@ -0,0 +1,99 @@
+import difflib
+import random
+
+import pytest
+
+from diagnostics import Diagnostics
+from pp_diff import (MISSING_TEXT, diff_opcodes, fold_opcodes, iter_pp_rows, mutate_lines, repetitive_postprocessor,
+                     substitute_lines, synthetic_postprocessor)
+
+#Author Nico-RDF
+
+# Opcodes müssen beide Dateien lückenlos abdecken (wie difflib), equal-Blöcke wirklich gleich
+# sein – und der Aufwand (Zähler im Messpunkt) darf auch bei repetitiven Dateien nicht
+# quadratisch werden. Laufzeiten misst benchmark.py bzw. python pp_diff.py.
+
+def assert_valid(lines1, lines2, opcodes):
+    i = j = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        assert tag in ('equal', 'replace', 'delete', 'insert')
+        if tag == 'equal': assert lines1[i1:i2] == lines2[j1:j2]
+        if tag == 'delete': assert j1 == j2 and i1 < i2
+        if tag == 'insert': assert i1 == i2 and j1 < j2
+        i, j = i2, j2
+    assert (i, j) == (len(lines1), len(lines2))
+
+def equal_lines(opcodes):
+    return sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == 'equal')
+
+@pytest.fixture
+def costed(tmp_path):
+    diag = Diagnostics(log_path=str(tmp_path / "diag.jsonl"), profile="")
+    def run(lines1, lines2):
+        # Rückgabe: (Opcodes, Zähler pro Zeile beider Dateien)
+        with diag.span("pp_diff") as span: opcodes = diff_opcodes(lines1, lines2)
+        n = len(lines1) + len(lines2)
+        return opcodes, {key: value / n for key, value in span.counters.items()}
+    return run
+
+@pytest.mark.parametrize("lines1, lines2", [([], []), ([], ["a"]), (["a"], []), (["a", "b"], ["a", "b"]),
+                                            (["a", "b", "c"], ["c", "b", "a"]), (["x"] * 5, ["x"] * 3 + ["y"])])
+def test_edge_cases(lines1, lines2):
+    assert_valid(lines1, lines2, diff_opcodes(lines1, lines2))
+
+def test_random_small():
+    r = random.Random(8)
+    for _ in range(300):
+        pool = [f"L{i}" for i in range(r.randrange(1, 6))]
+        lines1 = [r.choice(pool) for _ in range(r.randrange(40))]
+        lines2 = [r.choice(pool) for _ in range(r.randrange(40))]
+        assert_valid(lines1, lines2, diff_opcodes(lines1, lines2))
+
+def test_mutated_postprocessor_as_good_as_difflib():
+    lines1 = synthetic_postprocessor(5000)
+    for rate, seed in ((0.001, 2), (0.01, 3), (0.05, 4)):
+        lines2 = mutate_lines(lines1, rate, seed)
+        opcodes = diff_opcodes(lines1, lines2)
+        assert_valid(lines1, lines2, opcodes)
+        assert equal_lines(opcodes) >= equal_lines(difflib.SequenceMatcher(None, lines1, lines2, autojunk=False).get_opcodes())
+
+def test_folded_rows():
+    lines1 = synthetic_postprocessor(500)
+    lines2 = mutate_lines(lines1, 0.02, 5)
+    opcodes = diff_opcodes(lines1, lines2)
+    folded = fold_opcodes(opcodes, 3)
+    # Ausgeblendete Bereiche sind gleich, alles andere bleibt in derselben Reihenfolge sichtbar
+    assert_valid(lines1, lines2, [('equal' if op[0] == 'fold' else op[0],) + tuple(op[1:]) for op in folded])
+    rows = list(iter_pp_rows(lines1, lines2, folded))
+    assert [fold for _, _, fold in rows if fold is not None] == [op for op in folded if op[0] == 'fold']
+    assert sum(1 for (l1, l2), tags, _ in rows if tags == ("missing1",) and l2 == MISSING_TEXT) == \
+        sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == 'delete')
+    assert len(rows) < len(lines1)
+
+# Vor der Wurzel-Grenze prüfte Myers hier mehrere hundert Diagonalen pro Zeile
+def test_repetitive_is_not_quadratic(costed):
+    lines1, lines2 = repetitive_postprocessor(20000, 4, seed=1), repetitive_postprocessor(20000, 4, seed=2)
+    opcodes, cost = costed(lines1, lines2)
+    assert_valid(lines1, lines2, opcodes)
+    assert cost["myers_diagonals"] <= 2 and cost["anchor_lines"] <= 4
+
+def test_templates_with_substitutions(costed):
+    lines1 = repetitive_postprocessor(20000, 8, seed=3)
+    lines2 = substitute_lines(lines1, 1000)
+    opcodes, cost = costed(lines1, lines2)
+    assert_valid(lines1, lines2, opcodes)
+    assert cost["myers_diagonals"] <= 2 and cost["anchor_lines"] <= 4
+
+def test_cost_grows_linearly(costed):
+    small = costed(repetitive_postprocessor(5000, 4, seed=1), repetitive_postprocessor(5000, 4, seed=2))[1]
+    large = costed(repetitive_postprocessor(40000, 4, seed=1), repetitive_postprocessor(40000, 4, seed=2))[1]
+    assert large["myers_diagonals"] <= 1.5 * small["myers_diagonals"]
+
+def test_large_file_few_changes(costed):
+    lines1 = synthetic_postprocessor(50000)
+    lines2 = mutate_lines(lines1, 0.01)
+    opcodes, cost = costed(lines1, lines2)
+    assert_valid(lines1, lines2, opcodes)
+    assert equal_lines(opcodes) > 0.97 * len(lines1)
+    assert cost["anchor_lines"] <= 16 and cost.get("myers_diagonals", 0) <= 2
@@ -0,0 +1,70 @@
+import random
+
+from snapshot_dedup import remove_duplicates, scan_duplicates
+from snapshot_manifest import SnapshotManifest
+from sync_files import TOOLS_PREFIX, list_tools_snapshots
+
+#Author Nico-RDF
+
+# Aufräumen doppelter Snapshots: die neueste Datei bleibt immer liegen, von jedem Inhalt
+# bleibt die älteste Datei, und entfernt wird nur, was Byte für Byte gleich ist.
+
+CONTENTS = [b"A" * 5000, b"B" * 5000, b"A" * 4999 + b"B", b"C" * 70000, b"C" * 69999 + b"D"]
+
+def snapshot_name(n):
+    return f"{TOOLS_PREFIX}_2024-01-01_10-{n:02}_AB.tl"
+
+def make_folder(folder, contents):
+    folder.mkdir()
+    for n, data in enumerate(contents): (folder / snapshot_name(n)).write_bytes(data)
+    return {snapshot_name(n): data for n, data in enumerate(contents)}
+
+def dedupe(folder, manifest):
+    groups = scan_duplicates(str(folder), list_tools_snapshots, manifest)
+    return groups, remove_duplicates(str(folder), groups, manifest)
+
+def test_newest_is_kept(tmp_path):
+    folder = tmp_path / "onedrive"
+    make_folder(folder, [CONTENTS[0], CONTENTS[1], CONTENTS[0], CONTENTS[0]])
+    manifest = SnapshotManifest()
+    groups, (removed, freed, errors) = dedupe(folder, manifest)
+    # 0 bleibt (älteste), 3 bleibt (neueste), nur 2 wird entfernt
+    assert removed == [snapshot_name(2)] and freed == len(CONTENTS[0]) and errors == []
+    assert sorted(p.name for p in folder.iterdir() if p.is_file()) == [snapshot_name(0), snapshot_name(1), snapshot_name(3)]
+    # Entfernte Datei bleibt im Manifest als Alias der behaltenen vermerkt
+    records, aliases = manifest.entries(str(folder))
+    assert [a["file"] for a in aliases[snapshot_name(0)]] == [snapshot_name(2)]
+
+def test_stale_manifest_digest_never_deletes(tmp_path):
+    # Manifest meint "gleicher Inhalt", die Datei wurde aber (gleich groß) überschrieben
+    folder = tmp_path / "onedrive"
+    make_folder(folder, [CONTENTS[0], CONTENTS[0], CONTENTS[1]])
+    manifest = SnapshotManifest()
+    for n in range(3): manifest.record_export(str(folder / snapshot_name(n)))
+    (folder / snapshot_name(1)).write_bytes(CONTENTS[2])
+    groups, (removed, freed, errors) = dedupe(folder, manifest)
+    assert removed == [] and len(errors) == 1
+    assert (folder / snapshot_name(1)).read_bytes() == CONTENTS[2]
+
+def test_random_folders(tmp_path):
+    r = random.Random(3)
+    for trial in range(40):
+        folder = tmp_path / f"f{trial}"
+        files = make_folder(folder, [r.choice(CONTENTS) for _ in range(r.randrange(1, 9))])
+        manifest = SnapshotManifest()
+        if r.random() < 0.5:
+            for name in r.sample(sorted(files), len(files) // 2): manifest.record_export(str(folder / name))
+        _, (removed, _, errors) = dedupe(folder, manifest)
+        left = {p.name: p.read_bytes() for p in folder.iterdir() if p.is_file()}
+
+        assert errors == []
+        assert max(files) in left
+        assert set(left) | set(removed) == set(files)
+        for name in removed:
+            # Nur echte Doppel: eine ältere Datei mit gleichem Inhalt ist noch da
+            assert any(other < name and data == files[name] for other, data in left.items())
+        for data in set(files.values()):
+            # Von jedem Inhalt bleibt die älteste Datei erhalten
+            assert min(n for n, d in files.items() if d == data) in left
+        # Zweiter Durchlauf findet nichts mehr
+        assert dedupe(folder, manifest)[0] == []
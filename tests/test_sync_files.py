@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+import sync_files
+from sync_files import copy_file_atomic
+
+#Author Nico-RDF
+
+# Sicheres Kopieren: bei jedem Abbruch bleibt das Ziel unverändert und keine temporäre Datei liegen
+
+class Stop(Exception):
+    pass
+
+@pytest.fixture
+def files(tmp_path):
+    src, dst = tmp_path / "src" / "Tools.dat", tmp_path / "dst" / "Tools.dat"
+    src.parent.mkdir()
+    dst.parent.mkdir()
+    src.write_bytes(os.urandom(3 * sync_files.COPY_CHUNK + 123))
+    dst.write_bytes(b"alter Stand")
+    return src, dst
+
+def leftovers(folder):
+    return sorted(p.name for p in folder.iterdir() if p.name.startswith("."))
+
+def test_copy_replaces_target(files):
+    src, dst = files
+    seen = []
+    assert copy_file_atomic(str(src), str(dst), lambda done, total: seen.append((done, total))) == src.stat().st_size
+    assert dst.read_bytes() == src.read_bytes()
+    assert seen[0] == (0, src.stat().st_size) and seen[-1][0] == src.stat().st_size
+    assert leftovers(dst.parent) == []
+
+@pytest.mark.parametrize("fail_at", [0, 1, 3])
+def test_abort_keeps_target(files, fail_at):
+    # Abbruch mitten im Kopieren (z. B. JobCancelled aus report_bytes)
+    src, dst = files
+    calls = []
+    def progress(done, total):
+        calls.append(done)
+        if len(calls) > fail_at: raise Stop()
+    with pytest.raises(Stop): copy_file_atomic(str(src), str(dst), progress)
+    assert dst.read_bytes() == b"alter Stand"
+    assert leftovers(dst.parent) == []
+
+@pytest.mark.parametrize("sendfile", [True, False])
+def test_write_error_keeps_target(files, monkeypatch, sendfile):
+    src, dst = files
+    if not sendfile: monkeypatch.delattr(os, "sendfile", raising=False)
+    def fsync(fd): raise OSError(28, "No space left on device")
+    monkeypatch.setattr(os, "fsync", fsync)
+    with pytest.raises(OSError): copy_file_atomic(str(src), str(dst))
+    assert dst.read_bytes() == b"alter Stand"
+    assert leftovers(dst.parent) == []
+
+def test_missing_source(files):
+    src, dst = files
+    with pytest.raises(OSError): copy_file_atomic(str(src) + ".fehlt", str(dst))
+    assert dst.read_bytes() == b"alter Stand"
+    assert leftovers(dst.parent) == []
+
+def test_new_target(files):
+    src, dst = files
+    target = dst.parent / "ToolList_neu.tl"
+    copy_file_atomic(str(src), str(target))
+    assert target.read_bytes() == src.read_bytes()
+    assert leftovers(dst.parent) == []
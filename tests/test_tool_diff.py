@@ -0,0 +1,95 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from diagnostics import Diagnostics
+from tool_diff import (KEY_COL, compare_tool_tables, compare_tool_tables_legacy, compare_all_paramsets,
+                       paramset_fingerprints, row_fingerprints)
+
+#Author Nico-RDF
+
+# Gegenprobe: der Vergleich mit Fingerabdrücken muss immer dasselbe liefern wie die
+# alte Zeile-für-Zeile-Variante (compare_tool_tables_legacy).
+
+# Werte nahe an den Regeln von values_differ: 0/-0, leer, Rundung auf 3 Stellen, Zahlen-Text, Rand-Leerzeichen
+VALUES = [0.0, -0.0, np.nan, 1.0, 1.0004, 1.0006, 0.0004, -0.0004, 2.5, 1e13, "0", "1.000", " a", "a", "b", ""]
+COLUMNS = ["Rpm", "F", "Comment", "Plunge_Angle"]
+
+def normalized(result):
+    # Legacy liefert W-Nr. teils als float (iterrows) – zum Vergleichen vereinheitlichen
+    diff_rows, missing_1, missing_2, diff_info = result
+    key = lambda k: float(k)
+    return (sorted(map(key, diff_rows)), sorted(map(key, missing_1)), sorted(map(key, missing_2)),
+            {key(k): sorted(v) for k, v in diff_info.items()})
+
+def random_table(r, keys):
+    cols = [c for c in COLUMNS if r.random() < 0.8]
+    data = {KEY_COL: keys}
+    for c in cols: data[c] = [r.choice(VALUES) for _ in keys]
+    return pd.DataFrame(data)
+
+def random_pair(r):
+    keys = list(range(1, r.randrange(1, 8)))
+    df1 = random_table(r, keys)
+    # Zweite Tabelle: teils Kopie mit kleinen Änderungen, teils ganz neu
+    if r.random() < 0.5: return df1, random_table(r, [k for k in keys if r.random() < 0.9] + [99])
+    data = {c: df1[c].tolist() for c in df1.columns}
+    cols = [c for c in data if c != KEY_COL]
+    for _ in range(r.randrange(3)):
+        if keys and cols: data[r.choice(cols)][r.randrange(len(keys))] = r.choice(VALUES)
+    return df1, pd.DataFrame(data)
+
+def test_zero_is_not_empty():
+    a = pd.DataFrame({KEY_COL: [1], "Rpm": [0.0]})
+    b = pd.DataFrame({KEY_COL: [1], "Rpm": [np.nan]})
+    c = pd.DataFrame({KEY_COL: [1]})
+    assert compare_tool_tables(a, b) == ([1], [], [], {1: ["Rpm"]})
+    assert compare_tool_tables(a, c) == ([1], [], [], {1: ["Rpm"]})
+    assert row_fingerprints(a)[0] != row_fingerprints(b)[0]
+
+def test_negative_zero_equals_zero():
+    a = pd.DataFrame({KEY_COL: [1], "Rpm": [0.0]})
+    b = pd.DataFrame({KEY_COL: [1], "Rpm": [-0.0004]})
+    assert compare_tool_tables(a, b) == ([], [], [], {})
+    assert row_fingerprints(a)[0] == row_fingerprints(b)[0]
+
+def test_matches_legacy_random():
+    r = random.Random(19)
+    for _ in range(600):
+        df1, df2 = random_pair(r)
+        assert normalized(compare_tool_tables(df1, df2)) == normalized(compare_tool_tables_legacy(df1, df2)), (df1, df2)
+
+def test_all_paramsets_matches_single():
+    r = random.Random(5)
+    for _ in range(60):
+        parts1, parts2 = [], []
+        for ps in ("Standard", "Alu", "Holz"):
+            df1, df2 = random_pair(r)
+            parts1.append(df1.assign(Paramset=ps))
+            parts2.append(df2.assign(Paramset=ps))
+        full1, full2 = pd.concat(parts1, ignore_index=True), pd.concat(parts2, ignore_index=True)
+        results = compare_all_paramsets(full1, full2)
+        fp1, fp2 = paramset_fingerprints(full1), paramset_fingerprints(full2)
+        for ps, result in results.items():
+            df1 = full1[full1['Paramset'] == ps].dropna(axis=1, how='all')
+            df2 = full2[full2['Paramset'] == ps].dropna(axis=1, how='all')
+            expected = normalized(compare_tool_tables_legacy(df1, df2))
+            assert normalized(result) == expected
+            # "identisch" im Dropdown nur, wenn der Vergleich wirklich nichts findet
+            if fp1.get(ps) == fp2.get(ps): assert expected == ([], [], [], {})
+
+def test_identical_files_are_not_aligned(tmp_path):
+    # Gleiche Fingerabdrücke in allen Parametersätzen: ganze Datei gleich, kein Ausrichten/Zellvergleich
+    r = random.Random(7)
+    full = pd.concat([random_table(r, list(range(1, 6))).assign(Paramset=ps) for ps in ("Standard", "Alu")], ignore_index=True)
+    diag = Diagnostics(log_path=str(tmp_path / "diag.jsonl"), profile="")
+    with diag.span("compare_diff") as span: results = compare_all_paramsets(full, full.iloc[::-1].copy())
+    assert results == {"Alu": ([], [], [], {}), "Standard": ([], [], [], {})}
+    assert "rows" not in span.counters
+    # Eine Änderung: nur der betroffene Parametersatz wird ausgerichtet
+    changed = full.copy()
+    changed.loc[changed.index[-1], "Rpm"] = 12345.0
+    with diag.span("compare_diff") as span: results = compare_all_paramsets(full, changed)
+    assert results["Standard"] == ([], [], [], {}) and results["Alu"][0] == [5]
+    assert span.counters["rows"] == 10
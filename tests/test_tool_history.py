@@ -0,0 +1,98 @@
+import gzip
+import os
+import random
+
+from dir_index import SnapshotEntry
+from sync_files import TOOLS_PREFIX
+from synthetic_dat import SyntheticSpec, encode_last, encode_tool, make_tool, mutate_tool, paramset_names
+from tool_history import ToolHistory, _read_or_none, normalize_value
+
+#Author Nico-RDF
+
+# Inkrementeller Verlauf: nach jedem update() muss der gespeicherte Stand jedes Snapshots
+# (_state_at) genau dem entsprechen, was read_tool_values aus der Datei liest – egal in welcher
+# Reihenfolge Snapshots dazukommen, wegfallen oder sich ändern. Unlesbare Snapshots haben
+# den Stand ihres letzten lesbaren Vorgängers.
+
+SPEC = SyntheticSpec(tools=6, paramsets=2, params=1, noise=0)
+
+def snapshot_name(n):
+    return f"{TOOLS_PREFIX}_2024-{n // 60 + 1:02}-01_10-{n % 60:02}_{'AB' if n % 2 else 'CD'}.tl"
+
+def random_tools(r):
+    tools = []
+    for number in range(1, SPEC.tools + 1):
+        if r.random() < 0.15: continue
+        tool, _ = mutate_tool(make_tool(SPEC, number), r, 0.3)
+        # Parameter fallen auch mal weg
+        if r.random() < 0.2: tool['blocks'][r.randrange(SPEC.paramsets)].pop('Comment')
+        if r.random() < 0.1: tool['head'].pop('Param_0')
+        tools.append(tool)
+    return tools
+
+def write_snapshot(path, r, mtime):
+    if r.random() < 0.15: data = b"noch nicht fertig synchronisiert"
+    else:
+        raw = b'\x00' + b''.join(encode_last(name) for name in paramset_names(SPEC.paramsets))
+        raw += b''.join(encode_tool(tool, r, 0) for tool in random_tools(r))
+        data = gzip.compress(raw)
+    with open(path, "wb") as f: f.write(data)
+    os.utime(path, (mtime, mtime))
+
+def entries(folder):
+    out = []
+    for e in os.scandir(folder):
+        st = e.stat()
+        out.append(SnapshotEntry(e.name, e.path, st.st_size, st.st_mtime))
+    return out
+
+def normalized(state):
+    return {key: tuple((param, normalize_value(val)) for param, val in row) for key, row in state.items()}
+
+def check(history, folder):
+    conn = history._connect()
+    try:
+        expected = {}
+        for name in sorted(os.listdir(folder)):
+            values, _ = _read_or_none(os.path.join(folder, name))
+            if values is not None: expected = values
+            assert normalized(history._state_at(conn, name)) == normalized(expected), name
+    finally:
+        conn.close()
+
+def test_random_add_remove_modify(tmp_path):
+    r = random.Random(17)
+    for trial in range(12):
+        folder = tmp_path / f"sync{trial}"
+        folder.mkdir()
+        history = ToolHistory(str(folder), str(tmp_path / f"history{trial}.sqlite"))
+        free = list(range(120))
+        r.shuffle(free)
+        mtime = 1_700_000_000
+        for step in range(12):
+            names = sorted(os.listdir(folder))
+            for _ in range(r.randrange(3, 6) if step == 0 else r.randrange(1, 4)):
+                op = r.random()
+                mtime += 60
+                if op < 0.5 or not names:
+                    # Neuer Snapshot, auch zwischen vorhandenen (später synchronisiert)
+                    write_snapshot(folder / snapshot_name(free.pop()), r, mtime)
+                elif op < 0.75:
+                    os.remove(folder / r.choice(names))
+                else:
+                    write_snapshot(folder / r.choice(names), r, mtime)
+                names = sorted(os.listdir(folder))
+            # Erster Durchlauf darf den Prozess-Pool nutzen (ab MIN_FILES_FOR_POOL neuen Dateien)
+            history.update(entries(folder), workers=2 if step == 0 else 1)
+            check(history, folder)
+        assert history.update(entries(folder)) == (0, 0)
+
+def test_pool_window(tmp_path):
+    # Viele neue Snapshots auf einmal: Reihenfolge über das Vorauslese-Fenster hinweg
+    r = random.Random(3)
+    folder = tmp_path / "sync"
+    folder.mkdir()
+    for n in range(14): write_snapshot(folder / snapshot_name(n), r, 1_700_000_000 + n)
+    history = ToolHistory(str(folder), str(tmp_path / "history.sqlite"))
+    assert history.update(entries(folder), workers=2) == (14, 0)
+    check(history, folder)
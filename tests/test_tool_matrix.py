@@ -0,0 +1,50 @@
+import gzip
+
+from synthetic_dat import SyntheticSpec, encode_last, encode_tool, make_tool, paramset_names
+from tool_matrix import build_matrix, cell_text, differing_counts, drilldown_pair, row_differs
+
+#Author Nico-RDF
+
+# Mehrfach-Vergleich: Varianten in der Reihenfolge des ersten Auftretens,
+# -1 = Werkzeug fehlt im Snapshot, None = Snapshot unlesbar
+
+SPEC = SyntheticSpec(tools=3, paramsets=1, params=0, noise=0)
+
+def write_tools(path, tools):
+    raw = b'\x00' + b''.join(encode_last(name) for name in paramset_names(SPEC.paramsets))
+    raw += b''.join(encode_tool(tool, None, 0) for tool in tools)
+    path.write_bytes(gzip.compress(raw))
+    return str(path)
+
+def base_tools():
+    return [make_tool(SPEC, n) for n in range(1, SPEC.tools + 1)]
+
+def test_variants_missing_and_unreadable(tmp_path):
+    changed = base_tools()
+    changed[1]['blocks'][0]['Rpm'] += 500      # W-Nr. 2 im Satz Holz
+    del changed[2]                             # W-Nr. 3 fehlt
+    rounded = base_tools()
+    rounded[0]['blocks'][0]['F'] += 0.0001     # unter der Vergleichsgenauigkeit -> gleiche Variante
+    broken = tmp_path / "kaputt.dat"
+    broken.write_bytes(b"kein gzip")
+    paths = [write_tools(tmp_path / "0.dat", base_tools()), write_tools(tmp_path / "1.dat", changed),
+             str(broken), write_tools(tmp_path / "2.dat", rounded)]
+
+    result = build_matrix(paths, workers=1)
+    assert result.paths == paths and list(result.errors) == [2]
+    variants = {(r.paramset, r.tool): r.variants for r in result.rows}
+    assert variants == {
+        ("Standard", 1): (0, 0, None, 0), ("Standard", 2): (0, 0, None, 0), ("Standard", 3): (0, -1, None, 0),
+        ("Holz", 1): (0, 0, None, 0), ("Holz", 2): (0, 1, None, 0), ("Holz", 3): (0, -1, None, 0),
+    }
+    assert all(r.name.startswith(f"Fräser {r.tool} ") for r in result.rows)
+    assert [cell_text(v) for v in variants[("Holz", 2)]] == ["A", "B", "?", "A"]
+    assert cell_text(-1) == "–"
+
+    assert differing_counts(result) == {"Holz": 2, "Standard": 1}
+    holz2 = next(r for r in result.rows if (r.paramset, r.tool) == ("Holz", 2))
+    assert row_differs(holz2)
+    # Klick auf die letzte Spalte: nächste abweichende Spalte davor, unlesbare übersprungen
+    assert drilldown_pair(holz2, 3) == (1, 3) and drilldown_pair(holz2, 0) == (0, 1)
+    same = next(r for r in result.rows if (r.paramset, r.tool) == ("Standard", 1))
+    assert not row_differs(same) and drilldown_pair(same, 0) is None
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from updater import Updater, UpdateError, build_manifest
+
+#Author Nico-RDF
+
+# Updater gegen einen lokalen http.server: ETag/304, Manifest, Prüfsummen, Netzwerkfehler
+# und der Rückfall auf die Version im Skript, solange kein Manifest veröffentlicht ist.
+
+class UpdateServer:
+    def __init__(self):
+        self.files, self.requests = {}, []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = self.path.lstrip("/")
+                server.requests.append((name, self.headers.get("If-None-Match")))
+                if name not in server.files:
+                    self.send_error(404)
+                    return
+                body = server.files[name]
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publish(self, version, files):
+        # files: {Name: Inhalt}, erster Eintrag = Hauptskript
+        self.files.update(files)
+        manifest = {"version": version, "main": next(iter(files)),
+                    "files": {n: {"sha256": hashlib.sha256(b).hexdigest(), "size": len(b)} for n, b in files.items()}}
+        self.files["update_manifest.json"] = json.dumps(manifest).encode("utf-8")
+        return manifest
+
+@pytest.fixture
+def server():
+    srv = UpdateServer()
+    yield srv
+    srv.httpd.shutdown()
+    srv.httpd.server_close()
+
+@pytest.fixture
+def install_dir(tmp_path):
+    folder = tmp_path / "install"
+    folder.mkdir()
+    (folder / "ToolVerwaltung_V4.py").write_bytes(b'__version__ = "4.1"\n')
+    (folder / "estlcam_dat.py").write_bytes(b"alt\n")
+    return folder
+
+def make_updater(server, install_dir, **kwargs):
+    return Updater(server.url + "update_manifest.json", str(install_dir / "ToolVerwaltung_V4.py"),
+                   meta_path=str(install_dir.parent / "update_meta.json"), interval=3600, **kwargs)
+
+def test_etag_and_throttle(server, install_dir):
+    server.publish("4.2", {"ToolVerwaltung_Final.pyw": b'__version__ = "4.2"\n', "estlcam_dat.py": b"neu\n"})
+    updater = make_updater(server, install_dir)
+    manifest, fetched = updater.check()
+    assert fetched and manifest["version"] == "4.2" and updater.is_newer(manifest, "4.1")
+    assert server.requests[-1] == ("update_manifest.json", None)
+
+    # Innerhalb des Intervalls wird gar nicht gefragt
+    assert updater.check() == (manifest, False)
+    assert len(server.requests) == 1
+
+    # Erzwungen: ETag wird mitgeschickt, 304 liefert das gemerkte Manifest
+    assert updater.check(force=True) == (manifest, True)
+    assert server.requests[-1][1] is not None
+
+    # Neue Veröffentlichung: ETag passt nicht mehr, neues Manifest
+    server.publish("4.3", {"ToolVerwaltung_Final.pyw": b'__version__ = "4.3"\n'})
+    assert updater.check(force=True)[0]["version"] == "4.3"
+
+@pytest.mark.parametrize("body", [b"{kein json", b'{"version": "4.2", "main": "a.py", "files": {"a.py": {"size": 1}}}',
+                                  b'{"version": "4.x", "main": "a.py", "files": {}}',
+                                  json.dumps({"version": "4.2", "main": "../a.py",
+                                              "files": {"../a.py": {"sha256": "0" * 64, "size": 1}}}).encode()])
+def test_invalid_manifest(server, install_dir, body):
+    server.files["update_manifest.json"] = body
+    with pytest.raises(UpdateError): make_updater(server, install_dir).check(force=True)
+
+def test_install_replaces_changed_files(server, install_dir):
+    new_main = b'__version__ = "4.2"\n'
+    manifest = server.publish("4.2", {"ToolVerwaltung_Final.pyw": new_main, "estlcam_dat.py": b"alt\n",
+                                      "tool_diff.py": b"neu\n"})
+    updater = make_updater(server, install_dir)
+    assert sorted(updater.pending_files(manifest)) == ["ToolVerwaltung_Final.pyw", "tool_diff.py"]
+    assert sorted(updater.install(manifest)) == ["ToolVerwaltung_Final.pyw", "tool_diff.py"]
+    assert (install_dir / "ToolVerwaltung_V4.py").read_bytes() == new_main
+    assert (install_dir / "tool_diff.py").read_bytes() == b"neu\n"
+    assert updater.pending_files(manifest) == []
+
+def test_checksum_mismatch_rejected(server, install_dir):
+    manifest = server.publish("4.2", {"ToolVerwaltung_Final.pyw": b'__version__ = "4.2"\n', "estlcam_dat.py": b"neu\n"})
+    server.files["estlcam_dat.py"] = b"nix\n"
+    before = {p.name: p.read_bytes() for p in install_dir.iterdir()}
+    with pytest.raises(UpdateError, match="Prüfsumme"): make_updater(server, install_dir).install(manifest)
+    # Nichts ersetzt, keine halben Downloads liegen geblieben
+    assert {p.name: p.read_bytes() for p in install_dir.iterdir()} == before
+
+def test_network_error(install_dir):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    updater = Updater(f"http://127.0.0.1:{port}/update_manifest.json", str(install_dir / "ToolVerwaltung_V4.py"),
+                      meta_path=str(install_dir.parent / "update_meta.json"), timeout=2)
+    with pytest.raises(UpdateError, match="nicht erreichbar"): updater.check(force=True)
+
+def test_missing_manifest_without_script_url(server, install_dir):
+    with pytest.raises(UpdateError, match="404"): make_updater(server, install_dir).check(force=True)
+
+def test_script_fallback_on_404(server, install_dir):
+    # Noch kein Manifest veröffentlicht: Version wie früher aus dem Skript
+    script = b'import os\n__version__ = "4.2"\n'
+    server.files["ToolVerwaltung_Final.pyw"] = script
+    updater = make_updater(server, install_dir, script_url=server.url + "ToolVerwaltung_Final.pyw")
+    manifest, fetched = updater.check(force=True)
+    assert fetched and manifest["version"] == "4.2"
+    assert updater.check(force=True) == (manifest, True)
+    assert server.requests[-1] == ("ToolVerwaltung_Final.pyw", '"' + hashlib.sha1(script).hexdigest() + '"')
+    assert updater.install(manifest) == ["ToolVerwaltung_Final.pyw"]
+    assert (install_dir / "ToolVerwaltung_V4.py").read_bytes() == script
+    assert (install_dir / "estlcam_dat.py").read_bytes() == b"alt\n"
+
+    # Sobald das Manifest da ist, gilt wieder das Manifest
+    server.publish("4.3", {"ToolVerwaltung_Final.pyw": b'__version__ = "4.3"\n'})
+    assert updater.check(force=True)[0]["version"] == "4.3"
+
+def test_build_manifest_roundtrip(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_bytes(b"x" * 10)
+    manifest = build_manifest("4.2", [str(path)])
+    assert manifest == {"version": "4.2", "main": "a.py",
+                        "files": {"a.py": {"sha256": hashlib.sha256(b"x" * 10).hexdigest(), "size": 10}}}
@@ -0,0 +1,338 @@
+import sys
+import time
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from diagnostics import count
+
+#Author Nico-RDF
+
+# =========================================================
+# WERKZEUG-DIFF (Tab 2)
+# =========================================================
+# Vergleicht zwei Werkzeuglisten (ein Parametersatz) anhand der W-Nr.
+# Regeln wie bisher pro Zelle:
+#   - beide leer (NaN)            -> gleich
+#   - nur eine Seite leer         -> Unterschied
+#   - beide als Zahl lesbar       -> Vergleich auf 3 Nachkommastellen
+#   - sonst                       -> Textvergleich ohne Leerzeichen am Rand
+# Die Tabellen werden einmal ausgerichtet und spaltenweise als Arrays verglichen.
+# Die exakte Einzelprüfung läuft nur noch für Zellen, die nicht ohnehin gleich sind.
+# Vorher filtern Fingerabdrücke (ein 64-Bit-Wert pro Zeile, siehe unten):
+# Gleiche Parametersätze fallen komplett weg, gleiche Zeilen ebenso.
+
+KEY_COL = 'W-Nr.'
+FINGERPRINT_COL = '_fingerprint'
+SKIP_COLS = ('Paramset', KEY_COL, FINGERPRINT_COL)
+
+def values_differ(v1, v2):
+    if pd.isna(v1) and pd.isna(v2): return False
+    if pd.isna(v1) != pd.isna(v2): return True
+    try:
+        return round(float(v1), 3) != round(float(v2), 3)
+    except (ValueError, TypeError):
+        return str(v1).strip() != str(v2).strip()
+
+def _is_numeric(arr):
+    return arr.dtype.kind in 'biuf'
+
+def _column_diff(x, y):
+    # x, y: gleich lange numpy-Arrays einer Spalte. Rückgabe: bool-Array "unterschiedlich"
+    na1 = pd.isna(x)
+    na2 = pd.isna(y)
+    diff = na1 != na2
+    both = ~(na1 | na2)
+    if not both.any(): return diff
+
+    if _is_numeric(x) and _is_numeric(y):
+        # Identische Rohwerte sind auch gerundet identisch
+        candidates = both & (x != y)
+    else:
+        xo = x.astype(object)
+        yo = y.astype(object)
+        candidates = both & ~(xo == yo)
+        if candidates.any():
+            # Normalisierter Textvergleich (strip) für reine Text-Paare
+            idx = np.flatnonzero(candidates)
+            sx = pd.Series(xo[idx])
+            sy = pd.Series(yo[idx])
+            is_text = (sx.map(type) == str).to_numpy() & (sy.map(type) == str).to_numpy()
+            if is_text.any():
+                same = (sx[is_text].str.strip().to_numpy() == sy[is_text].str.strip().to_numpy())
+                candidates[idx[is_text][same]] = False
+
+    for i in np.flatnonzero(candidates):
+        if values_differ(x[i], y[i]): diff[i] = True
+    return diff
+
+# ---------------------------------------------------------
+# Fingerabdrücke
+# ---------------------------------------------------------
+# Pro Zeile ein 64-Bit-Wert über alle Spalten außer Paramset/W-Nr., nach denselben
+# Regeln wie values_differ: leere Zellen zählen nicht mit, Zahlen (auch Zahlen-Text)
+# auf 3 Stellen gerundet, sonstiger Text ohne Rand-Leerzeichen. Jede Spalte fließt
+# mit ihrem Namen ein, die Beiträge werden addiert – Spaltenreihenfolge und fehlende
+# (leere) Spalten spielen also keine Rolle. Gerundet wird exakt wie round() in
+# values_differ, damit "gleicher Fingerabdruck" nie einen Unterschied verschluckt.
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_TEXT_SALT = np.uint64(0x5851F42D4C957F2D)
+_SHIFT = np.uint64(31)
+
+def _name_hash(name):
+    return np.uint64(int.from_bytes(hashlib.blake2b(str(name).encode('utf-8'), digest_size=8).digest(), 'little'))
+
+def _mix(h):
+    m = h * _MIX
+    return m ^ (m >> _SHIFT)
+
+def _round3(x):
+    # Wie [round(v, 3) for v in x], aber vektorisiert. np.rint(x * 1000) weicht nur direkt
+    # an der Rundungsgrenze (…,xxx5) oder bei riesigen Werten ab – die rechnet round() nach.
+    scaled = x * 1000.0
+    r = np.rint(scaled) / 1000.0
+    with np.errstate(invalid='ignore'):
+        near = (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6) | ~(np.abs(x) < 1e12)
+    idx = np.flatnonzero(near)
+    if len(idx): r[idx] = [round(v, 3) for v in x[idx].tolist()]
+    return r
+
+def _cell_hashes(arr):
+    # Rückgabe: (uint64 pro Zelle, bool "nicht leer"). Leer wird extra geführt –
+    # der Hash selbst kann 0 sein (hash_array(0.0) == 0), 0.0 darf nicht als leer gelten.
+    out = np.zeros(len(arr), dtype=np.uint64)
+    present = np.zeros(len(arr), dtype=bool)
+    if _is_numeric(arr):
+        x = arr.astype(float)
+        num_idx = np.flatnonzero(~np.isnan(x))
+        nums = x[num_idx]
+        text_idx, texts = [], []
+    else:
+        num_idx, nums, text_idx, texts = [], [], [], []
+        for i in np.flatnonzero(~pd.isna(arr)).tolist():
+            v = arr[i]
+            try:
+                nums.append(float(v))
+                num_idx.append(i)
+            except (ValueError, TypeError):
+                texts.append(str(v).strip())
+                text_idx.append(i)
+    # + 0.0: -0.0 (z. B. gerundetes -0.0001) und 0.0 sollen gleich hashen
+    if len(nums): out[num_idx] = pd.util.hash_array(_round3(np.asarray(nums, dtype=float)) + 0.0)
+    if texts: out[text_idx] = pd.util.hash_array(np.array(texts, dtype=object)) ^ _TEXT_SALT
+    present[num_idx] = True
+    present[text_idx] = True
+    return out, present
+
+def row_fingerprints(df):
+    fp = np.zeros(len(df), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for col in df.columns:
+            if col in SKIP_COLS: continue
+            h, present = _cell_hashes(df[col].to_numpy())
+            fp += np.where(present, _mix(h + _name_hash(col)), np.uint64(0))
+    return fp
+
+def add_fingerprints(df):
+    # Wird beim Einlesen aufgerufen (landet so auch im Parse-Cache)
+    if not df.empty: df[FINGERPRINT_COL] = row_fingerprints(df)
+    return df
+
+def _with_fingerprints(df):
+    if df is None or df.empty or FINGERPRINT_COL in df.columns: return df
+    return add_fingerprints(df.copy())
+
+def paramset_fingerprints(df):
+    # {Paramset: (Anzahl Werkzeuge, Fingerabdruck)}. Gleiche Werte = Parametersatz identisch,
+    # ohne eine einzige Zelle anzusehen. Doppelte W-Nr. wie im Vergleich: die letzte gilt.
+    df = _with_fingerprints(df)
+    if df is None or df.empty: return {}
+    d = df.drop_duplicates(['Paramset', KEY_COL], keep='last')
+    keys = d[KEY_COL].to_numpy()
+    if _is_numeric(keys): keys = keys.astype(float)
+    with np.errstate(over='ignore'):
+        rows = _mix(d[FINGERPRINT_COL].to_numpy(dtype=np.uint64) + pd.util.hash_array(keys))
+        return {ps: (len(idx), int(rows[idx].sum(dtype=np.uint64)))
+                for ps, idx in d.groupby('Paramset', sort=False).indices.items()}
+
+# ---------------------------------------------------------
+# Vergleich
+# ---------------------------------------------------------
+
+def _align(df1, df2, keys):
+    # common enthält nur Schlüssel, deren Zeilen-Fingerabdruck abweicht –
+    # alle anderen Zeilen sind gleich und werden nicht mehr Zelle für Zelle verglichen
+    a = df1.drop_duplicates(keys, keep='last').set_index(keys)
+    b = df2.drop_duplicates(keys, keep='last').set_index(keys)
+
+    missing_1 = b.index.difference(a.index)
+    missing_2 = a.index.difference(b.index)
+    common = a.index.intersection(b.index)
+    if FINGERPRINT_COL in a.columns and FINGERPRINT_COL in b.columns and len(common):
+        common = common[a[FINGERPRINT_COL].reindex(common).to_numpy() != b[FINGERPRINT_COL].reindex(common).to_numpy()]
+
+    cols = [c for c in a.columns if c not in SKIP_COLS]
+    cols += [c for c in b.columns if c not in SKIP_COLS and c not in a.columns]
+
+    a = a.reindex(index=common, columns=cols)
+    b = b.reindex(index=common, columns=cols)
+    return a, b, common, cols, missing_1, missing_2
+
+def _diff_mask(a, b, cols):
+    mask = np.zeros((len(a), len(cols)), dtype=bool)
+    for j, col in enumerate(cols):
+        mask[:, j] = _column_diff(a[col].to_numpy(), b[col].to_numpy())
+    return mask
+
+def _count_compared(df1, df2, common, cols):
+    # Diagnose: Zeilen gesamt / Zeilen mit abweichendem Fingerabdruck / Zellen im Einzelvergleich
+    count("rows", len(df1) + len(df2))
+    count("rows_compared", len(common))
+    count("cells", len(common) * len(cols))
+
+def _sorted_keys(df):
+    if KEY_COL not in df.columns: return []
+    return pd.Index(df[KEY_COL]).unique().sort_values().tolist()
+
+def compare_tool_tables(df1, df2):
+    # Rückgabe: diff_rows, missing_1, missing_2, diff_info (wie bisher in run_comparison)
+    # Parametersatz nur in einer Datei: alle Werkzeuge der anderen gelten als fehlend
+    if KEY_COL not in df1.columns or KEY_COL not in df2.columns: return [], _sorted_keys(df2), _sorted_keys(df1), {}
+    df1, df2 = _with_fingerprints(df1), _with_fingerprints(df2)
+    a, b, common, cols, missing_1, missing_2 = _align(df1, df2, KEY_COL)
+    _count_compared(df1, df2, common, cols)
+    diff_rows, diff_info = [], {}
+    if len(common) == 0 or not cols: return diff_rows, missing_1.tolist(), missing_2.tolist(), diff_info
+
+    mask = _diff_mask(a, b, cols)
+    keys = common.tolist()
+    for i in np.flatnonzero(mask.any(axis=1)):
+        wnr = keys[i]
+        diff_rows.append(wnr)
+        diff_info[wnr] = [cols[j] for j in np.flatnonzero(mask[i])]
+    return diff_rows, missing_1.tolist(), missing_2.tolist(), diff_info
+
+def compare_all_paramsets(df1, df2):
+    # Ein Durchlauf über den ganzen (Paramset, W-Nr.)-Schlüsselraum.
+    # Rückgabe: {Paramset: (diff_rows, missing_1, missing_2, diff_info)}
+    df1, df2 = _with_fingerprints(df1), _with_fingerprints(df2)
+    results = {}
+    for ps in sorted(set(df1['Paramset'].unique()).union(df2['Paramset'].unique())):
+        results[ps] = ([], [], [], {})
+
+    # Identische Parametersätze (bzw. ganze Dateien) gar nicht erst ausrichten
+    fp1, fp2 = paramset_fingerprints(df1), paramset_fingerprints(df2)
+    same = [ps for ps, fp in fp1.items() if fp2.get(ps) == fp]
+    if len(same) == len(results): return results
+    if same:
+        df1 = df1[~df1['Paramset'].isin(same)]
+        df2 = df2[~df2['Paramset'].isin(same)]
+
+    a, b, common, cols, missing_1, missing_2 = _align(df1, df2, ['Paramset', KEY_COL])
+    _count_compared(df1, df2, common, cols)
+    for ps, wnr in missing_1.tolist(): results[ps][1].append(wnr)
+    for ps, wnr in missing_2.tolist(): results[ps][2].append(wnr)
+    if len(common) == 0 or not cols: return results
+
+    mask = _diff_mask(a, b, cols)
+    keys = common.tolist()
+    for i in np.flatnonzero(mask.any(axis=1)):
+        ps, wnr = keys[i]
+        diff_rows, _, _, diff_info = results[ps]
+        diff_rows.append(wnr)
+        diff_info[wnr] = [cols[j] for j in np.flatnonzero(mask[i])]
+    return results
+
+def count_changes(result):
+    diff_rows, missing_1, missing_2, _ = result
+    return len(diff_rows) + len(missing_1) + len(missing_2)
+
+# ---------------------------------------------------------
+# Anzeige (VirtualTable im Vergleichs-Tab)
+# ---------------------------------------------------------
+
+def display_columns(df):
+    return [c for c in df.columns if c not in ('Paramset', FINGERPRINT_COL)]
+
+def row_formatter(df, display_cols, diff_rows=(), missing_rows=(), diff_info=None):
+    # get_row(i) -> (Werte, Tags); formatiert wird erst, wenn die Zeile sichtbar wird
+    diff_rows, missing_rows, diff_info = set(diff_rows), set(missing_rows), diff_info or {}
+    values = df[display_cols].to_numpy(dtype=object)
+    wnrs = df[KEY_COL].tolist() if KEY_COL in df.columns else [None] * len(df)
+
+    def get_row(i):
+        wnr = wnrs[i]
+        marked = diff_info.get(wnr, ())
+        formatted_row = []
+        for c, val in zip(display_cols, values[i]):
+            if pd.isna(val): val = "-"
+            elif isinstance(val, float): val = round(val, 2)
+            if c in marked: val = f"» {val} «"
+            formatted_row.append(val)
+
+        tags = ()
+        if wnr in diff_rows: tags = ("diff",)
+        elif wnr in missing_rows: tags = ("missing",)
+        return formatted_row, tags
+    return get_row
+
+def compare_tool_tables_legacy(df1, df2):
+    # Alte Zeile-für-Zeile-Variante, nur noch als Referenz für Benchmark & Gegenprobe
+    diff_rows, missing_1, missing_2 = [], [], []
+    diff_info = {}
+    df1_dict = {row[KEY_COL]: row for _, row in df1.iterrows()}
+    df2_dict = {row[KEY_COL]: row for _, row in df2.iterrows()}
+    all_wnr = set(df1_dict.keys()).union(set(df2_dict.keys()))
+
+    for wnr in all_wnr:
+        if wnr not in df1_dict: missing_1.append(wnr)
+        elif wnr not in df2_dict: missing_2.append(wnr)
+        else:
+            r1, r2 = df1_dict[wnr], df2_dict[wnr]
+            diff_cols = []
+            for col in set(r1.index).union(set(r2.index)):
+                if col in SKIP_COLS: continue
+                v1 = r1[col] if col in r1.index else None
+                v2 = r2[col] if col in r2.index else None
+                if values_differ(v1, v2): diff_cols.append(col)
+            if diff_cols:
+                diff_rows.append(wnr)
+                diff_info[wnr] = diff_cols
+    return diff_rows, missing_1, missing_2, diff_info
+
+# ---------------------------------------------------------
+# Benchmark: python tool_diff.py Datei1.dat Datei2.dat [Parametersatz]
+# ---------------------------------------------------------
+
+def benchmark(df1, df2, repeat=3):
+    results = {}
+    for name, func in (("legacy", compare_tool_tables_legacy), ("vectorized", compare_tool_tables)):
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = func(df1, df2)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        results[name] = (best, out)
+    return results
+
+def _normalized(result):
+    diff_rows, missing_1, missing_2, diff_info = result
+    return (sorted(diff_rows), sorted(missing_1), sorted(missing_2),
+            {k: sorted(v) for k, v in diff_info.items()})
+
+if __name__ == "__main__":
+    from estlcam_dat import read_estlcam_dat
+    full1 = read_estlcam_dat(sys.argv[1])
+    full2 = read_estlcam_dat(sys.argv[2])
+    paramsets = sys.argv[3:] or sorted(set(full1['Paramset']) | set(full2['Paramset']))
+    for ps in paramsets:
+        df1 = full1[full1['Paramset'] == ps]
+        df2 = full2[full2['Paramset'] == ps]
+        res = benchmark(df1, df2)
+        (t_old, r_old), (t_new, r_new) = res["legacy"], res["vectorized"]
+        same = _normalized(r_old) == _normalized(r_new)
+        print(f"{ps}: {len(df1)}/{len(df2)} Werkzeuge, alt {t_old * 1000:.1f} ms, neu {t_new * 1000:.1f} ms "
+              f"({t_old / t_new:.1f}x), {len(r_new[0])} geändert, Ergebnis identisch: {same}")
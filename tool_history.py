@@ -0,0 +1,286 @@
+import os
+import hashlib
+import sqlite3
+from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from parse_cache import app_data_dir
+from sync_files import extract_initials_from_filename
+
+#Author Nico-RDF
+
+# =========================================================
+# WERKZEUG-VERLAUF ÜBER ALLE TOOLLIST-SNAPSHOTS
+# =========================================================
+# Beantwortet "Wann hat sich die Drehzahl von Werkzeug 12 im Satz Alu geändert –
+# und wer war's?", ohne Snapshot-Paare einzeln zu vergleichen.
+# Lokale SQLite-Datenbank pro Sync-Ordner (%APPDATA%\EstlcamSync\history).
+# Gespeichert werden nur Änderungen: pro Snapshot die Werte (Paramset, W-Nr.,
+# Parameter), die sich gegenüber dem vorherigen Snapshot (nach Dateiname =
+# Zeitstempel) geändert haben. Der erste Snapshot enthält alles. NULL = Wert entfällt.
+# Neue Snapshots werden inkrementell eingelesen (parallel in mehreren Prozessen).
+# Kommt ein Snapshot "dazwischen" (später synchronisiert) oder fällt einer weg,
+# wird nur die Änderungsliste seines Nachfolgers neu berechnet.
+
+HISTORY_FORMAT = 1
+# Nicht mehr Dateien gleichzeitig im Speicher halten als nötig
+PARSE_WINDOW_PER_WORKER = 2
+# Unter so vielen neuen Snapshots lohnt das Starten von Prozessen nicht
+MIN_FILES_FOR_POOL = 3
+KEY_PARAMS = ('Paramset', 'Number')
+
+TimelineRow = namedtuple("TimelineRow", "snapshot initials date param old new")
+
+def default_history_dir():
+    return os.path.join(app_data_dir(), "history")
+
+def history_db_path(dir_path, history_dir=None):
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(dir_path)).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(history_dir or default_history_dir(), f"history_{key}.sqlite")
+
+# ---------------------------------------------------------
+# Werte eines Snapshots (läuft im Worker-Prozess)
+# ---------------------------------------------------------
+
+def read_tool_values(filepath):
+    # Rückgabe: {(Paramset, W-Nr.): ((Parameter, Wert), ...)} – pro Werkzeug ein sortiertes
+    # Tupel, damit unveränderte Werkzeuge mit einem einzigen Vergleich erledigt sind.
+    # Parameternamen wie im Werkzeug-Vergleich.
+    from estlcam_dat import iter_tool_records, RENAME_MAP
+    rows = {}
+    for rec in iter_tool_records(filepath):
+        ps = rec.get('Paramset', 'Standard')
+        try: tool = int(rec.get('Number') or 0)
+        except (TypeError, ValueError): tool = 0
+        row = rows.setdefault((ps, tool), {})
+        for key, val in rec.items():
+            if key in KEY_PARAMS: continue
+            if key == 'F' and isinstance(val, float): key, val = 'F_mm_min', round(val * 60)
+            row[RENAME_MAP.get(key, key)] = val
+    return {key: tuple(sorted(row.items())) for key, row in rows.items()}
+
+def _read_or_none(filepath):
+    # Unlesbare Snapshots (defekt, noch nicht fertig synchronisiert) gelten als unverändert
+    try: return read_tool_values(filepath), None
+    except Exception as e: return None, str(e) or type(e).__name__
+
+def normalize_value(v):
+    # Gleiche Regeln wie tool_diff.values_differ: Zahlen auf 3 Stellen, Text ohne Rand-Leerzeichen
+    if isinstance(v, str):
+        try: return round(float(v), 3)
+        except ValueError: return v.strip()
+    if isinstance(v, (int, float)): return round(float(v), 3)
+    return v
+
+def diff_values(prev, values):
+    # Rückgabe: Liste (Paramset, W-Nr., Parameter, Wert) – Wert None = entfällt
+    out = []
+    for key, row in values.items():
+        old_row = prev.get(key)
+        if old_row == row: continue
+        old = dict(old_row or ())
+        for param, val in row:
+            o = old.pop(param, None)
+            if o is None or (o != val and normalize_value(o) != normalize_value(val)): out.append((*key, param, val))
+        for param in old: out.append((*key, param, None))
+    for key in prev.keys() - values.keys():
+        for param, _ in prev[key]: out.append((*key, param, None))
+    return out
+
+def apply_changes(state, changes):
+    # Änderungszeilen (Paramset, W-Nr., Parameter, Wert) auf einen Zustand anwenden
+    grouped = {}
+    for ps, tool, param, val in changes: grouped.setdefault((ps, tool), []).append((param, val))
+    for key, items in grouped.items():
+        row = dict(state.get(key, ()))
+        for param, val in items:
+            if val is None: row.pop(param, None)
+            else: row[param] = val
+        if row: state[key] = tuple(sorted(row.items()))
+        else: state.pop(key, None)
+    return state
+
+def iter_parsed(paths, workers, read=_read_or_none):
+    # Liefert read(p) = (Ergebnis, Fehler) in der Reihenfolge von paths, parst aber parallel voraus.
+    # read muss eine Modul-Funktion sein (wird an die Worker-Prozesse übergeben).
+    if workers <= 1 or len(paths) < MIN_FILES_FOR_POOL:
+        for p in paths: yield read(p)
+        return
+    window = workers * PARSE_WINDOW_PER_WORKER
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = [executor.submit(read, p) for p in paths[:window]]
+        for n in range(len(paths)):
+            future = pending[n]
+            if n + window < len(paths): pending.append(executor.submit(read, paths[n + window]))
+            yield future.result()
+            pending[n] = None
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+# ---------------------------------------------------------
+# Index
+# ---------------------------------------------------------
+
+class ToolHistory:
+    def __init__(self, dir_path, db_path=None):
+        self.dir_path = dir_path
+        self.db_path = db_path or history_db_path(dir_path)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != HISTORY_FORMAT:
+            # Altes oder fremdes Format: Index ist nur abgeleitet -> neu aufbauen
+            conn.executescript("DROP TABLE IF EXISTS changes; DROP TABLE IF EXISTS snapshots;")
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL,
+                size INTEGER, mtime REAL, initials TEXT, error TEXT);
+            CREATE TABLE IF NOT EXISTS changes (
+                snap INTEGER NOT NULL, paramset TEXT NOT NULL, tool INTEGER NOT NULL,
+                param TEXT NOT NULL, value);
+            CREATE INDEX IF NOT EXISTS changes_key ON changes (paramset, tool, param);
+            CREATE INDEX IF NOT EXISTS changes_snap ON changes (snap);
+            PRAGMA user_version = {HISTORY_FORMAT};
+        """)
+        return conn
+
+    # --- Einlesen ---
+    def update(self, snapshots, progress=None, workers=None):
+        # snapshots: SnapshotEntry-Liste des Ordners. Rückgabe: (neu eingelesen, entfernt)
+        workers = workers or min(4, os.cpu_count() or 1)
+        current = {e.name: e for e in snapshots}
+        conn = self._connect()
+        parsed = None
+        try:
+            known, unreadable = {}, set()
+            for sid, name, size, mtime, error in conn.execute("SELECT id, name, size, mtime, error FROM snapshots"):
+                known[name] = (sid, size, mtime)
+                if error: unreadable.add(name)
+            # Geänderte Dateien (Größe/mtime) wie entfernt + neu behandeln
+            changed = {n for n, (_, size, mtime) in known.items() if n in current and (current[n].size != size or current[n].mtime != mtime)}
+            removed = (known.keys() - current.keys()) | changed
+            added = sorted((current.keys() - known.keys()) | changed)
+            if not removed and not added: return 0, 0
+
+            old_order = sorted(known)
+            new_order = sorted((known.keys() - removed) | set(added))
+            old_pred = {n: (old_order[i - 1] if i else None) for i, n in enumerate(old_order)}
+            new_pred = {n: (new_order[i - 1] if i else None) for i, n in enumerate(new_order)}
+            added_set = set(added)
+            # Bestehender Snapshot mit anderem (oder geändertem) Vorgänger -> Änderungsliste neu berechnen.
+            # Unlesbare Snapshots übernehmen den Stand ihres Vorgängers, reichen die Neuberechnung also weiter.
+            dirty = set()
+            for n in new_order:
+                p = new_pred[n]
+                if n not in added_set and (p != old_pred[n] or p in changed or (p in dirty and p in unreadable)): dirty.add(n)
+            affected = added_set | removed | dirty
+            first, last = min(affected), max(affected)
+            # Nur anhängen (Normalfall): Zwischenstände dürfen schon gespeichert werden
+            append_only = not removed and not dirty and (not old_order or first > old_order[-1])
+
+            walk = sorted(n for n in set(old_order) | set(new_order) if first <= n <= last)
+            start = max((n for n in old_order if n < first), default=None)
+            old_state = self._state_at(conn, start) if start is not None else {}
+            new_state = old_state  # gleiches Objekt, solange beide Ketten übereinstimmen
+
+            parsed = iter_parsed([current[n].path for n in added], workers)
+            done = 0
+            for name in walk:
+                if name in known:
+                    # Alte Kette weiterführen: Zustand = Inhalt dieses (bisherigen) Snapshots
+                    # Die neue Kette braucht den Vorgängerzustand noch -> vorher abkoppeln
+                    if new_state is old_state and (name in removed or name in dirty): new_state = dict(old_state)
+                    sid = known[name][0]
+                    apply_changes(old_state, conn.execute("SELECT paramset, tool, param, value FROM changes WHERE snap = ?", (sid,)))
+                    if name in removed:
+                        conn.execute("DELETE FROM changes WHERE snap = ?", (sid,))
+                        conn.execute("DELETE FROM snapshots WHERE id = ?", (sid,))
+
+                if name in added_set:
+                    if progress is not None: progress(done, len(added))
+                    values, error = next(parsed)
+                    e = current[name]
+                    sid = conn.execute("INSERT INTO snapshots (name, size, mtime, initials, error) VALUES (?, ?, ?, ?, ?)",
+                                       (name, e.size, e.mtime, extract_initials_from_filename(name), error)).lastrowid
+                    if values is not None:
+                        conn.executemany(f"INSERT INTO changes VALUES ({sid}, ?, ?, ?, ?)", diff_values(new_state, values))
+                        new_state = values
+                    done += 1
+                    if append_only: conn.commit()
+                elif name in dirty and name in unreadable:
+                    pass
+                elif name in dirty:
+                    sid = known[name][0]
+                    conn.execute("DELETE FROM changes WHERE snap = ?", (sid,))
+                    conn.executemany(f"INSERT INTO changes VALUES ({sid}, ?, ?, ?, ?)", diff_values(new_state, old_state))
+                    new_state = old_state
+                elif name not in removed:
+                    new_state = old_state
+            conn.commit()
+            if progress is not None: progress(done, len(added))
+            return len(added), len(removed - changed)
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            # Abbruch (JobCancelled): Worker-Prozesse sauber beenden
+            if parsed is not None: parsed.close()
+            conn.close()
+
+    def _state_at(self, conn, name):
+        # Vollständige Werte des Snapshots name (alle Änderungen bis einschließlich name)
+        rows = conn.execute("""
+            SELECT c.paramset, c.tool, c.param, c.value, MAX(s.name) FROM changes c JOIN snapshots s ON s.id = c.snap
+            WHERE s.name <= ? GROUP BY c.paramset, c.tool, c.param""", (name,))
+        return apply_changes({}, ((ps, tool, param, val) for ps, tool, param, val, _ in rows))
+
+    # --- Abfragen ---
+    def _query(self, sql, args=()):
+        if not os.path.isfile(self.db_path): return []
+        conn = self._connect()
+        try: return conn.execute(sql, args).fetchall()
+        finally: conn.close()
+
+    def snapshot_count(self):
+        rows = self._query("SELECT COUNT(*) FROM snapshots")
+        return rows[0][0] if rows else 0
+
+    def paramsets(self):
+        return [r[0] for r in self._query("SELECT DISTINCT paramset FROM changes ORDER BY paramset")]
+
+    def tools(self, paramset):
+        # Rückgabe: [(W-Nr., letzter bekannter Name)] aufsteigend nach W-Nr.
+        names = {}
+        for tool, value in self._query("""
+                SELECT c.tool, c.value FROM changes c JOIN snapshots s ON s.id = c.snap
+                WHERE c.paramset = ? AND c.param = 'Werkzeugname' ORDER BY s.name""", (paramset,)):
+            if value is not None: names[tool] = value
+        return sorted(names.items())
+
+    def params(self, paramset, tool):
+        return [r[0] for r in self._query("SELECT DISTINCT param FROM changes WHERE paramset = ? AND tool = ? ORDER BY param", (paramset, tool))]
+
+    def timeline(self, paramset, tool, param=None):
+        # Rückgabe: TimelineRow je Änderung, älteste zuerst (old None = erstmals vorhanden, new None = entfällt)
+        sql = """SELECT s.name, s.initials, s.mtime, c.param, c.value FROM changes c JOIN snapshots s ON s.id = c.snap
+                 WHERE c.paramset = ? AND c.tool = ?"""
+        args = [paramset, tool]
+        if param is not None:
+            sql += " AND c.param = ?"
+            args.append(param)
+        last, rows = {}, []
+        for name, initials, mtime, p, value in self._query(sql + " ORDER BY s.name, c.param", args):
+            date = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M") if mtime else ""
+            rows.append(TimelineRow(name, initials, date, p, last.get(p), value))
+            last[p] = value
+        return rows
+
+def update_history(dir_path, list_snapshots, progress=None):
+    # Für Hintergrund-Jobs: Index auf Stand bringen, Rückgabe (Index, neu, entfernt)
+    history = ToolHistory(dir_path)
+    added, removed = history.update(list_snapshots(dir_path), progress)
+    return history, added, removed
@@ -0,0 +1,128 @@
+import os
+import re
+import hashlib
+from collections import namedtuple
+
+from tool_history import read_tool_values, normalize_value, iter_parsed
+
+#Author Nico-RDF
+
+# =========================================================
+# MEHRFACH-VERGLEICH (N Toollisten auf einmal)
+# =========================================================
+# Statt Paar für Paar zu laden: alle gewählten Snapshots werden parallel gelesen,
+# jedes Werkzeug (Paramset, W-Nr.) bekommt einen Fingerabdruck über seine
+# (normalisierten) Werte. Verglichen werden nur noch die Fingerabdrücke –
+# unveränderte Werkzeuge werden nie Zelle für Zelle angefasst. Die Worker-Prozesse
+# schicken auch nur Fingerabdruck + Name zurück, nicht die ganze Tabelle.
+# Ergebnis ist eine Matrix: pro Werkzeug und Snapshot eine Variante (A, B, C …,
+# in der Reihenfolge des ersten Auftretens) oder "fehlt". Die Details eines
+# Unterschieds zeigt dann der normale Werkzeug-Vergleich (zwei Dateien).
+
+MatrixRow = namedtuple("MatrixRow", "paramset tool name variants")
+MatrixResult = namedtuple("MatrixResult", "paths errors rows")
+
+FINGERPRINT_BYTES = 8
+
+# ---------------------------------------------------------
+# Fingerabdrücke (läuft im Worker-Prozess)
+# ---------------------------------------------------------
+
+def row_fingerprint(row):
+    # row: sortiertes Tupel (Parameter, Wert) wie aus read_tool_values.
+    # Gleiche Vergleichsregeln wie im Werkzeug-Vergleich (Zahlen auf 3 Stellen gerundet).
+    # Zahlen gehen als Binärblock in den Hash – repr() auf jedem Wert wäre viermal langsamer.
+    import numpy as np
+    nums, kinds, texts = [], [], []
+    for _, val in row:
+        t = type(val)
+        if t is not float and t is not int:
+            val = normalize_value(val)
+            if type(val) is not float:
+                kinds.append("t")
+                texts.append(str(val))
+                continue
+        nums.append(val)
+        kinds.append("n")
+    head = "\x1f".join(param for param, _ in row) + "\x1e" + "".join(kinds) + "\x1e" + "\x1f".join(texts)
+    h = hashlib.blake2b(head.encode("utf-8"), digest_size=FINGERPRINT_BYTES)
+    # + 0.0 macht aus -0.0 (z. B. gerundetes -0.0001) eine normale 0.0
+    h.update((np.round(np.array(nums, dtype=float), 3) + 0.0).tobytes())
+    return h.digest()
+
+def tool_fingerprints(filepath):
+    # Rückgabe: {(Paramset, W-Nr.): (Fingerabdruck, Werkzeugname)}
+    return {key: (row_fingerprint(row), dict(row).get('Werkzeugname'))
+            for key, row in read_tool_values(filepath).items()}
+
+def _fingerprints_or_none(filepath):
+    try: return tool_fingerprints(filepath), None
+    except Exception as e: return None, str(e) or type(e).__name__
+
+# ---------------------------------------------------------
+# Matrix
+# ---------------------------------------------------------
+
+def build_matrix(paths, progress=None, workers=None):
+    # paths: Dateien in Spaltenreihenfolge. Unlesbare Dateien landen in errors {Spalte: Meldung},
+    # ihre Zellen sind dann "?" statt eine Variante.
+    workers = workers or min(4, os.cpu_count() or 1)
+    prints, errors = [], {}
+    for n, (fp, error) in enumerate(iter_parsed(list(paths), workers, _fingerprints_or_none)):
+        if progress is not None: progress(n, len(paths))
+        if error is not None: errors[n] = error
+        prints.append(fp)
+    if progress is not None: progress(len(paths), len(paths))
+
+    keys = set()
+    for fp in prints:
+        if fp is not None: keys.update(fp)
+    rows = []
+    for key in sorted(keys):
+        codes, variants, name = {}, [], None
+        for fp in prints:
+            if fp is None:
+                variants.append(None)
+                continue
+            hit = fp.get(key)
+            if hit is None:
+                variants.append(-1)
+                continue
+            variants.append(codes.setdefault(hit[0], len(codes)))
+            name = hit[1] or name
+        rows.append(MatrixRow(key[0], key[1], name or "", tuple(variants)))
+    return MatrixResult(list(paths), errors, rows)
+
+def row_differs(row):
+    # Unterschied = mehr als eine Variante oder in einem lesbaren Snapshot fehlend
+    seen = {v for v in row.variants if v is not None}
+    return len(seen) > 1
+
+def differing_counts(result):
+    # Rückgabe: {Paramset: Anzahl Werkzeuge mit Unterschieden}
+    counts = {}
+    for r in result.rows:
+        counts[r.paramset] = counts.get(r.paramset, 0) + row_differs(r)
+    return counts
+
+def cell_text(variant):
+    if variant is None: return "?"
+    if variant < 0: return "–"
+    return chr(ord("A") + variant) if variant < 26 else str(variant + 1)
+
+def drilldown_pair(row, column):
+    # Welche zwei Spalten sollen im Werkzeug-Vergleich landen, wenn man auf eine Zelle klickt?
+    # Die nächste Spalte davor mit anderer Variante (sonst die nächste danach) gegen die angeklickte.
+    v = row.variants[column]
+    for other in list(range(column - 1, -1, -1)) + list(range(column + 1, len(row.variants))):
+        w = row.variants[other]
+        if w is not None and w != v: return (other, column) if other < column else (column, other)
+    return None
+
+SNAPSHOT_LABEL = re.compile(r"(\d{4}-\d{2}-\d{2})_(\d{2})-(\d{2})_([^_.]+)\.\w+$")
+
+def column_label(path):
+    # Spaltenkopf: "2026-01-03 10:00 NS" statt des langen Dateinamens
+    name = os.path.basename(path)
+    m = SNAPSHOT_LABEL.search(name)
+    return f"{m.group(1)} {m.group(2)}:{m.group(3)} {m.group(4)}" if m else name
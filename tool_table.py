@@ -0,0 +1,146 @@
+import os
+import threading
+import importlib.util
+
+#Author Nico-RDF
+
+# =========================================================
+# WERKZEUGTABELLE ALS PARQUET / FEATHER / CSV
+# =========================================================
+# Die eingelesene Werkzeugliste (Spaltennamen wie im Vergleichs-Tab: W-Nr.,
+# Werkzeugname, Ø (mm), Vorschub = F * 60 …) lässt sich als Tabelle speichern.
+# So kann man Toollisten mehrerer Rechner in Notebooks/Auswertungen laden, ohne
+# jedes Mal die gzip-Binärdatei zu parsen. Der Vergleichs-Tab öffnet diese
+# Dateien direkt (gleiche Schnittstelle wie estlcam_dat.ToolsDatIndex).
+#   .parquet / .feather (.arrow): Spaltenformat, Paramset/Werkzeugname als
+#       Kategorie (jeder Name steht nur einmal in der Datei). Braucht pyarrow.
+#   .csv: geht immer, Trennzeichen wird beim Lesen erkannt. Leere Texte und
+#       fehlende Werte sind in CSV nicht unterscheidbar: beim Laden wird eine
+#       leere Textzelle wieder "", wenn der Parametersatz die Spalte überhaupt hat
+#       (so liefert es auch der Parser). Verlustfrei sind nur Parquet/Feather.
+# Die internen Zeilen-Fingerabdrücke werden nicht gespeichert, sondern beim Laden neu berechnet.
+
+TABLE_FORMATS = {".parquet": "parquet", ".feather": "feather", ".arrow": "feather", ".csv": "csv"}
+CATEGORY_COLS = ('Paramset', 'Werkzeugname')
+CSV_SEPARATORS = (";", "\t", ",")
+
+class ToolTableError(Exception):
+    pass
+
+def table_format(filepath):
+    return TABLE_FORMATS.get(os.path.splitext(filepath)[1].lower())
+
+def is_table_file(filepath):
+    return table_format(filepath) is not None
+
+def arrow_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+def _require_arrow(fmt):
+    if not arrow_available():
+        raise ToolTableError(f"Für {fmt.capitalize()} wird pyarrow benötigt (pip install pyarrow). CSV geht auch ohne.")
+
+def normalized_table(df, categorical=True):
+    # Wie der Parser sie liefert, ohne interne Spalten; Paramset/Werkzeugname optional als Kategorie
+    from tool_diff import FINGERPRINT_COL
+    df = df.drop(columns=FINGERPRINT_COL, errors='ignore').reset_index(drop=True)
+    if categorical:
+        df = df.astype({c: 'category' for c in CATEGORY_COLS if c in df.columns})
+    return df
+
+# ---------------------------------------------------------
+# Schreiben
+# ---------------------------------------------------------
+
+def export_tool_table(df, filepath, sep=","):
+    # Format kommt aus der Dateiendung. Geschrieben wird erst in eine temporäre Datei daneben.
+    fmt = table_format(filepath)
+    if fmt is None: raise ToolTableError(f"Unbekanntes Format: {os.path.basename(filepath)} (erlaubt: {', '.join(TABLE_FORMATS)})")
+    if fmt != "csv": _require_arrow(fmt)
+
+    df = normalized_table(df, categorical=fmt != "csv")
+    tmp = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if fmt == "parquet": df.to_parquet(tmp, index=False)
+        elif fmt == "feather": df.to_feather(tmp)
+        else: df.to_csv(tmp, index=False, sep=sep, encoding="utf-8")
+        os.replace(tmp, filepath)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+    return len(df)
+
+# ---------------------------------------------------------
+# Lesen
+# ---------------------------------------------------------
+
+def _csv_separator(filepath):
+    with open(filepath, "r", encoding="utf-8-sig") as f:
+        header = f.readline()
+    return max(CSV_SEPARATORS, key=header.count)
+
+def _restore_empty_text(df):
+    # CSV: NaN in Textspalten -> "" in den Parametersätzen, in denen die Spalte vorkommt
+    from pandas.api.types import is_numeric_dtype
+    from tool_diff import KEY_COL
+    for col in df.columns:
+        if col in (KEY_COL, 'Paramset') or is_numeric_dtype(df[col]): continue
+        present = df.groupby('Paramset', sort=False)[col].transform('count') > 0
+        df.loc[present & df[col].isna(), col] = ""
+    return df
+
+def read_tool_table(filepath, categorical=True):
+    # categorical=False: Kategorien zurück in normale Spalten (wie der Parser), z. B. für den Vergleich
+    import pandas as pd
+    from tool_diff import KEY_COL
+    fmt = table_format(filepath)
+    if fmt is None: raise ToolTableError(f"Unbekanntes Format: {os.path.basename(filepath)}")
+    if fmt != "csv": _require_arrow(fmt)
+
+    if fmt == "parquet": df = pd.read_parquet(filepath)
+    elif fmt == "feather": df = pd.read_feather(filepath)
+    else: df = pd.read_csv(filepath, sep=_csv_separator(filepath), encoding="utf-8-sig")
+
+    if KEY_COL not in df.columns or 'Paramset' not in df.columns:
+        raise ToolTableError(f"{os.path.basename(filepath)} ist keine Werkzeugtabelle (Spalten W-Nr. und Paramset fehlen).")
+    df['Paramset'] = df['Paramset'].fillna('Standard')
+    if fmt == "csv": df = _restore_empty_text(df)
+    if categorical: return df.astype({c: 'category' for c in CATEGORY_COLS if c in df.columns})
+    for c in CATEGORY_COLS:
+        if c in df.columns and isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype(df[c].cat.categories.dtype)
+    return df
+
+class ToolTableIndex:
+    # Wie estlcam_dat.ToolsDatIndex: paramsets(), frame(ps), raw_digest(ps)
+    def __init__(self, df, filepath=None):
+        self.df = df
+        self.filepath = filepath
+        self._paramsets = sorted(df['Paramset'].unique().tolist())
+        self._frames = {}
+        self._digests = None
+        self._lock = threading.Lock()
+
+    def paramsets(self):
+        return list(self._paramsets)
+
+    def frame(self, ps):
+        from tool_diff import add_fingerprints
+        with self._lock:
+            df = self._frames.get(ps)
+            if df is None:
+                # Nur die Spalten, die der Parametersatz wirklich hat (wie beim Dekodieren aus der Tools.dat)
+                df = self.df[self.df['Paramset'] == ps].dropna(axis=1, how='all').reset_index(drop=True)
+                df = self._frames[ps] = add_fingerprints(df)
+            return df
+
+    def raw_digest(self, ps):
+        # Fingerabdruck statt Rohbytes: gleich zwischen zwei Tabellen = gleiche Werte
+        if self._digests is None:
+            from tool_diff import paramset_fingerprints
+            self._digests = {p: ("table",) + fp for p, fp in paramset_fingerprints(self.df).items()}
+        return self._digests.get(ps)
+
+def open_table_index(filepath):
+    return ToolTableIndex(read_tool_table(filepath, categorical=False), filepath)
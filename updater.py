@@ -0,0 +1,258 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from config_store import write_json_atomic
+from parse_cache import app_data_dir
+
+#Author Nico-RDF
+
+# =========================================================
+# AUTO-UPDATER (ohne tkinter, läuft im Hintergrund-Job)
+# =========================================================
+# Statt bei jedem Start das ganze Skript zu laden, wird nur ein kleines Manifest
+# (update_manifest.json neben dem Skript auf GitHub) abgefragt:
+#   {"version": "4.3", "main": "ToolVerwaltung_Final.pyw",
+#    "files": {"ToolVerwaltung_Final.pyw": {"sha256": "…", "size": 12345}, "estlcam_dat.py": {…}, …}}
+# ETag / Last-Modified der letzten Antwort werden lokal gemerkt – ist nichts Neues
+# veröffentlicht, antwortet der Server mit 304 und es wird nichts übertragen.
+# Innerhalb des Prüfintervalls wird gar nicht erst gefragt (außer "Update prüfen").
+# Installiert wird nur, was sich vom lokalen Stand unterscheidet. Jede Datei wird
+# erst komplett neben das Ziel geladen und gegen Größe + SHA-256 aus dem Manifest
+# geprüft; erst wenn alle stimmen, werden sie per Umbenennen ersetzt (das
+# Hauptskript zuletzt). Manifest erzeugen: python updater.py manifest 4.3 DATEIEN…
+# Solange noch kein Manifest veröffentlicht ist (404), wird wie früher die Version aus dem
+# Skript selbst gelesen (script_url) – dann wird nur das Hauptskript ersetzt.
+
+DEFAULT_INTERVAL = 6 * 3600
+TIMEOUT = 5
+DOWNLOAD_CHUNK = 64 * 1024
+USER_AGENT = "EstlcamSync-Updater"
+VERSION_RE = re.compile(rb'^__version__\s*=\s*["\']([^"\']+)["\']', re.MULTILINE)
+
+class UpdateError(Exception):
+    pass
+
+def parse_version(v_str):
+    # "4.0.1" -> (4, 0, 1), für sauberen Vergleich
+    return tuple(map(int, v_str.split(".")))
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk: break
+            h.update(chunk)
+    return h.hexdigest()
+
+def default_meta_path():
+    return os.path.join(app_data_dir(), "update_meta.json")
+
+def build_manifest(version, paths, main=None):
+    # Für die Veröffentlichung: Manifest über die hochgeladenen Dateien
+    files = {os.path.basename(p): {"sha256": file_sha256(p), "size": os.path.getsize(p)} for p in paths}
+    return {"version": version, "main": main or os.path.basename(paths[0]), "files": files}
+
+def validate_manifest(manifest):
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), dict):
+        raise UpdateError("Update-Manifest ist ungültig.")
+    try: parse_version(str(manifest.get("version")))
+    except ValueError: raise UpdateError(f"Ungültige Versionsnummer im Manifest: {manifest.get('version')!r}")
+    for name, info in manifest["files"].items():
+        # Nur einfache Dateinamen im Programmordner, keine Pfade
+        if os.path.basename(name) != name or name.startswith(".") or name in ("", ".."):
+            raise UpdateError(f"Ungültiger Dateiname im Manifest: {name!r}")
+        if not isinstance(info, dict) or len(str(info.get("sha256", ""))) != 64 or not isinstance(info.get("size"), int):
+            raise UpdateError(f"Prüfsumme fehlt im Manifest: {name}")
+    if manifest.get("main") not in manifest["files"]:
+        raise UpdateError("Update-Manifest nennt kein Hauptskript.")
+    return manifest
+
+def script_manifest(body, name):
+    # Altes Verfahren ohne Manifest: Version steht im Skript, Prüfsumme aus dem geladenen Inhalt
+    match = VERSION_RE.search(body)
+    if not match: raise UpdateError("Konnte Versionsnummer im Online-Code nicht finden.")
+    return validate_manifest({"version": match.group(1).decode("utf-8", "replace"), "main": name,
+                              "files": {name: {"sha256": hashlib.sha256(body).hexdigest(), "size": len(body)}}})
+
+class Updater:
+    def __init__(self, manifest_url, main_file, meta_path=None, interval=DEFAULT_INTERVAL, timeout=TIMEOUT, script_url=None):
+        # main_file: dieses Skript (__file__) – bekommt den Inhalt von manifest["main"]
+        # script_url: veröffentlichtes Hauptskript im selben Ordner wie das Manifest (Rückfall bei 404)
+        self.manifest_url = manifest_url
+        self.script_url = script_url
+        self.main_file = os.path.abspath(main_file)
+        self.install_dir = os.path.dirname(self.main_file)
+        self.meta_path = meta_path or default_meta_path()
+        self.interval = interval
+        self.timeout = timeout
+
+    # --- Metadaten (ETag, Last-Modified, letztes Manifest) ---
+    def _load_meta(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except Exception:
+            return {}
+        # Anderer Update-Server = alter Stand gilt nicht
+        return meta if isinstance(meta, dict) and meta.get("url") == self.manifest_url else {}
+
+    def _save_meta(self, meta):
+        try:
+            os.makedirs(os.path.dirname(self.meta_path), exist_ok=True)
+            write_json_atomic(self.meta_path, meta)
+        except OSError:
+            pass
+
+    def _request(self, url, headers=None):
+        return urllib.request.Request(url, headers={"User-Agent": USER_AGENT, **(headers or {})})
+
+    def _fetch(self, url, meta):
+        # Bedingte Anfrage, wenn der gemerkte Stand von derselben Adresse stammt; None = 304 (nichts Neues)
+        headers = {}
+        if meta.get("manifest") is not None and meta.get("source", self.manifest_url) == url:
+            if meta.get("etag"): headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"): headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            with urllib.request.urlopen(self._request(url, headers), timeout=self.timeout) as response:
+                return response.read(), response.headers.get("ETag"), response.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and headers: return None
+            raise
+
+    def check(self, force=False):
+        # Rückgabe: (Manifest oder None, abgefragt?) – None, wenn noch nie etwas geladen werden konnte.
+        # force=True ignoriert das Prüfintervall ("Update prüfen"-Knopf).
+        meta = self._load_meta()
+        manifest = meta.get("manifest")
+        if not force and manifest is not None and time.time() - meta.get("checked", 0) < self.interval:
+            return manifest, False
+
+        source = self.manifest_url
+        try:
+            try: fetched = self._fetch(source, meta)
+            except urllib.error.HTTPError as e:
+                # Manifest (noch) nicht veröffentlicht -> Version wie früher aus dem Skript lesen
+                if e.code != 404 or not self.script_url: raise
+                source = self.script_url
+                fetched = self._fetch(source, meta)
+        except urllib.error.HTTPError as e:
+            raise UpdateError(f"Update-Server antwortet mit {e.code} {e.reason}")
+        except (urllib.error.URLError, OSError) as e:
+            raise UpdateError(f"Update-Server nicht erreichbar: {getattr(e, 'reason', e)}")
+
+        if fetched is None:
+            # Nichts Neues veröffentlicht
+            meta["checked"] = time.time()
+            self._save_meta(meta)
+            return manifest, True
+
+        body, etag, last_modified = fetched
+        if source == self.manifest_url:
+            try: manifest = validate_manifest(json.loads(body.decode("utf-8")))
+            except ValueError: raise UpdateError("Update-Manifest ist kein gültiges JSON.")
+        else:
+            manifest = script_manifest(body, urllib.parse.unquote(os.path.basename(urllib.parse.urlparse(source).path)))
+        self._save_meta({"url": self.manifest_url, "source": source, "etag": etag, "last_modified": last_modified,
+                         "checked": time.time(), "manifest": manifest})
+        return manifest, True
+
+    def is_newer(self, manifest, current_version):
+        return manifest is not None and parse_version(manifest["version"]) > parse_version(current_version)
+
+    # --- Installation ---
+    def target_path(self, manifest, name):
+        if name == manifest["main"]: return self.main_file
+        return os.path.join(self.install_dir, name)
+
+    def pending_files(self, manifest):
+        # Dateien, die lokal fehlen oder anders sind (Größe zuerst, Hash nur bei gleicher Größe)
+        pending = []
+        for name, info in manifest["files"].items():
+            path = self.target_path(manifest, name)
+            try: same = os.path.getsize(path) == info["size"] and file_sha256(path) == info["sha256"]
+            except OSError: same = False
+            if not same: pending.append(name)
+        return pending
+
+    def _download(self, manifest, name, progress, done, total):
+        info = manifest["files"][name]
+        url = urllib.parse.urljoin(self.manifest_url, urllib.parse.quote(name))
+        target = self.target_path(manifest, name)
+        fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", suffix=".update", dir=self.install_dir)
+        try:
+            h, size = hashlib.sha256(), 0
+            with os.fdopen(fd, "wb") as f, urllib.request.urlopen(self._request(url), timeout=self.timeout) as response:
+                while True:
+                    chunk = response.read(DOWNLOAD_CHUNK)
+                    if not chunk: break
+                    size += len(chunk)
+                    if size > info["size"]: raise UpdateError(f"{name}: mehr Daten als im Manifest angegeben")
+                    h.update(chunk)
+                    f.write(chunk)
+                    if progress is not None: progress(done + size, total)
+                f.flush()
+                os.fsync(f.fileno())
+            if size != info["size"] or h.hexdigest() != info["sha256"]:
+                raise UpdateError(f"{name}: Prüfsumme stimmt nicht – Download verworfen")
+        except BaseException as e:
+            try: os.remove(tmp)
+            except OSError: pass
+            if isinstance(e, (urllib.error.URLError, OSError)) and not isinstance(e, UpdateError):
+                raise UpdateError(f"{name} konnte nicht geladen werden: {getattr(e, 'reason', e)}")
+            raise
+        return tmp, target
+
+    def install(self, manifest, progress=None):
+        # progress(bytes_geladen, bytes_gesamt). Rückgabe: Liste der ersetzten Dateinamen.
+        pending = self.pending_files(manifest)
+        total = sum(manifest["files"][n]["size"] for n in pending)
+        staged, done = [], 0
+        try:
+            for name in pending:
+                staged.append(self._download(manifest, name, progress, done, total))
+                done += manifest["files"][name]["size"]
+            # Alles geprüft -> ersetzen, Hauptskript zuletzt (startet sonst evtl. mit alten Modulen)
+            staged.sort(key=lambda s: s[1] == self.main_file)
+            while staged:
+                tmp, target = staged[0]
+                try: shutil.copymode(target, tmp)
+                except OSError: pass
+                os.replace(tmp, target)
+                staged.pop(0)
+        finally:
+            for tmp, _ in staged:
+                try: os.remove(tmp)
+                except OSError: pass
+        return pending
+
+# ---------------------------------------------------------
+# python updater.py manifest VERSION DATEIEN…   (Hauptskript zuerst)
+# python updater.py check URL [SKRIPT-URL] [--install]   (z. B. gegen einen lokalen Testserver)
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 4 and sys.argv[1] == "manifest":
+        print(json.dumps(build_manifest(sys.argv[2], sys.argv[3:]), indent=2, ensure_ascii=False))
+    elif len(sys.argv) >= 3 and sys.argv[1] == "check":
+        script_url = next((a for a in sys.argv[3:] if not a.startswith("--")), None)
+        updater = Updater(sys.argv[2], os.path.join(os.getcwd(), "ToolVerwaltung_V4.py"), interval=0, script_url=script_url)
+        try:
+            manifest, fetched = updater.check(force=True)
+            print(f"Version {manifest['version']} ({'neu geladen' if fetched else 'aus dem Cache'}), "
+                  f"abweichende Dateien: {', '.join(updater.pending_files(manifest)) or 'keine'}")
+            if "--install" in sys.argv: print("Ersetzt:", ", ".join(updater.install(manifest)) or "nichts")
+        except UpdateError as e:
+            print(f"Fehler: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        print("python updater.py manifest VERSION DATEIEN… | check URL [SKRIPT-URL] [--install]")
@@ -0,0 +1,138 @@
+from diagnostics import count
+
+#Author Nico-RDF
+
+# =========================================================
+# VIRTUELLE TABELLE FÜR GROSSE TREEVIEWS (Werkzeug-Vergleich)
+# =========================================================
+# Statt eine Treeview-Zeile pro Werkzeug anzulegen, gibt es nur so viele
+# Zeilen, wie gerade sichtbar sind (plus kleinem Puffer). Beim Scrollen werden
+# dieselben Zeilen mit neuen Werten/Tags befüllt. Die Werte einer Zeile holt
+# sich die Tabelle erst beim Anzeigen über row_getter(index) -> (values, tags).
+
+DEFAULT_ROW_HEIGHT = 30
+DEFAULT_HEADING_HEIGHT = 34
+MIN_VISIBLE_ROWS = 20
+
+class VirtualTable:
+    def __init__(self, tree, vscrollbar, buffer_rows=5):
+        self.tree = tree
+        self.vsb = vscrollbar
+        self.buffer_rows = buffer_rows
+        self.count = 0
+        self.row_getter = None
+        self.offset = 0
+        self.selected_index = None
+        self.items = []
+        self._rendering = False
+
+        self.vsb.configure(command=self.yview)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", self._on_wheel)
+        self.tree.bind("<Button-5>", self._on_wheel)
+        self.tree.bind("<Up>", lambda e: self._on_key(-1))
+        self.tree.bind("<Down>", lambda e: self._on_key(1))
+        self.tree.bind("<Prior>", lambda e: self._on_page(-1))
+        self.tree.bind("<Next>", lambda e: self._on_page(1))
+        self.tree.bind("<Configure>", lambda e: self.render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+
+    # --- Daten ---
+    def set_rows(self, count, row_getter):
+        self.count = count
+        self.row_getter = row_getter
+        self.offset = 0
+        self.selected_index = None
+        self.tree.delete(*self.tree.get_children())
+        self.items = []
+        self.render()
+
+    # --- Geometrie ---
+    def visible_rows(self):
+        height = self.tree.winfo_height()
+        row_h, head_h = DEFAULT_ROW_HEIGHT, DEFAULT_HEADING_HEIGHT
+        if self.items:
+            bbox = self.tree.bbox(self.items[0])
+            if bbox: head_h, row_h = bbox[1], bbox[3]
+        if height <= head_h + row_h: return MIN_VISIBLE_ROWS
+        return max(1, (height - head_h) // row_h)
+
+    def max_offset(self):
+        return max(0, self.count - self.visible_rows())
+
+    # --- Scrollen ---
+    def yview(self, *args):
+        if not args: return
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.count)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages": step *= self.visible_rows()
+            self.offset += step
+        self.render()
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4: step = -3
+        elif getattr(event, "num", None) == 5: step = 3
+        else: step = -3 if event.delta > 0 else 3
+        self.yview("scroll", step, "units")
+        return "break"
+
+    def _on_page(self, direction):
+        self.yview("scroll", direction, "pages")
+        return "break"
+
+    def _on_key(self, direction):
+        if self.count == 0: return "break"
+        current = self.selected_index if self.selected_index is not None else self.offset - direction
+        new_index = max(0, min(self.count - 1, current + direction))
+        self.selected_index = new_index
+        visible = self.visible_rows()
+        if new_index < self.offset: self.offset = new_index
+        elif new_index >= self.offset + visible: self.offset = new_index - visible + 1
+        self.render()
+        return "break"
+
+    def _on_select(self, event):
+        if self._rendering: return
+        sel = self.tree.selection()
+        if sel and sel[0] in self.items:
+            self.selected_index = self.offset + self.items.index(sel[0])
+
+    # --- Zeichnen ---
+    def render(self):
+        visible = self.visible_rows()
+        pool_size = min(self.count, visible + self.buffer_rows)
+        self.offset = max(0, min(self.offset, self.max_offset()))
+
+        self._rendering = True
+        try:
+            count("items_inserted", max(0, pool_size - len(self.items)))
+            count("rows_drawn", pool_size)
+            while len(self.items) < pool_size:
+                self.items.append(self.tree.insert("", "end", values=()))
+            while len(self.items) > pool_size:
+                self.tree.delete(self.items.pop())
+
+            selected_item = None
+            for k, iid in enumerate(self.items):
+                i = self.offset + k
+                if i < self.count:
+                    values, tags = self.row_getter(i)
+                    self.tree.item(iid, values=values, tags=tags)
+                else:
+                    self.tree.item(iid, values=(), tags=())
+                if i == self.selected_index: selected_item = iid
+
+            if selected_item is not None: self.tree.selection_set(selected_item)
+            elif self.tree.selection(): self.tree.selection_remove(*self.tree.selection())
+            if self.items: self.tree.yview_moveto(0)
+        finally:
+            self._rendering = False
+
+        if self.count:
+            first = self.offset / self.count
+            last = min(1.0, (self.offset + visible) / self.count)
+            self.vsb.set(first, last)
+        else:
+            self.vsb.set(0, 1)